@@ -1,4 +1,15 @@
 from .session import CoindSession
 from .exceptions import CoindError
+from .hooks import Hooks, RequestTrace
+from .keepalive import KeepAliveTransport
+from .limiter import AdaptiveLimiter
+from .metrics import Metrics
+from .ratelimit import RateLimiter, TokenBucket
+from .submit import BlockSubmitter
+from .transport import AiohttpTransport, RecordingTransport, ReplayTransport, Transport
 
-__all__ = ['CoindSession', 'CoindError']
+__all__ = [
+    'CoindSession', 'CoindError', 'BlockSubmitter', 'Metrics', 'Hooks', 'RequestTrace',
+    'Transport', 'AiohttpTransport', 'RecordingTransport', 'ReplayTransport', 'KeepAliveTransport',
+    'AdaptiveLimiter', 'RateLimiter', 'TokenBucket',
+]
@@ -0,0 +1 @@
+"""Benchmarks for aio_coind."""
@@ -0,0 +1,80 @@
+import json
+import time
+import tracemalloc
+
+from ..encoder import RequestEncoder
+
+CASES = {
+    'getblockcount': ('getblockcount', []),
+    'getbestblockhash': ('getbestblockhash', []),
+    'gettxout': ('gettxout', ['00' * 32, 0, True]),
+}
+
+
+def _legacy_encode(state, method, params):
+    # Request building used by HttpClient before RequestEncoder.
+    state[0] += 1
+    data = {
+        'method': method,
+        'params': params,
+        'id': state[0],
+        'jsonrpc': '2.0',
+    }
+    headers = {'Content-Type': 'application/json'}
+    return state[0], json.dumps(data).encode(), headers
+
+
+def _allocated_per_call(func, calls):
+    # Peak traced memory of a single call above the memory held before it.
+    total = 0
+    for _ in range(calls):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - before
+    return total / calls
+
+
+def run(calls=100000, traced_calls=2000):
+    """
+    Compare per-call time and allocations of request encoding.
+
+    Allocations are measured with tracemalloc as the peak memory of one
+    call above the memory held before it, i.e. everything the call builds
+    at once (request dict, header dict, JSON string and body bytes).
+
+    Args:
+        calls (int): Number of calls for the timing measurement.
+        traced_calls (int): Number of calls for the allocation measurement.
+
+    Returns:
+        list: One result dict per case with timings in nanoseconds and allocations in bytes.
+    """
+    results = []
+    for name, (method, params) in CASES.items():
+        state = [0]
+        encoder = RequestEncoder()
+        variants = {
+            'legacy': lambda: _legacy_encode(state, method, params),
+            'encoder': lambda: encoder.encode(method, params),
+        }
+        result = {'case': name}
+        for variant, func in variants.items():
+            func()
+            start = time.perf_counter_ns()
+            for _ in range(calls):
+                func()
+            result[f'{variant}_ns_per_call'] = (time.perf_counter_ns() - start) / calls
+            tracemalloc.start()
+            try:
+                result[f'{variant}_bytes_per_call'] = _allocated_per_call(func, traced_calls)
+            finally:
+                tracemalloc.stop()
+        result['allocation_ratio'] = result['encoder_bytes_per_call'] / result['legacy_bytes_per_call']
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+
+from aiohttp import web
+
+from ..exceptions import CoindError
+from ..limiter import AdaptiveLimiter
+from ..session import CoindSession
+
+
+class WorkQueueDaemon:
+    """
+    Mock daemon with a bounded RPC work queue, like Coind's rpcthreads/rpcworkqueue.
+
+    At most workers requests are served at once and up to queue_depth more
+    wait; any request beyond that is answered with HTTP 503 "Work queue
+    depth exceeded", as Coind does.
+
+    Attributes:
+        workers (int): Number of requests served at once.
+        queue_depth (int): Number of requests allowed to wait.
+        service_time (float): Time to serve one request in seconds.
+        rejected (int): Number of 503 responses sent.
+        port (int): Listening port, known after start().
+    """
+
+    def __init__(self, workers=4, queue_depth=16, service_time=0.005):
+        """
+        Initialize the WorkQueueDaemon instance.
+
+        Args:
+            workers (int): Number of requests served at once (default is 4).
+            queue_depth (int): Number of requests allowed to wait (default is 16).
+            service_time (float): Time to serve one request in seconds (default is 0.005).
+        """
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.service_time = service_time
+        self.rejected = 0
+        self.port = None
+        self._busy = 0
+        self._semaphore = asyncio.Semaphore(workers)
+        self._runner = None
+
+    async def _handle(self, request):
+        data = json.loads(await request.read())
+        if self._busy >= self.workers + self.queue_depth:
+            self.rejected += 1
+            return web.Response(status=503, text='Work queue depth exceeded')
+        self._busy += 1
+        try:
+            async with self._semaphore:
+                await asyncio.sleep(self.service_time)
+        finally:
+            self._busy -= 1
+        return web.json_response({'result': 250000, 'error': None, 'id': data['id']})
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Start listening.
+
+        Returns:
+            int: Listening port.
+        """
+        app = web.Application()
+        app.router.add_post('/', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self):
+        """
+        Stop the server.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def _measure(limiter, callers, duration, workers, queue_depth, service_time):
+    daemon = WorkQueueDaemon(workers, queue_depth, service_time)
+    port = await daemon.start()
+    ok = 0
+    rejected = 0
+    try:
+        async with CoindSession('bench', 'bench', port, limiter=limiter) as coind:
+            async def caller():
+                nonlocal ok, rejected
+                end = time.monotonic() + duration
+                while time.monotonic() < end:
+                    try:
+                        await coind.blockchain.get_block_count()
+                        ok += 1
+                    except CoindError as e:
+                        if e.code != 503:
+                            raise
+                        rejected += 1
+
+            await asyncio.gather(*(caller() for _ in range(callers)))
+    finally:
+        await daemon.stop()
+    result = {'ok': ok, 'rejected': rejected, 'daemon_rejected': daemon.rejected}
+    if limiter:
+        result['final_limit'] = limiter.limit
+    return result
+
+
+def run(callers=100, duration=3.0, workers=4, queue_depth=16, service_time=0.005):
+    """
+    Compare calls with and without AdaptiveLimiter against a daemon with a bounded work queue.
+
+    The mock daemon runs in the same event loop as the callers. Figures
+    depend on the machine; what is reproducible is the ratio of successful
+    to rejected calls with and without the limiter.
+
+    Args:
+        callers (int): Number of concurrent callers.
+        duration (float): Duration of each run in seconds.
+        workers (int): Requests the daemon serves at once.
+        queue_depth (int): Requests the daemon lets wait.
+        service_time (float): Time the daemon spends on one request in seconds.
+
+    Returns:
+        dict: Settings and successful/rejected call counts without and with the limiter.
+    """
+    settings = {
+        'callers': callers,
+        'duration': duration,
+        'workers': workers,
+        'queue_depth': queue_depth,
+        'service_time': service_time,
+    }
+    return {
+        'settings': settings,
+        'without_limiter': asyncio.run(_measure(False, **settings)),
+        'with_limiter': asyncio.run(_measure(AdaptiveLimiter(), **settings)),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
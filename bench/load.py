@@ -0,0 +1,347 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+from ..exceptions import CoindError
+from ..session import CoindSession
+from .mockd import serve
+from .rpc import percentile
+
+CALLS = {
+    'getblockcount': lambda coind, context: coind.blockchain.get_block_count(),
+    'getbestblockhash': lambda coind, context: coind.blockchain.get_best_block_hash(),
+    'getblock': lambda coind, context: coind.blockchain.get_block(context['block_hash'], 1),
+    'getblocktemplate': lambda coind, context: coind.mining.get_block_template(),
+    'getrawtxpool': lambda coind, context: coind.blockchain.get_raw_tx_pool(),
+    'gettxout': lambda coind, context: coind.blockchain.get_tx_out(random.choice(context['txids']), 0),
+    'getrawtransaction': lambda coind, context: coind.raw_transactions.get_raw_transaction(
+        random.choice(context['txids'])
+    ),
+}
+
+DEFAULT_MIX = 'getblocktemplate=1,gettxout=5,getrawtransaction=4'
+
+
+def parse_mix(spec):
+    """
+    Parse a weighted method mix.
+
+    Args:
+        spec (str): Comma-separated method=weight pairs, e.g. 'gettxout=5,getblocktemplate=1'.
+
+    Returns:
+        tuple: Method names and their weights.
+
+    Raises:
+        ValueError: If a method is unknown or a weight is not positive.
+    """
+    methods = []
+    weights = []
+    for item in spec.split(','):
+        method, _, weight = item.strip().partition('=')
+        if method not in CALLS:
+            raise ValueError(f'Unknown method: {method} (known: {", ".join(sorted(CALLS))})')
+        weight = float(weight or 1)
+        if weight <= 0:
+            raise ValueError(f'Weight must be positive: {item}')
+        methods.append(method)
+        weights.append(weight)
+    return methods, weights
+
+
+class Window:
+    """
+    Latencies and errors collected over one report interval.
+
+    Attributes:
+        latencies (dict): Lists of latencies in seconds by method.
+        errors (dict): Number of errors by method and error code or exception name.
+        dropped (int): Calls not started because max_in_flight was reached.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.dropped = 0
+
+    def add(self, method, latency, error=None):
+        self.latencies.setdefault(method, []).append(latency)
+        if error is not None:
+            key = f'{method}:{error}'
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def merge(self, other):
+        for method, latencies in other.latencies.items():
+            self.latencies.setdefault(method, []).extend(latencies)
+        for key, count in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + count
+        self.dropped += other.dropped
+
+    def report(self, elapsed, duration):
+        """
+        Summarize the window.
+
+        Args:
+            elapsed (float): Time since the start of the run in seconds.
+            duration (float): Window length in seconds.
+
+        Returns:
+            dict: Throughput, latency percentiles in milliseconds and error rates.
+        """
+        def summary(latencies, errors):
+            latencies = sorted(latencies)
+            return {
+                'calls': len(latencies),
+                'calls_per_sec': len(latencies) / duration if duration else None,
+                'p50_ms': _ms(percentile(latencies, 0.50)),
+                'p90_ms': _ms(percentile(latencies, 0.90)),
+                'p99_ms': _ms(percentile(latencies, 0.99)),
+                'max_ms': _ms(latencies[-1] if latencies else None),
+                'error_rate': errors / len(latencies) if latencies else 0.0,
+            }
+
+        errors_by_method = {}
+        for key, count in self.errors.items():
+            method = key.partition(':')[0]
+            errors_by_method[method] = errors_by_method.get(method, 0) + count
+        return {
+            'elapsed': round(elapsed, 3),
+            **summary(
+                [latency for latencies in self.latencies.values() for latency in latencies],
+                sum(self.errors.values()),
+            ),
+            'dropped': self.dropped,
+            'errors': dict(self.errors),
+            'methods': {
+                method: summary(latencies, errors_by_method.get(method, 0))
+                for method, latencies in sorted(self.latencies.items())
+            },
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1e3, 3)
+
+
+class LoadGenerator:
+    """
+    Drives a weighted mix of Coind calls through a CoindSession.
+
+    In concurrency mode a fixed number of callers issue calls back to back.
+    In rate mode calls are started on a fixed schedule regardless of
+    latency (open loop), so daemon saturation shows up as growing latency
+    and dropped calls instead of a silently lower request rate.
+
+    Attributes:
+        coind (CoindImplementation): Coind client.
+        methods (list): Methods of the mix.
+        weights (list): Weights of the methods.
+        context (dict): Block hash and transaction ids used as call parameters.
+    """
+
+    def __init__(self, coind, methods, weights):
+        """
+        Initialize the LoadGenerator instance.
+
+        Args:
+            coind (CoindImplementation): Coind client.
+            methods (list): Methods of the mix.
+            weights (list): Weights of the methods.
+        """
+        self.coind = coind
+        self.methods = methods
+        self.weights = weights
+        self.context = {}
+        self._window = Window()
+
+    async def prepare(self):
+        """
+        Fetch the best block to get parameters for calls that need them.
+        """
+        block_hash = await self.coind.blockchain.get_best_block_hash()
+        block = await self.coind.blockchain.get_block(block_hash, 1)
+        txids = [tx['txid'] if isinstance(tx, dict) else tx for tx in block.get('tx') or block.get('txid') or []]
+        self.context = {'block_hash': block_hash, 'txids': txids or [block_hash]}
+
+    async def _call(self, method):
+        start = time.perf_counter()
+        error = None
+        try:
+            await CALLS[method](self.coind, self.context)
+        except CoindError as e:
+            error = e.code
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = type(e).__name__
+        self._window.add(method, time.perf_counter() - start, error)
+
+    def _pick(self, count):
+        return random.choices(self.methods, self.weights, k=count)
+
+    async def _closed_loop(self, concurrency, deadline):
+        async def worker():
+            while time.monotonic() < deadline:
+                await self._call(self._pick(1)[0])
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def _open_loop(self, rate, deadline, max_in_flight):
+        loop = asyncio.get_running_loop()
+        tasks = set()
+        tick = min(0.01, 1 / rate)
+        start = loop.time()
+        started = 0
+        while loop.time() < deadline:
+            due = int((loop.time() - start) * rate) - started
+            for method in self._pick(due):
+                started += 1
+                if len(tasks) >= max_in_flight:
+                    self._window.dropped += 1
+                    continue
+                task = asyncio.ensure_future(self._call(method))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.sleep(tick)
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def run(self, duration, concurrency=None, rate=None, interval=1.0, max_in_flight=1000, report=None):
+        """
+        Run the load and report statistics per interval.
+
+        Args:
+            duration (float): Run time in seconds.
+            concurrency (int): Number of concurrent callers (used when rate is None).
+            rate (float): Target calls per second (optional).
+            interval (float): Report interval in seconds (default is 1.0).
+            max_in_flight (int): Maximum number of outstanding calls in rate mode (default is 1000).
+            report (callable): Function called with each interval report (optional).
+
+        Returns:
+            dict: Report over the whole run.
+        """
+        total = Window()
+        run_start = time.perf_counter()
+        deadline = time.monotonic() + duration
+        if rate:
+            load = asyncio.ensure_future(self._open_loop(rate, deadline, max_in_flight))
+        else:
+            load = asyncio.ensure_future(self._closed_loop(concurrency or 1, deadline))
+        window_start = run_start
+        while not load.done():
+            # The last window also takes the calls still finishing after the deadline,
+            # instead of reporting them as a separate short window.
+            last = deadline - time.monotonic() <= interval
+            await asyncio.wait([load], timeout=None if last else interval)
+            now = time.perf_counter()
+            window, self._window = self._window, Window()
+            total.merge(window)
+            if report is not None:
+                report(window.report(now - run_start, now - window_start))
+            window_start = now
+        load.result()
+        return total.report(time.perf_counter() - run_start, time.perf_counter() - run_start)
+
+
+def _print_report(report):
+    print(
+        f"{report['elapsed']:8.1f}s {report['calls_per_sec'] or 0:10.1f} calls/s"
+        f"  p50 {report['p50_ms'] or 0:8.2f} ms  p90 {report['p90_ms'] or 0:8.2f} ms"
+        f"  p99 {report['p99_ms'] or 0:8.2f} ms  errors {report['error_rate']:6.2%}"
+        f"  dropped {report['dropped']}",
+        flush=True,
+    )
+
+
+async def _run(args, port):
+    methods, weights = parse_mix(args.mix)
+    async with CoindSession(args.user, args.password, port, args.host) as coind:
+        generator = LoadGenerator(coind, methods, weights)
+        await generator.prepare()
+        if args.json:
+            report = lambda item: print(json.dumps(item), flush=True)  # noqa: E731
+        else:
+            report = _print_report
+        total = await generator.run(
+            args.duration,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            interval=args.interval,
+            max_in_flight=args.max_in_flight,
+            report=report,
+        )
+    if args.json:
+        print(json.dumps({'total': total}), flush=True)
+    else:
+        print('total:')
+        _print_report(total)
+        for method, summary in total['methods'].items():
+            print(
+                f"  {method:20} {summary['calls']:8} calls  p50 {summary['p50_ms'] or 0:8.2f} ms"
+                f"  p99 {summary['p99_ms'] or 0:8.2f} ms  errors {summary['error_rate']:6.2%}"
+            )
+        for key, count in sorted(total['errors'].items()):
+            print(f'  error {key}: {count}')
+
+
+def main(argv=None):
+    """
+    Command line entry point of python -m aio_coind.bench.
+
+    Args:
+        argv (list): Command line arguments (default is sys.argv[1:]).
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m aio_coind.bench',
+        description='Drive a weighted mix of RPC calls against a Coind node or the bundled mock daemon.',
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='node host (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=5996, help='node RPC port (default: %(default)s)')
+    parser.add_argument('--user', default='', help='RPC username')
+    parser.add_argument('--password', default='', help='RPC password')
+    parser.add_argument('--mock', action='store_true', help='start the bundled mock daemon instead of using a node')
+    parser.add_argument('--mock-latency', type=float, default=0.0, help='mock daemon response delay in seconds')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='weighted method mix (default: %(default)s)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--concurrency', type=int, default=8, help='concurrent callers (default: %(default)s)')
+    mode.add_argument('--rate', type=float, help='target calls per second (open loop)')
+    parser.add_argument('--max-in-flight', type=int, default=1000, help='outstanding call limit in rate mode')
+    parser.add_argument('--duration', type=float, default=30.0, help='run time in seconds (default: %(default)s)')
+    parser.add_argument('--interval', type=float, default=1.0, help='report interval in seconds (default: %(default)s)')
+    parser.add_argument('--json', action='store_true', help='print reports as JSON lines')
+    args = parser.parse_args(argv)
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    daemon = None
+    port = args.port
+    if args.mock:
+        parent, child = multiprocessing.Pipe()
+        daemon = multiprocessing.Process(
+            target=serve,
+            kwargs={'latency': args.mock_latency, 'ready': child},
+            daemon=True,
+        )
+        daemon.start()
+        port = parent.recv()
+        args.host = '127.0.0.1'
+    try:
+        asyncio.run(_run(args, port))
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.join()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import json
+import os
+import time
+
+from ..modules.merkle import MerkleBranch, double_sha256, merkle_branch, merkle_root
+
+
+def _best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=(100, 1000, 5000, 20000), repeat=5):
+    """
+    Benchmark merkle root and coinbase branch computation.
+
+    Args:
+        sizes (tuple): Numbers of template transactions to benchmark.
+        repeat (int): Number of runs per measurement; the best one is reported.
+
+    Returns:
+        list: One result dict per size, timings in microseconds.
+    """
+    results = []
+    for size in sizes:
+        hashes = [double_sha256(os.urandom(32)) for _ in range(size)]
+        coinbase = os.urandom(200)
+        branch = MerkleBranch(hashes)
+        results.append({
+            'transactions': size,
+            'merkle_root_us': _best_of(lambda: merkle_root([double_sha256(coinbase), *hashes]), repeat) * 1e6,
+            'merkle_branch_us': _best_of(lambda: merkle_branch(hashes), repeat) * 1e6,
+            'coinbase_update_us': _best_of(lambda: branch.root_for_coinbase(coinbase), repeat) * 1e6,
+        })
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
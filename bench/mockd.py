@@ -0,0 +1,234 @@
+import asyncio
+import json
+import random
+
+from aiohttp import web
+
+
+def _hex(rng, size):
+    return rng.getrandbits(size * 8).to_bytes(size, 'big').hex()
+
+
+def _transaction(rng, inputs=2, outputs=2):
+    txid = _hex(rng, 32)
+    return {
+        'txid': txid,
+        'txidem': _hex(rng, 32),
+        'hash': txid,
+        'size': 120 + 150 * inputs + 40 * outputs,
+        'version': 0,
+        'locktime': 0,
+        'vin': [
+            {
+                'outpoint': _hex(rng, 32),
+                'amount': rng.randint(1, 10 ** 8) / 100,
+                'scriptSig': {'asm': '', 'hex': _hex(rng, 100)},
+                'sequence': 4294967294,
+            }
+            for _ in range(inputs)
+        ],
+        'vout': [
+            {
+                'value': rng.randint(1, 10 ** 8) / 100,
+                'type': 0,
+                'n': n,
+                'scriptPubKey': {
+                    'asm': '0 1 ' + _hex(rng, 20),
+                    'hex': '005114' + _hex(rng, 20),
+                    'type': 'scripttemplate',
+                    'addresses': ['nexa:' + _hex(rng, 24)],
+                },
+                'outpoint': _hex(rng, 32),
+            }
+            for n in range(outputs)
+        ],
+        'hex': _hex(rng, 120 + 150 * inputs + 40 * outputs),
+    }
+
+
+def canned_payloads(block_transactions=2000, txpool_size=5000, unspent_count=2000, seed=1):
+    """
+    Build deterministic daemon results for the mock daemon.
+
+    Args:
+        block_transactions (int): Number of transactions in the verbosity 2 block.
+        txpool_size (int): Number of entries in the verbose transaction pool.
+        unspent_count (int): Number of listunspent entries.
+        seed (int): Random seed, so that payloads are identical between runs.
+
+    Returns:
+        dict: JSON-encoded results (bytes) by method.
+    """
+    rng = random.Random(seed)
+    block_hash = _hex(rng, 32)
+    transactions = [_transaction(rng) for _ in range(block_transactions)]
+    results = {
+        'getblockcount': 250000,
+        'getbestblockhash': block_hash,
+        'getconnectioncount': 8,
+        'getblock': {
+            'hash': block_hash,
+            'confirmations': 1,
+            'height': 250000,
+            'size': sum(tx['size'] for tx in transactions),
+            'txcount': block_transactions,
+            'time': 1700000000,
+            'previousblockhash': _hex(rng, 32),
+            'tx': transactions,
+        },
+        'getrawtxpool': {
+            _hex(rng, 32): {
+                'size': rng.randint(200, 2000),
+                'fee': rng.randint(200, 20000) / 100,
+                'time': 1700000000 + n,
+                'height': 250000,
+                'startingpriority': 0,
+                'currentpriority': 0,
+                'depends': [],
+                'spentby': [],
+            }
+            for n in range(txpool_size)
+        },
+        'listunspent': [
+            {
+                'txid': _hex(rng, 32),
+                'vout': rng.randint(0, 3),
+                'outpoint': _hex(rng, 32),
+                'address': 'nexa:' + _hex(rng, 24),
+                'scriptPubKey': '005114' + _hex(rng, 20),
+                'amount': rng.randint(1, 10 ** 8) / 100,
+                'confirmations': rng.randint(1, 10000),
+                'spendable': True,
+            }
+            for _ in range(unspent_count)
+        ],
+        'gettxout': {
+            'bestblock': block_hash,
+            'confirmations': 12,
+            'value': 1000.0,
+            'scriptPubKey': transactions[0]['vout'][0]['scriptPubKey'],
+            'coinbase': False,
+        },
+        'getrawtransaction': transactions[0]['hex'],
+        'getblocktemplate': {
+            'version': 0,
+            'previousblockhash': block_hash,
+            'transactions': [
+                {'data': tx['hex'], 'txid': tx['txid'], 'hash': tx['hash'], 'fee': 100, 'sigops': 2}
+                for tx in transactions[:500]
+            ],
+            'coinbasevalue': 1000000000,
+            'target': '0' * 8 + 'f' * 56,
+            'mintime': 1700000000,
+            'curtime': 1700000600,
+            'bits': '1d00ffff',
+            'height': 250001,
+        },
+    }
+    return {method: json.dumps(result).encode() for method, result in results.items()}
+
+
+class MockDaemon:
+    """
+    Local aiohttp JSON-RPC server answering with canned payloads.
+
+    Results are serialized once, so that the server spends as little time
+    per request as possible and does not skew client measurements.
+
+    Attributes:
+        payloads (dict): JSON-encoded results (bytes) by method.
+        latency (float): Artificial delay before each response in seconds.
+        port (int): Listening port, known after start().
+    """
+
+    def __init__(self, payloads=None, latency=0.0):
+        """
+        Initialize the MockDaemon instance.
+
+        Args:
+            payloads (dict): JSON-encoded results by method (default is canned_payloads()).
+            latency (float): Artificial delay before each response in seconds (default is 0.0).
+        """
+        self.payloads = canned_payloads() if payloads is None else payloads
+        self.latency = latency
+        self.port = None
+        self._runner = None
+
+    def _response(self, request):
+        request_id = json.dumps(request.get('id')).encode()
+        result = self.payloads.get(request.get('method'))
+        if result is None:
+            return (
+                b'{"result":null,"error":{"code":-32601,"message":"Method not found"},"id":' + request_id + b'}'
+            )
+        return b'{"result":' + result + b',"error":null,"id":' + request_id + b'}'
+
+    async def _handle(self, request):
+        data = json.loads(await request.read())
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(data, list):
+            body = b'[' + b','.join(self._response(item) for item in data) + b']'
+        else:
+            body = self._response(data)
+        return web.Response(body=body, content_type='application/json')
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Start listening.
+
+        Args:
+            host (str): Listening host (default is '127.0.0.1').
+            port (int): Listening port, 0 to pick a free one (default is 0).
+
+        Returns:
+            int: Listening port.
+        """
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post('/', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self):
+        """
+        Stop the server.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+
+def serve(host='127.0.0.1', port=0, latency=0.0, ready=None):
+    """
+    Run a MockDaemon until the process is terminated.
+
+    Args:
+        host (str): Listening host (default is '127.0.0.1').
+        port (int): Listening port, 0 to pick a free one (default is 0).
+        latency (float): Artificial delay before each response in seconds (default is 0.0).
+        ready: multiprocessing Connection to send the listening port to (optional).
+    """
+    async def main():
+        daemon = MockDaemon(latency=latency)
+        listening = await daemon.start(host, port)
+        if ready is not None:
+            ready.send(listening)
+        else:
+            print(f'Mock daemon listening on {host}:{listening}', flush=True)
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+if __name__ == '__main__':
+    serve(port=5996)
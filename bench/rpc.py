@@ -0,0 +1,140 @@
+import asyncio
+import json
+import multiprocessing
+import platform
+import time
+import tracemalloc
+
+import aiohttp
+
+from ..session import CoindSession
+from .mockd import serve
+
+SCENARIOS = {
+    'scalar': lambda coind: coind.blockchain.get_block_count(),
+    'block': lambda coind: coind.blockchain.get_block(250000, 2),
+    'txpool': lambda coind: coind.blockchain.get_raw_tx_pool(True),
+    'listunspent': lambda coind: coind.wallet.list_unspent(),
+    'bestblockhash': lambda coind: coind.blockchain.get_best_block_hash(),
+    'gettxout': lambda coind: coind.blockchain.get_tx_out('00' * 32, 0),
+}
+
+# Scenarios with small payloads, measured with the larger number of calls.
+SMALL_SCENARIOS = ('scalar', 'bestblockhash', 'gettxout')
+
+
+def percentile(sorted_values, fraction):
+    """
+    Return a percentile of sorted values (nearest rank).
+
+    Args:
+        sorted_values (list): Sorted values.
+        fraction (float): Percentile as a fraction, e.g. 0.99.
+    """
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def _drive(coind, call, concurrency, calls):
+    latencies = []
+    remaining = calls
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter_ns()
+            await call(coind)
+            latencies.append(time.perf_counter_ns() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def _measure(port, call, concurrency, calls, memory_calls, transport=None):
+    transport = None if transport is None else transport()
+    async with CoindSession('bench', 'bench', port, transport=transport) as coind:
+        # Warm up the connection pool before measuring.
+        await _drive(coind, call, concurrency, concurrency)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        latencies = await _drive(coind, call, concurrency, calls)
+        cpu = time.process_time() - cpu
+        wall = time.perf_counter() - wall
+
+        # tracemalloc slows allocations down, so memory is measured in a separate pass.
+        tracemalloc.start()
+        try:
+            await _drive(coind, call, concurrency, memory_calls)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'calls': calls,
+        'calls_per_sec': calls / wall,
+        'p50_us': percentile(latencies, 0.50) / 1e3,
+        'p99_us': percentile(latencies, 0.99) / 1e3,
+        'cpu_us_per_call': cpu / calls * 1e6,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def run(
+        scenarios=('scalar', 'block', 'txpool', 'listunspent'),
+        concurrency_levels=(1, 8, 64),
+        calls=2000,
+        heavy_calls=100,
+        memory_calls=None,
+        transport=None
+):
+    """
+    Benchmark client calls against a mock daemon in a child process.
+
+    Running the daemon in its own process keeps its CPU time and memory
+    out of the client figures.
+
+    Args:
+        scenarios (tuple): Scenario names from SCENARIOS.
+        concurrency_levels (tuple): Numbers of concurrent callers.
+        calls (int): Number of calls per measurement for small scenarios.
+        heavy_calls (int): Number of calls per measurement for the other scenarios.
+        memory_calls (int): Number of calls in the memory pass (default is a tenth of the calls).
+        transport (callable): Factory of the Transport to benchmark (default is the AIOHTTP transport).
+
+    Returns:
+        dict: Environment description and one result dict per scenario and concurrency level.
+    """
+    parent, child = multiprocessing.Pipe()
+    daemon = multiprocessing.Process(target=serve, kwargs={'ready': child}, daemon=True)
+    daemon.start()
+    try:
+        port = parent.recv()
+        results = []
+        for name in scenarios:
+            count = calls if name in SMALL_SCENARIOS else heavy_calls
+            for concurrency in concurrency_levels:
+                result = asyncio.run(_measure(
+                    port,
+                    SCENARIOS[name],
+                    concurrency,
+                    count,
+                    memory_calls or max(concurrency, count // 10),
+                    transport,
+                ))
+                results.append({'scenario': name, 'concurrency': concurrency, **result})
+    finally:
+        daemon.terminate()
+        daemon.join()
+    return {
+        'python': platform.python_version(),
+        'aiohttp': aiohttp.__version__,
+        'results': results,
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
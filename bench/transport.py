@@ -0,0 +1,45 @@
+import json
+
+from ..keepalive import KeepAliveTransport
+from .rpc import SMALL_SCENARIOS
+from .rpc import run as run_rpc
+
+TRANSPORTS = {
+    'aiohttp': None,
+    'keepalive': KeepAliveTransport,
+}
+
+
+def run(scenarios=SMALL_SCENARIOS + ('block',), concurrency_levels=(1, 8, 64), calls=3000, heavy_calls=100):
+    """
+    Compare the AIOHTTP transport with KeepAliveTransport on the mock daemon.
+
+    Args:
+        scenarios (tuple): Scenario names from bench.rpc.SCENARIOS.
+        concurrency_levels (tuple): Numbers of concurrent callers.
+        calls (int): Number of calls per measurement for small scenarios.
+        heavy_calls (int): Number of calls per measurement for the other scenarios.
+
+    Returns:
+        dict: Results per transport and the keepalive to aiohttp throughput ratio
+        per scenario and concurrency level.
+    """
+    results = {
+        name: run_rpc(scenarios, concurrency_levels, calls, heavy_calls, transport=factory)
+        for name, factory in TRANSPORTS.items()
+    }
+    baseline = {(r['scenario'], r['concurrency']): r for r in results['aiohttp']['results']}
+    speedup = [
+        {
+            'scenario': r['scenario'],
+            'concurrency': r['concurrency'],
+            'calls_per_sec_ratio': r['calls_per_sec'] / baseline[r['scenario'], r['concurrency']]['calls_per_sec'],
+            'cpu_per_call_ratio': r['cpu_us_per_call'] / baseline[r['scenario'], r['concurrency']]['cpu_us_per_call'],
+        }
+        for r in results['keepalive']['results']
+    ]
+    return {'transports': results, 'keepalive_vs_aiohttp': speedup}
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -66,10 +66,14 @@ class CoindImplementation(Coind):
         util (Util): Экземпляр модуля Util.
         wallet (Wallet): Экземпляр модуля Wallet.
         zmq (Zmq): Экземпляр модуля Zmq.
+        heavy_session (ClientSession): Отдельная AIOHTTP-сессия для долгих вызовов (опционально).
+        route (callable): Функция (метод, параметры) -> имя группы или None, определяющая долгие вызовы.
     """
 
-    def __init__(self, http_provider, session):
+    def __init__(self, http_provider, session, heavy_session=None, route=None):
         super().__init__(http_provider, session)
+        self.heavy_session = heavy_session
+        self.route = route
         self.blockchain = Blockchain(self)
         self.control = Control(self)
         self.generating = Generating(self)
@@ -93,4 +97,28 @@ class CoindImplementation(Coind):
         """
         if params is None:
             params = []
-        return await self.provider.request(method, params, session=self.session)
+        if self.provider.rate_limiter is not None:
+            await self.provider.rate_limiter.acquire(method, params)
+        session = self.session
+        if self.heavy_session is not None and self.route(method, params) is not None:
+            session = self.heavy_session
+        return await self.provider.request(method, params, session=session)
+
+    async def fetch_batch(self, calls):
+        """
+        Получает данные от Coind одним пакетным запросом.
+
+        Args:
+            calls (list): Список пар (метод, параметры).
+
+        Returns:
+            list: Результаты (или экземпляры CoindError) в порядке вызовов.
+        """
+        calls = [(method, [] if params is None else params) for method, params in calls]
+        if self.provider.rate_limiter is not None:
+            for method, params in calls:
+                await self.provider.rate_limiter.acquire(method, params)
+        session = self.session
+        if self.heavy_session is not None and any(self.route(method, params) is not None for method, params in calls):
+            session = self.heavy_session
+        return await self.provider.request_batch(calls, session=session)
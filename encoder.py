@@ -0,0 +1,86 @@
+import itertools
+import json
+
+_encode_params = json.JSONEncoder(separators=(',', ':')).encode
+
+
+class RequestEncoder:
+    """
+    JSON-RPC request encoder with cached per-method prefixes.
+
+    The '{"method":...,"params":' prefix is encoded once per method, and
+    empty parameter lists are not serialized at all, so a request body is
+    built with a single bytes formatting operation plus the encoding of
+    non-empty params.
+
+    Request ids come from itertools.count, whose next() is atomic, so one
+    encoder can be shared by concurrent tasks and threads.
+
+    Attributes:
+        max_methods (int): Maximum number of cached method prefixes.
+    """
+
+    def __init__(self, max_methods=1024):
+        """
+        Initialize the RequestEncoder instance.
+
+        Args:
+            max_methods (int): Maximum number of cached method prefixes (default is 1024).
+        """
+        self.max_methods = max_methods
+        self._ids = itertools.count(1)
+        self._prefixes = {}
+
+    def next_id(self):
+        """
+        Return a new request id.
+        """
+        return next(self._ids)
+
+    def _prefix(self, method):
+        prefix = self._prefixes.get(method)
+        if prefix is None:
+            prefix = b'{"method":' + json.dumps(method).encode() + b',"params":'
+            if len(self._prefixes) < self.max_methods:
+                self._prefixes[method] = prefix
+        return prefix
+
+    def encode(self, method, params):
+        """
+        Encode a request.
+
+        Args:
+            method (str): Coind method.
+            params (list): Method parameters.
+
+        Returns:
+            tuple: Request id and the encoded body (bytes).
+        """
+        request_id = next(self._ids)
+        return request_id, b'%s%s,"id":%d,"jsonrpc":"2.0"}' % (
+            self._prefix(method),
+            _encode_params(params).encode() if params else b'[]',
+            request_id,
+        )
+
+    def encode_batch(self, calls):
+        """
+        Encode a batch request.
+
+        Args:
+            calls (list): List of (method, params) pairs.
+
+        Returns:
+            tuple: List of request ids in the order of calls and the encoded body (bytes).
+        """
+        ids = []
+        items = []
+        for method, params in calls:
+            request_id = next(self._ids)
+            ids.append(request_id)
+            items.append(b'%s%s,"id":%d,"jsonrpc":"2.0"}' % (
+                self._prefix(method),
+                _encode_params(params).encode() if params else b'[]',
+                request_id,
+            ))
+        return ids, b'[' + b','.join(items) + b']'
@@ -0,0 +1,188 @@
+import logging
+from time import perf_counter_ns
+
+from aiohttp import TraceConfig
+
+logger = logging.getLogger(__name__)
+
+EVENTS = (
+    'request_start',
+    'connection_acquired',
+    'request_sent',
+    'first_byte',
+    'decode_done',
+    'request_end',
+)
+
+
+class RequestTrace:
+    """
+    Timings and sizes of a single Coind request.
+
+    Timestamps are perf_counter_ns() values, or None if the stage was not
+    reached. The same object is passed to every hook of the request, so
+    hooks may attach their own data (e.g. a span) to the context attribute.
+
+    Attributes:
+        method (str): Coind method, or 'batch' for batch requests.
+        id (int): JSON-RPC request ID (the first ID for batch requests).
+        request_bytes (int): Request body size.
+        response_bytes (int): Response body size.
+        start_ns (int): Request start.
+        connection_ns (int): Connection taken from the pool or created.
+        sent_ns (int): Request body written to the connection.
+        first_byte_ns (int): Response headers received.
+        received_ns (int): Response body received.
+        decoded_ns (int): Response JSON decoded.
+        end_ns (int): Request end.
+        error: CoindError code or exception name if the request failed.
+        context: Free slot for hook data.
+    """
+
+    __slots__ = (
+        'method', 'id', 'request_bytes', 'response_bytes',
+        'start_ns', 'connection_ns', 'sent_ns', 'first_byte_ns',
+        'received_ns', 'decoded_ns', 'end_ns', 'error', 'context',
+    )
+
+    def __init__(self, method, request_id, request_bytes):
+        self.method = method
+        self.id = request_id
+        self.request_bytes = request_bytes
+        self.response_bytes = 0
+        self.start_ns = perf_counter_ns()
+        self.connection_ns = None
+        self.sent_ns = None
+        self.first_byte_ns = None
+        self.received_ns = None
+        self.decoded_ns = None
+        self.end_ns = None
+        self.error = None
+        self.context = None
+
+    def timings(self):
+        """
+        Return stage durations in nanoseconds.
+
+        Returns:
+            dict: pool_wait, send, server, receive, decode and total durations;
+            stages that were not reached are None.
+        """
+        def span(begin, end):
+            if begin is None or end is None:
+                return None
+            return end - begin
+
+        return {
+            'pool_wait': span(self.start_ns, self.connection_ns),
+            'send': span(self.connection_ns, self.sent_ns),
+            'server': span(self.sent_ns, self.first_byte_ns),
+            'receive': span(self.first_byte_ns, self.received_ns),
+            'decode': span(self.received_ns, self.decoded_ns),
+            'total': span(self.start_ns, self.end_ns),
+        }
+
+
+class Hooks:
+    """
+    Request lifecycle hooks for tracing and profiling.
+
+    Hooks are plain callables taking a RequestTrace; they are called inline
+    and should not block. Events, in order: request_start,
+    connection_acquired, request_sent, first_byte, decode_done, request_end.
+    request_end is always called, also when the request failed. The
+    request_sent callbacks run when the response starts, since only then
+    is the body known to be fully written; sent_ns holds the actual time.
+    Exceptions raised by callbacks are logged and do not affect the request.
+
+    When no Hooks instance is given to CoindSession, or it has no
+    callbacks, requests take the same path as before and pay nothing for
+    this feature.
+
+    Attributes:
+        handlers (dict): Lists of callbacks by event name.
+    """
+
+    def __init__(self):
+        """
+        Initialize the Hooks instance.
+        """
+        self.handlers = {event: [] for event in EVENTS}
+
+    def on(self, event, callback=None):
+        """
+        Register a callback for an event.
+
+        Can be used as a decorator when callback is omitted.
+
+        Args:
+            event (str): Event name.
+            callback (callable): Function taking a RequestTrace.
+
+        Returns:
+            The callback.
+
+        Raises:
+            ValueError: If the event is unknown.
+        """
+        if event not in self.handlers:
+            raise ValueError(f'Unknown hook event: {event}')
+        if callback is None:
+            return lambda func: self.on(event, func)
+        self.handlers[event].append(callback)
+        return callback
+
+    def remove(self, event, callback):
+        """
+        Unregister a callback.
+
+        Args:
+            event (str): Event name.
+            callback (callable): Registered callback.
+        """
+        self.handlers[event].remove(callback)
+
+    def __bool__(self):
+        """
+        Return True if any callback is registered.
+        """
+        return any(self.handlers.values())
+
+    def emit(self, event, trace):
+        """
+        Call the callbacks of an event, logging their exceptions.
+
+        Args:
+            event (str): Event name.
+            trace (RequestTrace): Request trace.
+        """
+        for callback in self.handlers[event]:
+            try:
+                callback(trace)
+            except Exception:
+                logger.exception('Hook %r for %s failed', callback, event)
+
+    def trace_config(self):
+        """
+        Create an AIOHTTP TraceConfig reporting connection and send events.
+
+        Returns:
+            TraceConfig: Trace config for the client session.
+        """
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection)
+        trace_config.on_connection_reuseconn.append(self._on_connection)
+        trace_config.on_request_chunk_sent.append(self._on_chunk_sent)
+        return trace_config
+
+    async def _on_connection(self, session, context, params):
+        trace = context.trace_request_ctx
+        if isinstance(trace, RequestTrace):
+            trace.connection_ns = perf_counter_ns()
+            self.emit('connection_acquired', trace)
+
+    async def _on_chunk_sent(self, session, context, params):
+        # request_sent is emitted with the response headers, once the last chunk is known.
+        trace = context.trace_request_ctx
+        if isinstance(trace, RequestTrace):
+            trace.sent_ns = perf_counter_ns()
@@ -1,7 +1,14 @@
+import asyncio
 import json
+from time import perf_counter_ns
+
 from aiohttp import ClientSession
 
+from .encoder import RequestEncoder
 from .exceptions import CoindError
+from .hooks import RequestTrace
+from .limiter import WORK_QUEUE_FULL
+from .transport import AiohttpTransport
 
 
 class HttpProvider:
@@ -10,16 +17,43 @@ class HttpProvider:
 
     Attributes:
         client (HttpClient): HTTP client for making requests.
+        rate_limiter (RateLimiter): Rate limits applied by CoindImplementation.fetch, or None.
     """
 
-    def __init__(self, url):
+    def __init__(self, url, metrics=None, hooks=None, transport=None, limiter=None, rate_limiter=None):
         """
         Initialize the HttpProvider instance.
 
         Args:
             url (str): URL of the Coind server.
+            metrics (Metrics): Call metrics (default is None).
+            hooks (Hooks): Request lifecycle hooks (default is None).
+            transport (Transport): Transport for request bodies (default is AiohttpTransport).
+            limiter (AdaptiveLimiter): Concurrency limiter for the endpoint (default is None).
+            rate_limiter (RateLimiter): Per-method rate limits (default is None).
+        """
+        self.client = HttpClient(url, metrics, hooks, transport, limiter)
+        self.rate_limiter = rate_limiter
+
+    def new_session(self, **kwargs):
+        """
+        Create an AIOHTTP client session suitable for this provider.
+
+        Args:
+            **kwargs: ClientSession arguments, e.g. connector or timeout.
+
+        Returns:
+            ClientSession: Client session, traced when hooks are enabled.
+        """
+        if self.client.hooks is not None:
+            kwargs['trace_configs'] = [self.client.hooks.trace_config()]
+        return ClientSession(**kwargs)
+
+    async def close(self):
+        """
+        Close the transport.
         """
-        self.client = HttpClient(url)
+        await self.client.transport.close()
 
     async def request(self, method, params, session=None):
         """
@@ -28,13 +62,33 @@ class HttpProvider:
         Args:
             method (str): Coind method.
             params (list): Method parameters.
-            session (ClientSession): AIOHTTP client session.
+            session (ClientSession): AIOHTTP client session; when omitted, a temporary
+                session is created if the transport needs one.
 
         Returns:
             Result of the Coind request.
         """
-        async with ClientSession() as new_session:
-            return await self.client.request(method, params, session or new_session)
+        if session is not None or not self.client.transport.needs_session:
+            return await self.client.request(method, params, session)
+        async with self.new_session() as new_session:
+            return await self.client.request(method, params, new_session)
+
+    async def request_batch(self, calls, session=None):
+        """
+        Make a JSON-RPC batch request to Coind.
+
+        Args:
+            calls (list): List of (method, params) pairs.
+            session (ClientSession): AIOHTTP client session; when omitted, a temporary
+                session is created if the transport needs one.
+
+        Returns:
+            List of results in the order of calls.
+        """
+        if session is not None or not self.client.transport.needs_session:
+            return await self.client.request_batch(calls, session)
+        async with self.new_session() as new_session:
+            return await self.client.request_batch(calls, new_session)
 
 
 class HttpClient:
@@ -43,18 +97,31 @@ class HttpClient:
 
     Attributes:
         url (str): URL of the Coind server.
-        id (int): Request ID counter.
+        encoder (RequestEncoder): Request encoder holding the request ID counter.
+        metrics (Metrics): Call metrics, or None when disabled.
+        hooks (Hooks): Request lifecycle hooks, or None when disabled.
+        transport (Transport): Transport for request bodies.
+        limiter (AdaptiveLimiter): Concurrency limiter, or None when disabled.
     """
 
-    def __init__(self, url):
+    def __init__(self, url, metrics=None, hooks=None, transport=None, limiter=None):
         """
         Initialize the HttpClient instance.
 
         Args:
             url (str): URL of the Coind server.
+            metrics (Metrics): Call metrics (default is None).
+            hooks (Hooks): Request lifecycle hooks (default is None).
+            transport (Transport): Transport for request bodies (default is AiohttpTransport).
+            limiter (AdaptiveLimiter): Concurrency limiter (default is None).
         """
         self.url = url
-        self.id = 0
+        self.encoder = RequestEncoder()
+        self.metrics = metrics
+        self.hooks = hooks
+        self.transport = AiohttpTransport() if transport is None else transport
+        self.transport.bind(url, hooks)
+        self.limiter = limiter
 
     async def request(self, method, params, session):
         """
@@ -71,23 +138,107 @@ class HttpClient:
         Raises:
             CoindError: If the Coind request returns an error.
         """
-        self.id += 1
-        data = {
-            'method': method,
-            'params': params,
-            'id': self.id,
-            'jsonrpc': '2.0',
-        }
-        async with session.post(
-            self.url,
-            headers={'Content-Type': 'application/json'},
-            data=json.dumps(data),
-        ) as resp:
-            json_obj = await resp.json()
-            if json_obj.get('error', None):
-                raise CoindError(
-                    json_obj['error']['code'],
-                    json_obj['error']['message'],
-                )
+        request_id, body = self.encoder.encode(method, params)
+        if self.metrics is None and not self.hooks and self.limiter is None:
+            return self._result(json.loads(await self.transport.post(body, session)))
+        return await self._observe(method, request_id, body, session, self._result)
+
+    async def _observe(self, method, request_id, body, session, handle):
+        # Slow path of request() and request_batch() used when metrics, hook callbacks or the limiter are enabled.
+        hooks = self.hooks
+        limiter = self.limiter
+        acquired = None
+        timed_out = False
+        trace = None
+        if hooks:
+            trace = RequestTrace(method, request_id, len(body))
+            hooks.emit('request_start', trace)
+        stats = None
+        if self.metrics is not None:
+            stats = self.metrics.begin(method)
+        start = perf_counter_ns()
+        raw = b''
+        error = None
+        try:
+            if limiter is not None:
+                await limiter.acquire()
+                acquired = perf_counter_ns()
+            raw = await self.transport.post(body, session, trace)
+            json_obj = json.loads(raw)
+            if trace is not None:
+                trace.decoded_ns = perf_counter_ns()
+                hooks.emit('decode_done', trace)
+            return handle(json_obj)
+        except CoindError as e:
+            error = e.code
+            raise
+        except BaseException as e:
+            error = type(e).__name__
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            raise
+        finally:
+            end = perf_counter_ns()
+            if acquired is not None:
+                if error == WORK_QUEUE_FULL or timed_out:
+                    limiter.release(method, overloaded=True)
+                elif error is None or isinstance(error, int):
+                    limiter.release(method, (end - acquired) / 1e9)
+                else:
+                    limiter.release(method)
+            if stats is not None:
+                self.metrics.end(stats, end - start, len(body), len(raw), error)
+            if trace is not None:
+                trace.end_ns = end
+                trace.response_bytes = len(raw)
+                trace.error = error
+                hooks.emit('request_end', trace)
+
+    @staticmethod
+    def _result(json_obj):
+        if json_obj.get('error', None):
+            raise CoindError(
+                json_obj['error']['code'],
+                json_obj['error']['message'],
+            )
+        else:
+            return json_obj['result']
+
+    async def request_batch(self, calls, session):
+        """
+        Make a JSON-RPC batch request to Coind.
+
+        All calls are sent in a single HTTP request. Errors of individual
+        calls are not raised but returned in place of their result, so that
+        a single failed item does not discard the whole batch.
+
+        Args:
+            calls (list): List of (method, params) pairs.
+            session (ClientSession): AIOHTTP client session.
+
+        Returns:
+            list: Results (or CoindError instances) in the order of calls.
+        """
+        if not calls:
+            return []
+        ids, body = self.encoder.encode_batch(calls)
+        if self.metrics is None and not self.hooks and self.limiter is None:
+            json_obj = json.loads(await self.transport.post(body, session))
+        else:
+            json_obj = await self._observe('batch', ids[0], body, session, lambda obj: obj)
+        if isinstance(json_obj, dict):
+            # The daemon rejected the batch as a whole.
+            error = json_obj.get('error') or {'code': None, 'message': 'Invalid batch response'}
+            raise CoindError(error['code'], error['message'])
+        positions = {request_id: index for index, request_id in enumerate(ids)}
+        results = [None] * len(calls)
+        for item in json_obj:
+            index = positions.get(item.get('id'))
+            if index is None:
+                # An item without a known id, e.g. a parse error answered with id null.
+                error = item.get('error') or {'code': None, 'message': 'Invalid batch response'}
+                raise CoindError(error['code'], error['message'])
+            if item.get('error', None):
+                results[index] = CoindError(item['error']['code'], item['error']['message'])
             else:
-                return json_obj['result']
+                results[index] = item['result']
+        return results
@@ -0,0 +1,235 @@
+import asyncio
+from base64 import b64encode
+from collections import deque
+from time import perf_counter_ns
+from urllib.parse import unquote, urlsplit
+
+from .exceptions import CoindError
+from .transport import Transport
+
+
+class _Connection(asyncio.Protocol):
+    # One keep-alive HTTP/1.1 connection carrying one request at a time.
+
+    def __init__(self):
+        self.transport = None
+        self.closed = False
+        self.waiter = None
+        self._buffer = bytearray()
+        self._head = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.closed = True
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_exception(exc or ConnectionResetError('Connection closed by Coind'))
+
+    def data_received(self, data):
+        self._buffer += data
+        if self.waiter is None or self.waiter.done():
+            return
+        if self._head is None:
+            end = self._buffer.find(b'\r\n\r\n')
+            if end < 0:
+                return
+            try:
+                self._head = self._parse_head(end)
+            except ValueError as e:
+                self.waiter.set_exception(ConnectionError(f'Invalid HTTP response: {e}'))
+                self.transport.abort()
+                return
+        start, length, status, content_type, keep_alive = self._head
+        if len(self._buffer) < start + length:
+            return
+        body = bytes(self._buffer[start:start + length])
+        del self._buffer[:start + length]
+        self._head = None
+        self.waiter.set_result((status, content_type, body, keep_alive))
+
+    def _parse_head(self, end):
+        lines = self._buffer[:end].decode('latin-1').split('\r\n')
+        status = int(lines[0].split(' ', 2)[1])
+        length = None
+        content_type = ''
+        keep_alive = lines[0].startswith('HTTP/1.1')
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'content-type':
+                content_type = value.split(';', 1)[0].strip().lower()
+            elif name == 'connection':
+                keep_alive = value.strip().lower() == 'keep-alive'
+        if length is None:
+            raise ValueError('missing Content-Length')
+        return end + 4, length, status, content_type, keep_alive
+
+
+class KeepAliveTransport(Transport):
+    """
+    Minimal HTTP/1.1 transport on asyncio protocols with a keep-alive pool.
+
+    The request line and all headers, including the Authorization header
+    built from the URL, are encoded once; a request is that prefix, the
+    Content-Length value and the body written straight to a pooled socket.
+    Responses are framed by Content-Length only, which is what Coind sends
+    for JSON-RPC replies.
+
+    The AIOHTTP session passed by the client is not used, so per-call
+    session routing (e.g. the heavy call pool) does not apply.
+
+    Attributes:
+        pool_size (int): Maximum number of connections.
+        timeout (float): Timeout of a single request in seconds, or None.
+    """
+
+    needs_session = False
+
+    def __init__(self, pool_size=32, timeout=300.0):
+        """
+        Initialize the KeepAliveTransport instance.
+
+        Args:
+            pool_size (int): Maximum number of connections (default is 32).
+            timeout (float): Timeout of a single request in seconds, or None (default is 300.0).
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._host = None
+        self._port = None
+        self._prefix = None
+        self._idle = deque()
+        self._waiters = deque()
+        self._connections = 0
+        self._connecting = set()
+
+    def bind(self, url, hooks=None):
+        super().bind(url, hooks)
+        parts = urlsplit(url)
+        self._host = parts.hostname
+        self._port = parts.port or 80
+        headers = [
+            f'POST {parts.path or "/"} HTTP/1.1',
+            f'Host: {parts.hostname}:{self._port}',
+        ]
+        if parts.username is not None:
+            credentials = f'{unquote(parts.username)}:{unquote(parts.password or "")}'
+            headers.append(f'Authorization: Basic {b64encode(credentials.encode()).decode()}')
+        headers.append('Content-Type: application/json')
+        headers.append('Connection: keep-alive')
+        headers.append('Content-Length: ')
+        self._prefix = '\r\n'.join(headers).encode('latin-1')
+
+    async def _acquire(self):
+        while self._idle:
+            connection = self._idle.pop()
+            if not connection.closed:
+                return connection
+            self._connections -= 1
+        if self._connections >= self.pool_size:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                return await waiter
+            except BaseException:
+                if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                    self._release(waiter.result(), True)
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        self._connections += 1
+        try:
+            _, connection = await asyncio.get_running_loop().create_connection(_Connection, self._host, self._port)
+        except BaseException:
+            self._connections -= 1
+            self._wake()
+            raise
+        return connection
+
+    def _release(self, connection, reusable):
+        if not reusable or connection.closed:
+            if not connection.closed:
+                connection.transport.close()
+                connection.closed = True
+            self._connections -= 1
+            self._wake()
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(connection)
+                return
+        self._idle.append(connection)
+
+    def _wake(self):
+        # A connection slot became free: let the first waiter open a new connection.
+        while self._waiters and self._connections < self.pool_size:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._connections += 1
+                task = asyncio.ensure_future(self._connect_for(waiter))
+                self._connecting.add(task)
+                task.add_done_callback(self._connecting.discard)
+                return
+
+    async def _connect_for(self, waiter):
+        try:
+            _, connection = await asyncio.get_running_loop().create_connection(_Connection, self._host, self._port)
+        except Exception as e:
+            self._connections -= 1
+            if not waiter.done():
+                waiter.set_exception(e)
+            self._wake()
+            return
+        if waiter.done():
+            self._release(connection, True)
+        else:
+            waiter.set_result(connection)
+
+    async def post(self, body, session, trace=None):
+        if isinstance(body, str):
+            body = body.encode()
+        connection = await self._acquire()
+        if trace is not None:
+            trace.connection_ns = perf_counter_ns()
+            self.hooks.emit('connection_acquired', trace)
+        loop = asyncio.get_running_loop()
+        waiter = connection.waiter = loop.create_future()
+        timer = None
+        if self.timeout is not None:
+            timer = loop.call_later(self.timeout, self._expire, connection, waiter)
+        reusable = False
+        try:
+            connection.transport.write(self._prefix + str(len(body)).encode() + b'\r\n\r\n' + body)
+            if trace is not None:
+                trace.sent_ns = perf_counter_ns()
+                self.hooks.emit('request_sent', trace)
+            status, content_type, raw, reusable = await waiter
+        finally:
+            if timer is not None:
+                timer.cancel()
+            connection.waiter = None
+            self._release(connection, reusable)
+        if trace is not None:
+            trace.first_byte_ns = trace.received_ns = perf_counter_ns()
+            self.hooks.emit('first_byte', trace)
+        if status >= 400 and content_type != 'application/json':
+            raise CoindError(status, raw.decode(errors='replace').strip())
+        return raw
+
+    @staticmethod
+    def _expire(connection, waiter):
+        if not waiter.done():
+            waiter.set_exception(asyncio.TimeoutError())
+        connection.transport.abort()
+
+    async def close(self):
+        while self._idle:
+            connection = self._idle.pop()
+            if not connection.closed:
+                connection.transport.close()
+                connection.closed = True
+            self._connections -= 1
@@ -0,0 +1,170 @@
+import asyncio
+from collections import deque
+from http import HTTPStatus
+from time import monotonic
+
+# Status returned by Bitcoin-family daemons when the RPC work queue is full.
+WORK_QUEUE_FULL = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+class AdaptiveLimiter:
+    """
+    Adaptive concurrency limit for one Coind endpoint.
+
+    The limit follows AIMD driven by latency. Each latency is divided by the
+    fastest latency seen for its method and the ratio is smoothed. While the
+    smoothed ratio is within the tolerance and calls are held back by the
+    limit, the limit grows by about one per round trip. When the ratio
+    exceeds the tolerance, the limit shrinks by the shrink factor; when the
+    daemon answers 503 (work queue full) or a call times out, it is cut by
+    the backoff factor. Decreases happen at most once per round trip.
+
+    Baselines are kept per method, since a verbose getblock is slower than
+    getblockcount without any queueing, and are refreshed every
+    baseline_window samples to follow changes of the node.
+
+    Calls over the limit wait in a single FIFO queue, so no caller can
+    overtake earlier ones.
+
+    Attributes:
+        limit (float): Current concurrency limit.
+        min_limit (int): Lower bound of the limit.
+        max_limit (int): Upper bound of the limit.
+        in_flight (int): Number of calls holding a slot.
+        overloads (int): Number of overload signals received.
+    """
+
+    def __init__(
+            self,
+            initial_limit=16,
+            min_limit=1,
+            max_limit=512,
+            tolerance=2.0,
+            backoff=0.5,
+            shrink=0.9,
+            smoothing=0.1,
+            baseline_window=500
+    ):
+        """
+        Initialize the AdaptiveLimiter instance.
+
+        Args:
+            initial_limit (int): Starting limit (default is 16).
+            min_limit (int): Lower bound of the limit (default is 1).
+            max_limit (int): Upper bound of the limit (default is 512).
+            tolerance (float): Latency to baseline ratio still treated as uncongested (default is 2.0).
+            backoff (float): Factor applied on 503 or timeout (default is 0.5).
+            shrink (float): Factor applied on inflated latency (default is 0.9).
+            smoothing (float): Weight of a new sample in the smoothed latency ratio (default is 0.1).
+            baseline_window (int): Samples per method after which the baseline is refreshed (default is 500).
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.shrink = shrink
+        self.smoothing = smoothing
+        self.baseline_window = baseline_window
+        self.in_flight = 0
+        self.overloads = 0
+        self._waiters = deque()
+        self._baselines = {}
+        self._ratio = 1.0
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self):
+        """
+        Number of calls waiting for a slot.
+        """
+        return len(self._waiters)
+
+    async def acquire(self):
+        """
+        Wait for a free slot.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation; pass it on.
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def release(self, method, latency=None, overloaded=False):
+        """
+        Free a slot and adjust the limit.
+
+        Args:
+            method (str): Coind method of the call.
+            latency (float): Call latency in seconds, or None if the call failed without a signal.
+            overloaded (bool): The daemon reported overload (503) or the call timed out.
+        """
+        saturated = self.in_flight >= self.limit - 1
+        self.in_flight -= 1
+        if overloaded:
+            self._on_overload(method)
+        elif latency is not None:
+            self._on_sample(method, latency, saturated)
+        self._wake()
+
+    def _decrease(self, factor, round_trip):
+        now = monotonic()
+        if now - self._last_decrease >= max(round_trip, 0.001):
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * factor)
+
+    def _on_overload(self, method):
+        self.overloads += 1
+        baseline = self._baselines.get(method)
+        self._decrease(self.backoff, baseline[0] if baseline else 0.0)
+
+    def _on_sample(self, method, latency, saturated):
+        baseline = self._baselines.get(method)
+        if baseline is None:
+            baseline = self._baselines[method] = [latency, latency, 0]
+        # [baseline, minimum of the current window, samples in the current window]
+        if latency < baseline[0]:
+            baseline[0] = latency
+        if latency < baseline[1]:
+            baseline[1] = latency
+        baseline[2] += 1
+        if baseline[2] >= self.baseline_window:
+            baseline[0] = baseline[1]
+            baseline[1] = latency
+            baseline[2] = 0
+        ratio = latency / baseline[0] if baseline[0] > 0 else 1.0
+        self._ratio += self.smoothing * (ratio - self._ratio)
+        if self._ratio > self.tolerance:
+            self._decrease(self.shrink, latency)
+        elif saturated:
+            # Grow only when the limit is what holds calls back.
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def snapshot(self):
+        """
+        Return the limiter state as a dict.
+        """
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'queued': len(self._waiters),
+            'overloads': self.overloads,
+            'latency_ratio': self._ratio,
+        }
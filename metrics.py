@@ -0,0 +1,168 @@
+BUCKETS = 40
+BUCKET_UNIT_NS = 1 << 10
+
+
+class MethodStats:
+    """
+    Counters for a single Coind method.
+
+    Latencies are kept in log2 buckets: bucket i counts calls that took
+    at most 2**i * 1024 ns (about 2**i microseconds) and more than the
+    bound of bucket i - 1, matching the inclusive Prometheus "le" bounds.
+
+    Attributes:
+        calls (int): Number of finished calls.
+        errors (dict): Number of errors by CoindError code, or by exception name.
+        in_flight (int): Number of calls in progress.
+        latency_buckets (list): Latency histogram.
+        latency_sum_ns (int): Sum of latencies in nanoseconds.
+        request_bytes (int): Total request body size.
+        response_bytes (int): Total response body size.
+    """
+
+    __slots__ = (
+        'calls', 'errors', 'in_flight', 'latency_buckets',
+        'latency_sum_ns', 'request_bytes', 'response_bytes',
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = {}
+        self.in_flight = 0
+        self.latency_buckets = [0] * BUCKETS
+        self.latency_sum_ns = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def snapshot(self):
+        """
+        Return the counters as a dict.
+        """
+        return {
+            'calls': self.calls,
+            'errors': dict(self.errors),
+            'in_flight': self.in_flight,
+            'latency_buckets': list(self.latency_buckets),
+            'latency_sum_ns': self.latency_sum_ns,
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+        }
+
+
+class Metrics:
+    """
+    Per-method call metrics for Coind requests.
+
+    Bookkeeping is a dict lookup and a few integer updates per call, so
+    metrics can stay enabled in production.
+
+    Attributes:
+        methods (dict): MethodStats by method name.
+        gauges (dict): Functions returning gauge values by gauge name.
+    """
+
+    def __init__(self):
+        """
+        Initialize the Metrics instance.
+        """
+        self.methods = {}
+        self.gauges = {}
+
+    def gauge(self, name, func):
+        """
+        Register a gauge read when metrics are exported.
+
+        Args:
+            name (str): Gauge name without prefix, e.g. 'concurrency_limit'.
+            func (callable): Function returning the current value.
+        """
+        self.gauges[name] = func
+
+    def gauge_values(self):
+        """
+        Return the current values of all gauges as a dict.
+        """
+        return {name: func() for name, func in self.gauges.items()}
+
+    def begin(self, method):
+        """
+        Register the start of a call.
+
+        Args:
+            method (str): Coind method.
+
+        Returns:
+            MethodStats: Counters to pass to end().
+        """
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = self.methods[method] = MethodStats()
+        stats.in_flight += 1
+        return stats
+
+    @staticmethod
+    def end(stats, elapsed_ns, request_bytes, response_bytes, error=None):
+        """
+        Register the end of a call.
+
+        Args:
+            stats (MethodStats): Counters returned by begin().
+            elapsed_ns (int): Call duration in nanoseconds.
+            request_bytes (int): Request body size.
+            response_bytes (int): Response body size.
+            error: CoindError code or exception name if the call failed.
+        """
+        stats.in_flight -= 1
+        stats.calls += 1
+        stats.latency_sum_ns += elapsed_ns
+        bucket = (max(elapsed_ns - 1, 0) >> 10).bit_length()
+        stats.latency_buckets[bucket if bucket < BUCKETS else BUCKETS - 1] += 1
+        stats.request_bytes += request_bytes
+        stats.response_bytes += response_bytes
+        if error is not None:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def snapshot(self):
+        """
+        Return all counters as a dict keyed by method.
+        """
+        return {method: stats.snapshot() for method, stats in self.methods.items()}
+
+    def prometheus(self, prefix='coind_rpc'):
+        """
+        Render the metrics in Prometheus text exposition format.
+
+        Args:
+            prefix (str): Metric name prefix (default is 'coind_rpc').
+
+        Returns:
+            str: Metrics text.
+        """
+        lines = [
+            f'# TYPE {prefix}_calls_total counter',
+            f'# TYPE {prefix}_errors_total counter',
+            f'# TYPE {prefix}_in_flight gauge',
+            f'# TYPE {prefix}_request_bytes_total counter',
+            f'# TYPE {prefix}_response_bytes_total counter',
+            f'# TYPE {prefix}_latency_seconds histogram',
+        ]
+        for method, stats in sorted(self.methods.items()):
+            label = f'method="{method}"'
+            lines.append(f'{prefix}_calls_total{{{label}}} {stats.calls}')
+            for code, count in sorted(stats.errors.items(), key=lambda item: str(item[0])):
+                lines.append(f'{prefix}_errors_total{{{label},code="{code}"}} {count}')
+            lines.append(f'{prefix}_in_flight{{{label}}} {stats.in_flight}')
+            lines.append(f'{prefix}_request_bytes_total{{{label}}} {stats.request_bytes}')
+            lines.append(f'{prefix}_response_bytes_total{{{label}}} {stats.response_bytes}')
+            cumulative = 0
+            for index, count in enumerate(stats.latency_buckets[:-1]):
+                cumulative += count
+                le = (1 << index) * BUCKET_UNIT_NS / 1e9
+                lines.append(f'{prefix}_latency_seconds_bucket{{{label},le="{le:.9g}"}} {cumulative}')
+            lines.append(f'{prefix}_latency_seconds_bucket{{{label},le="+Inf"}} {stats.calls}')
+            lines.append(f'{prefix}_latency_seconds_sum{{{label}}} {stats.latency_sum_ns / 1e9:.9f}')
+            lines.append(f'{prefix}_latency_seconds_count{{{label}}} {stats.calls}')
+        for name, value in sorted(self.gauge_values().items()):
+            lines.append(f'# TYPE {prefix}_{name} gauge')
+            lines.append(f'{prefix}_{name} {value}')
+        return '\n'.join(lines) + '\n'
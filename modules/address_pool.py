@@ -0,0 +1,269 @@
+import asyncio
+import os
+from collections import deque
+from typing import Optional
+
+from ..exceptions import CoindError
+
+# Код ошибки узла "Keypool ran out".
+KEYPOOL_RAN_OUT = -12
+
+
+class AddressPool:
+    """Буфер заранее сгенерированных адресов для депозитов.
+
+    Адреса создаются в фоне параллельными вызовами getnewaddress, когда их
+    остается меньше low_watermark; при исчерпании keypool вызывается
+    keypoolrefill. Выдача адреса выполняется за O(1).
+
+    Состояние хранится в журнале, куда дописываются строки '+адрес' при
+    генерации и '-адрес' при выдаче. Журнал записывается до возврата адреса,
+    поэтому после перезапуска ни один выданный адрес не будет выдан повторно.
+    Строки генерации сбрасываются на диск один раз за пополнение, а acquire()
+    выполняет fsync в пуле потоков, не блокируя цикл событий. Журнал
+    периодически сжимается.
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        journal_path (str): Путь к журналу.
+        size (int): Целевое количество адресов в буфере.
+        low_watermark (int): Порог, ниже которого запускается пополнение.
+    """
+
+    def __init__(
+            self,
+            coind_implementation,
+            journal_path: str,
+            size: int = 1000,
+            low_watermark: Optional[int] = None,
+            concurrency: int = 8,
+            keypool_size: Optional[int] = None,
+            address_type: Optional[str] = None,
+            account: Optional[str] = None,
+            fsync: bool = True
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            journal_path (str): Путь к журналу.
+            size (int): Целевое количество адресов в буфере (по умолчанию 1000).
+            low_watermark (Optional[int]): Порог пополнения (по умолчанию size // 2).
+            concurrency (int): Количество одновременных вызовов getnewaddress (по умолчанию 8).
+            keypool_size (Optional[int]): Размер keypool для keypoolrefill (по умолчанию 2 * size).
+            address_type (Optional[str]): Тип адреса для getnewaddress (опционально).
+            account (Optional[str]): Аккаунт для getnewaddress (опционально).
+            fsync (bool): Сбрасывать журнал на диск перед выдачей адреса и после пополнения (по умолчанию True).
+        """
+        self.coind_implementation = coind_implementation
+        self.journal_path = journal_path
+        self.size = size
+        self.low_watermark = size // 2 if low_watermark is None else low_watermark
+        self.concurrency = concurrency
+        self.keypool_size = 2 * size if keypool_size is None else keypool_size
+        self.fsync = fsync
+        self._address_kwargs = {}
+        if address_type is not None:
+            self._address_kwargs['address_type'] = address_type
+        if account is not None:
+            self._address_kwargs['account'] = account
+        self._addresses = deque()
+        self._journal_lines = 0
+        self._load()
+        self._journal = open(journal_path, 'a', encoding='utf-8')
+        self._refill_lock = asyncio.Lock()
+        self._refill_needed = asyncio.Event()
+        self._available = asyncio.Event()
+        self._keypool_refill = None
+        self._refill_task = None
+        self._syncing = 0
+        self._task = None
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+    def _load(self):
+        if not os.path.exists(self.journal_path):
+            return
+        pending = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                self._journal_lines += 1
+                if line[0] == '+':
+                    pending[line[1:]] = None
+                elif line[0] == '-':
+                    pending.pop(line[1:], None)
+        self._addresses.extend(pending)
+        if self._journal_lines > len(self._addresses):
+            self._compact()
+
+    def _compact(self):
+        tmp_path = f'{self.journal_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(f'+{address}\n' for address in self._addresses)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        self._journal_lines = len(self._addresses)
+
+    def _write(self, line: str):
+        self._journal.write(line)
+        self._journal.flush()
+        self._journal_lines += 1
+
+    async def _sync(self):
+        if not self.fsync:
+            return
+        # Пока fsync выполняется в пуле потоков, журнал не переоткрывается при сжатии.
+        self._syncing += 1
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, os.fsync, self._journal.fileno())
+        finally:
+            self._syncing -= 1
+
+    def _pop(self) -> str:
+        address = self._addresses.popleft()
+        self._write(f'-{address}\n')
+        if len(self._addresses) < self.low_watermark:
+            self._refill_needed.set()
+        if not self._addresses:
+            self._available.clear()
+        return address
+
+    def acquire_nowait(self) -> str:
+        """Выдает адрес из буфера за O(1).
+
+        Запись в журнал сбрасывается на диск синхронно; в корутинах
+        предпочтительнее acquire().
+
+        Returns:
+            str: Адрес, который больше не будет выдан.
+
+        Raises:
+            IndexError: Если буфер пуст.
+        """
+        address = self._pop()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        return address
+
+    async def acquire(self) -> str:
+        """Выдает адрес, при пустом буфере ожидая пополнения.
+
+        Без запущенного фонового пополнения пополнение запускается в
+        отдельной задаче, а адрес возвращается, как только он сгенерирован.
+        При отмене во время сброса журнала адрес возвращается в буфер.
+
+        Returns:
+            str: Адрес, который больше не будет выдан.
+        """
+        while not self._addresses:
+            self._refill_needed.set()
+            if self._task is None:
+                await self._wait_refill()
+            else:
+                await self._available.wait()
+        address = self._pop()
+        try:
+            await self._sync()
+        except asyncio.CancelledError:
+            # Адрес не дошел до вызывающего: вернуть его в начало буфера.
+            self._addresses.appendleft(address)
+            self._write(f'+{address}\n')
+            self._available.set()
+            raise
+        return address
+
+    async def _wait_refill(self):
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.ensure_future(self.refill())
+            # Ошибка пополнения, завершившегося после выдачи адреса, считается полученной.
+            self._refill_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        refill = self._refill_task
+        available = asyncio.ensure_future(self._available.wait())
+        try:
+            await asyncio.wait((refill, available), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            available.cancel()
+        if not self._addresses and refill.done() and not refill.cancelled() and refill.exception():
+            raise refill.exception()
+
+    async def _new_address(self) -> str:
+        wallet = self.coind_implementation.wallet
+        try:
+            return await wallet.get_new_address(**self._address_kwargs)
+        except CoindError as e:
+            if e.code != KEYPOOL_RAN_OUT:
+                raise
+            if self._keypool_refill is None or self._keypool_refill.done():
+                # Параллельные генераторы ожидают одно и то же пополнение keypool.
+                self._keypool_refill = asyncio.ensure_future(wallet.keypool_refill(self.keypool_size))
+            await asyncio.shield(self._keypool_refill)
+            return await wallet.get_new_address(**self._address_kwargs)
+
+    async def refill(self):
+        """Пополняет буфер до целевого размера."""
+        async with self._refill_lock:
+            missing = self.size - len(self._addresses)
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def generate():
+                async with semaphore:
+                    address = await self._new_address()
+                self._write(f'+{address}\n')
+                self._addresses.append(address)
+                self._available.set()
+
+            results = await asyncio.gather(*(generate() for _ in range(missing)), return_exceptions=True)
+            await self._sync()
+            if self._journal_lines > 4 * max(self.size, len(self._addresses)) and not self._syncing:
+                self._journal.close()
+                self._compact()
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+    async def run(self):
+        """Пополняет буфер в фоне при опускании ниже порога."""
+        self._refill_needed.set()
+        while True:
+            await self._refill_needed.wait()
+            self._refill_needed.clear()
+            try:
+                await self.refill()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Повторить попытку при следующей выдаче адреса.
+                await asyncio.sleep(1.0)
+                self._refill_needed.set()
+
+    def start(self):
+        """Запускает фоновое пополнение."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """Останавливает фоновое пополнение и закрывает журнал."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            await asyncio.gather(self._refill_task, return_exceptions=True)
+            self._refill_task = None
+        self._journal.close()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
@@ -1,4 +1,8 @@
-from typing import List, Union
+import asyncio
+from typing import List, Optional, Sequence, Tuple, Union
+
+from ..exceptions import CoindError
+from .utxo import TxOutCache, TxOuts, pack_tx_outs
 
 
 class Blockchain:
@@ -159,6 +163,67 @@ class Blockchain:
         """
         return await self.coind_implementation.fetch('gettxout', [txid, n, includetxpool])
 
+    async def get_tx_outs(
+            self,
+            outpoints: Sequence[Tuple[str, int]],
+            includetxpool: bool = True,
+            cache: Optional[TxOutCache] = None,
+            batch_size: int = 500,
+            concurrency: int = 4
+    ) -> TxOuts:
+        """Проверяет набор выходов транзакций пакетными запросами gettxout.
+
+        Args:
+            outpoints (Sequence[Tuple[str, int]]): Пары (идентификатор транзакции, номер выхода).
+            includetxpool (bool): Включить выходы из пула транзакций (по умолчанию True).
+            cache (Optional[TxOutCache]): Кэш результатов, сбрасываемый при смене блока (опционально).
+            batch_size (int): Количество вызовов в одном пакетном запросе (по умолчанию 500).
+            concurrency (int): Максимальное количество одновременных пакетных запросов (по умолчанию 4).
+
+        Returns:
+            TxOuts: Суммы, подтверждения и битовая карта непотраченных выходов.
+
+        Raises:
+            CoindError: Если хотя бы один вызов gettxout завершился ошибкой.
+        """
+        results = [None] * len(outpoints)
+        pending = []
+        fetched = []
+        tip = None
+        if cache is not None:
+            tip = await cache.validate(self.coind_implementation)
+            for i, (txid, n) in enumerate(outpoints):
+                found, result = cache.get((txid, n, includetxpool))
+                if found:
+                    results[i] = result
+                else:
+                    pending.append(i)
+        else:
+            pending = range(len(outpoints))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_chunk(indexes):
+            calls = [('gettxout', [outpoints[i][0], outpoints[i][1], includetxpool]) for i in indexes]
+            async with semaphore:
+                chunk = await self.coind_implementation.fetch_batch(calls)
+            for i, result in zip(indexes, chunk):
+                if isinstance(result, CoindError):
+                    raise result
+                results[i] = result
+                fetched.append(i)
+
+        await asyncio.gather(*(
+            fetch_chunk(pending[start:start + batch_size])
+            for start in range(0, len(pending), batch_size)
+        ))
+        # Результаты кэшируются, только если за время запросов не появился новый блок.
+        if cache is not None and fetched and await cache.validate(self.coind_implementation, force=True) == tip:
+            for i in fetched:
+                txid, n = outpoints[i]
+                cache.put((txid, n, includetxpool), results[i])
+        return pack_tx_outs(results)
+
     async def get_tx_out_proof(self, txids: List[str], blockhash: str = None):
         """Возвращает доказательство наличия транзакций в блоке.
 
@@ -0,0 +1,178 @@
+import asyncio
+import inspect
+import itertools
+from typing import Callable, Iterable, Optional
+
+from ..exceptions import CoindError
+from .storage import read_json, write_json
+
+ADDRESSES = 'addresses'
+PUBKEYS = 'pubkeys'
+
+
+def _first_failure(tasks) -> Optional[BaseException]:
+    # exception() отмененной задачи сам выбрасывает CancelledError, поэтому отмену проверяем отдельно:
+    # остальные части должны завершиться и попасть в контрольную точку до выхода.
+    for task in tasks:
+        if task.cancelled():
+            return asyncio.CancelledError('Chunk import was cancelled')
+        if task.exception() is not None:
+            return task.exception()
+    return None
+
+
+class BulkImporter:
+    """Массовый импорт наблюдаемых адресов и публичных ключей с одним пересканированием.
+
+    Элементы читаются из итератора частями по chunk_size и импортируются без
+    пересканирования с ограниченным параллелизмом. После импорта всех частей
+    выполняется ровно одно пересканирование блокчейна: повторный импорт
+    последнего элемента с включенным rescan.
+
+    Номера завершенных частей сохраняются в контрольной точке, поэтому
+    прерванный импорт с тем же job_id продолжается с последней завершенной
+    части, а уже выполненное пересканирование не повторяется.
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        checkpoint_path (str): Путь к файлу контрольной точки.
+    """
+
+    def __init__(
+            self,
+            coind_implementation,
+            checkpoint_path: str,
+            chunk_size: int = 1000,
+            concurrency: int = 4,
+            progress: Optional[Callable[[dict], object]] = None
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            checkpoint_path (str): Путь к файлу контрольной точки.
+            chunk_size (int): Количество элементов в части (по умолчанию 1000).
+            concurrency (int): Количество одновременно импортируемых частей (по умолчанию 4).
+            progress (Optional[Callable[[dict], object]]): Обработчик прогресса, функция или корутина (опционально).
+        """
+        self.coind_implementation = coind_implementation
+        self.checkpoint_path = checkpoint_path
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.progress = progress
+
+    async def import_addresses(self, addresses: Iterable[str], job_id: str) -> dict:
+        """Импортирует адреса частями через importaddresses и один раз пересканирует блокчейн.
+
+        Args:
+            addresses (Iterable[str]): Адреса.
+            job_id (str): Идентификатор задания для продолжения после сбоя.
+
+        Returns:
+            dict: Итоговое состояние контрольной точки.
+        """
+        return await self._run(ADDRESSES, addresses, job_id, '')
+
+    async def import_pubkeys(self, pubkeys: Iterable[str], job_id: str, label: str = '') -> dict:
+        """Импортирует публичные ключи без пересканирования и один раз пересканирует блокчейн.
+
+        Args:
+            pubkeys (Iterable[str]): Публичные ключи в hex.
+            job_id (str): Идентификатор задания для продолжения после сбоя.
+            label (str): Метка (по умолчанию '').
+
+        Returns:
+            dict: Итоговое состояние контрольной точки.
+        """
+        return await self._run(PUBKEYS, pubkeys, job_id, label)
+
+    async def _import_chunk(self, kind: str, chunk: list, label: str):
+        wallet = self.coind_implementation.wallet
+        if kind == ADDRESSES:
+            await wallet.import_addresses('no-rescan', chunk)
+        else:
+            # У importpubkey нет пакетного варианта: вызовы части уходят одним пакетным запросом.
+            results = await self.coind_implementation.fetch_batch(
+                [('importpubkey', [pubkey, label, False]) for pubkey in chunk])
+            for result in results:
+                if isinstance(result, CoindError):
+                    raise result
+
+    async def _rescan(self, kind: str, item: str, label: str):
+        wallet = self.coind_implementation.wallet
+        if kind == ADDRESSES:
+            await wallet.import_addresses('rescan', [item])
+        else:
+            await wallet.import_pubkey(item, label, True)
+
+    async def _report(self, state: dict):
+        if self.progress is not None:
+            result = self.progress(dict(state))
+            if inspect.isawaitable(result):
+                await result
+
+    def _save(self, state: dict):
+        # Храним непрерывный префикс завершенных частей и частей, завершенных вне очереди.
+        while state['done'] in state['completed']:
+            state['completed'].remove(state['done'])
+            state['done'] += 1
+        write_json(self.checkpoint_path, state)
+
+    async def _run(self, kind: str, items: Iterable[str], job_id: str, label: str) -> dict:
+        state = read_json(self.checkpoint_path)
+        if state is None or state.get('job_id') != job_id or state.get('kind') != kind:
+            state = {
+                'job_id': job_id,
+                'kind': kind,
+                'done': 0,
+                'completed': [],
+                'items': 0,
+                'last_item': None,
+                'rescanned': False,
+            }
+        if state['rescanned']:
+            return state
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        failure = None
+
+        async def import_chunk(index: int, chunk: list):
+            async with semaphore:
+                await self._import_chunk(kind, chunk, label)
+            state['completed'].append(index)
+            state['items'] += len(chunk)
+            state['last_item'] = chunk[-1]
+            self._save(state)
+            await self._report(state)
+
+        iterator = iter(items)
+        try:
+            for index in itertools.count():
+                chunk = list(itertools.islice(iterator, self.chunk_size))
+                if not chunk:
+                    break
+                if index < state['done'] or index in state['completed']:
+                    continue
+                # Не читаем вперед больше, чем может импортироваться одновременно.
+                while len(tasks) >= self.concurrency:
+                    finished, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    failure = failure or _first_failure(finished)
+                if failure is not None:
+                    break
+                tasks.add(asyncio.ensure_future(import_chunk(index, chunk)))
+            if tasks:
+                finished, tasks = await asyncio.wait(tasks)
+                failure = failure or _first_failure(finished)
+        finally:
+            # При отмене или ошибке итератора части, импортируемые в фоне, не должны пережить вызов.
+            for task in tasks:
+                task.cancel()
+        if failure is not None:
+            raise failure
+
+        if state['last_item'] is not None:
+            await self._rescan(kind, state['last_item'], label)
+        state['rescanned'] = True
+        self._save(state)
+        await self._report(state)
+        return state
@@ -0,0 +1,298 @@
+from hashlib import sha256
+from typing import NamedTuple, Optional, Tuple
+
+CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+_CHARSET_REV = {char: index for index, char in enumerate(CHARSET)}
+_BASE58 = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+_BASE58_REV = {char: index for index, char in enumerate(_BASE58)}
+
+PUBKEY_TYPE = 0
+SCRIPT_TYPE = 1
+GROUP_TYPE = 11
+TEMPLATE_TYPE = 19
+
+TYPE_NAMES = {
+    PUBKEY_TYPE: 'pubkeyhash',
+    SCRIPT_TYPE: 'scripthash',
+    GROUP_TYPE: 'group',
+    TEMPLATE_TYPE: 'scripttemplate',
+}
+
+_HASH_SIZES = {160: 0, 192: 1, 224: 2, 256: 3, 320: 4, 384: 5, 448: 6, 512: 7}
+_HASH_SIZE_BITS = {code: bits for bits, code in _HASH_SIZES.items()}
+
+
+class Address(NamedTuple):
+    """Декодированный адрес.
+
+    Attributes:
+        prefix (str): Префикс сети ('nexa', 'nexatest', 'nexareg').
+        type (int): Тип адреса (PUBKEY_TYPE, SCRIPT_TYPE, GROUP_TYPE или TEMPLATE_TYPE).
+        payload (bytes): Хэш для pubkeyhash/scripthash, сериализованный скрипт для шаблона или идентификатор группы.
+    """
+    prefix: str
+    type: int
+    payload: bytes
+
+
+def _polymod(values) -> int:
+    c = 1
+    for d in values:
+        c0 = c >> 35
+        c = ((c & 0x07ffffffff) << 5) ^ d
+        if c0 & 0x01:
+            c ^= 0x98f2bc8e61
+        if c0 & 0x02:
+            c ^= 0x79b76d99e2
+        if c0 & 0x04:
+            c ^= 0xf33e5fb3c4
+        if c0 & 0x08:
+            c ^= 0xae2eabe2a8
+        if c0 & 0x10:
+            c ^= 0x1e4f43e470
+    return c ^ 1
+
+
+def _prefix_expand(prefix: str) -> list:
+    return [ord(char) & 0x1f for char in prefix] + [0]
+
+
+def _convert_bits(data, from_bits: int, to_bits: int, pad: bool) -> Optional[list]:
+    acc = 0
+    bits = 0
+    result = []
+    max_value = (1 << to_bits) - 1
+    for value in data:
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            result.append((acc >> bits) & max_value)
+    if pad:
+        if bits:
+            result.append((acc << (to_bits - bits)) & max_value)
+    elif bits >= from_bits or ((acc << (to_bits - bits)) & max_value):
+        return None
+    return result
+
+
+def encode(prefix: str, address_type: int, payload: bytes) -> str:
+    """Кодирует адрес в формате cashaddr.
+
+    Args:
+        prefix (str): Префикс сети.
+        address_type (int): Тип адреса.
+        payload (bytes): Содержимое адреса.
+
+    Returns:
+        str: Адрес с префиксом.
+    """
+    version = address_type << 3
+    if address_type in (PUBKEY_TYPE, SCRIPT_TYPE):
+        size_code = _HASH_SIZES.get(len(payload) * 8)
+        if size_code is None:
+            raise ValueError(f'Invalid hash size: {len(payload)}')
+        version |= size_code
+    data = _convert_bits(bytes([version]) + payload, 8, 5, True)
+    checksum = _polymod(_prefix_expand(prefix) + data + [0] * 8)
+    data += [(checksum >> 5 * (7 - i)) & 0x1f for i in range(8)]
+    return prefix + ':' + ''.join(CHARSET[d] for d in data)
+
+
+def decode(address: str, default_prefix: str = 'nexa') -> Address:
+    """Декодирует адрес в формате cashaddr.
+
+    Args:
+        address (str): Адрес с префиксом или без него.
+        default_prefix (str): Префикс для адреса без префикса (по умолчанию 'nexa').
+
+    Returns:
+        Address: Декодированный адрес.
+
+    Raises:
+        ValueError: Если адрес некорректен.
+    """
+    if address.lower() != address and address.upper() != address:
+        raise ValueError('Mixed case address')
+    address = address.lower()
+    prefix, separator, body = address.rpartition(':')
+    if not separator:
+        prefix = default_prefix
+    if not prefix or not body:
+        raise ValueError('Empty prefix or payload')
+    try:
+        data = [_CHARSET_REV[char] for char in body]
+    except KeyError:
+        raise ValueError('Invalid character') from None
+    if len(data) < 9 or _polymod(_prefix_expand(prefix) + data):
+        raise ValueError('Invalid checksum')
+    decoded = _convert_bits(data[:-8], 5, 8, False)
+    if not decoded:
+        raise ValueError('Invalid padding')
+    version = decoded[0]
+    payload = bytes(decoded[1:])
+    address_type = version >> 3
+    if address_type in (PUBKEY_TYPE, SCRIPT_TYPE):
+        if _HASH_SIZE_BITS[version & 0x07] != len(payload) * 8:
+            raise ValueError('Hash size mismatch')
+    elif address_type not in TYPE_NAMES or version & 0x07:
+        raise ValueError(f'Unknown address type: {address_type}')
+    if address_type == TEMPLATE_TYPE:
+        length, offset = _read_compact_size(payload)
+        if offset + length != len(payload):
+            raise ValueError('Template script length mismatch')
+    return Address(prefix, address_type, payload)
+
+
+def _read_compact_size(data: bytes) -> Tuple[int, int]:
+    if not data:
+        raise ValueError('Empty template script')
+    first = data[0]
+    if first < 0xfd:
+        return first, 1
+    width = {0xfd: 2, 0xfe: 4, 0xff: 8}[first]
+    if len(data) < 1 + width:
+        raise ValueError('Truncated template script length')
+    return int.from_bytes(data[1:1 + width], 'little'), 1 + width
+
+
+def script_pub_key(address: Address) -> Optional[bytes]:
+    """Возвращает scriptPubKey адреса или None для групповых адресов.
+
+    Args:
+        address (Address): Декодированный адрес.
+    """
+    if address.type == PUBKEY_TYPE:
+        return b'\x76\xa9\x14' + address.payload + b'\x88\xac'
+    if address.type == SCRIPT_TYPE:
+        return b'\xa9\x14' + address.payload + b'\x87'
+    if address.type == TEMPLATE_TYPE:
+        _, offset = _read_compact_size(address.payload)
+        return address.payload[offset:]
+    return None
+
+
+def _base58check_decode(address: str) -> Tuple[int, bytes]:
+    number = 0
+    for char in address:
+        number = number * 58 + _BASE58_REV[char]
+    raw = number.to_bytes((number.bit_length() + 7) // 8, 'big')
+    raw = b'\x00' * (len(address) - len(address.lstrip('1'))) + raw
+    body, checksum = raw[:-4], raw[-4:]
+    if len(body) < 2 or sha256(sha256(body).digest()).digest()[:4] != checksum:
+        raise ValueError('Invalid base58 checksum')
+    return body[0], body[1:]
+
+
+def _base58check_encode(version: int, payload: bytes) -> str:
+    body = bytes([version]) + payload
+    raw = body + sha256(sha256(body).digest()).digest()[:4]
+    number = int.from_bytes(raw, 'big')
+    chars = []
+    while number:
+        number, remainder = divmod(number, 58)
+        chars.append(_BASE58[remainder])
+    return '1' * (len(raw) - len(raw.lstrip(b'\x00'))) + ''.join(reversed(chars))
+
+
+class AddressCodec:
+    """Локальная проверка и преобразование адресов без RPC.
+
+    Адреса в формате cashaddr обрабатываются полностью локально. Устаревшие
+    base58-адреса обрабатываются, только если заданы их байты версии; иначе
+    методы возвращают None, и вызывающий код может обратиться к узлу.
+
+    Attributes:
+        prefix (str): Префикс сети.
+        base58_pubkey (Optional[int]): Байт версии base58 для pubkeyhash (опционально).
+        base58_script (Optional[int]): Байт версии base58 для scripthash (опционально).
+    """
+
+    def __init__(self, prefix: str = 'nexa', base58_pubkey: Optional[int] = None, base58_script: Optional[int] = None):
+        self.prefix = prefix
+        self.base58_pubkey = base58_pubkey
+        self.base58_script = base58_script
+
+    def decode(self, address: str) -> Optional[Address]:
+        """Декодирует адрес сети кодека.
+
+        Returns:
+            Optional[Address]: Адрес или None, если адрес нельзя разобрать локально.
+
+        Raises:
+            ValueError: Если адрес некорректен.
+        """
+        if ':' in address:
+            decoded = decode(address, self.prefix)
+        else:
+            try:
+                decoded = decode(address, self.prefix)
+            except ValueError:
+                if all(char in _BASE58_REV for char in address):
+                    return self._decode_base58(address)
+                raise
+        if decoded.prefix != self.prefix:
+            raise ValueError(f'Wrong network prefix: {decoded.prefix}')
+        return decoded
+
+    def _decode_base58(self, address: str) -> Optional[Address]:
+        if self.base58_pubkey is None and self.base58_script is None:
+            return None
+        try:
+            version, payload = _base58check_decode(address)
+        except KeyError:
+            raise ValueError('Invalid character') from None
+        if len(payload) != 20:
+            raise ValueError('Invalid hash size')
+        if version == self.base58_pubkey:
+            return Address(self.prefix, PUBKEY_TYPE, payload)
+        if version == self.base58_script:
+            return Address(self.prefix, SCRIPT_TYPE, payload)
+        raise ValueError(f'Unknown base58 version: {version}')
+
+    def validate(self, address: str) -> Optional[dict]:
+        """Проверяет адрес, возвращая независимые от кошелька поля validateaddress.
+
+        Args:
+            address (str): Адрес.
+
+        Returns:
+            Optional[dict]: Результат проверки или None, если нужна проверка узлом.
+        """
+        try:
+            decoded = self.decode(address)
+        except ValueError:
+            return {'isvalid': False}
+        if decoded is None:
+            return None
+        result = {
+            'isvalid': True,
+            'address': encode(decoded.prefix, decoded.type, decoded.payload),
+            'type': TYPE_NAMES[decoded.type],
+            'isscript': decoded.type == SCRIPT_TYPE,
+        }
+        script = script_pub_key(decoded)
+        if script is not None:
+            result['scriptPubKey'] = script.hex()
+        return result
+
+    def forms(self, address: str) -> Optional[dict]:
+        """Возвращает формы адреса: cashaddr и, если возможно, base58.
+
+        Args:
+            address (str): Адрес.
+
+        Returns:
+            Optional[dict]: Формы адреса или None, если нужна проверка узлом.
+
+        Raises:
+            ValueError: Если адрес некорректен.
+        """
+        decoded = self.decode(address)
+        if decoded is None:
+            return None
+        forms = {self.prefix: encode(decoded.prefix, decoded.type, decoded.payload)}
+        base58_version = {PUBKEY_TYPE: self.base58_pubkey, SCRIPT_TYPE: self.base58_script}.get(decoded.type)
+        if base58_version is not None and len(decoded.payload) == 20:
+            forms['legacy'] = _base58check_encode(base58_version, decoded.payload)
+        return forms
@@ -0,0 +1,304 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional
+
+from ..exceptions import CoindError
+
+logger = logging.getLogger(__name__)
+
+
+def _outpoint_key(utxo: dict) -> str:
+    return utxo.get('outpoint') or f"{utxo['txid']}:{utxo['vout']}"
+
+
+def _lock_output(utxo: dict) -> dict:
+    if 'outpoint' in utxo:
+        return {'outpoint': utxo['outpoint']}
+    return {'txid': utxo['txid'], 'vout': utxo['vout']}
+
+
+class Reservation:
+    """Набор выходов, зарезервированный для одной транзакции.
+
+    Attributes:
+        id (int): Идентификатор резервирования.
+        coins (List[dict]): Зарезервированные выходы из listunspent.
+        total (float): Сумма зарезервированных выходов.
+        expires (float): Момент истечения резервирования (time.monotonic()).
+    """
+
+    def __init__(self, reservation_id: int, coins: List[dict], expires: float):
+        self.id = reservation_id
+        self.coins = coins
+        self.total = sum(coin['amount'] for coin in coins)
+        self.expires = expires
+
+    @property
+    def outputs(self) -> List[dict]:
+        """Выходы в формате lockunspent и createrawtransaction."""
+        return [_lock_output(coin) for coin in self.coins]
+
+
+class CoinSelector:
+    """Выбор монет для параллельных выплат с кэшем listunspent и блокировками.
+
+    Кэш непотраченных выходов обновляется инкрементально: между полными
+    обновлениями запрашиваются только выходы с небольшим числом подтверждений,
+    а ранее виденные выходы из этого диапазона, которых больше нет в ответе,
+    удаляются из кэша. Выбор и резервирование монет выполняются без
+    переключения корутин, поэтому одну монету не получат два исполнителя.
+    Вызовы lockunspent от параллельных резервирований объединяются в пакеты;
+    резервирования снимаются при ошибке или по таймеру истечения. Монеты
+    истекшего резервирования разблокируются в узле, но снова выбираются только
+    после полного обновления кэша, начатого позже истечения; commit() после
+    истечения также отмечает их потраченными.
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        reservations (Dict[int, Reservation]): Активные резервирования.
+    """
+
+    def __init__(
+            self,
+            coind_implementation,
+            min_conf: int = 1,
+            addresses: Optional[List[str]] = None,
+            refresh_interval: float = 10.0,
+            full_refresh_interval: float = 300.0,
+            recent_conf: int = 10,
+            reservation_timeout: float = 60.0,
+            lock_batch_delay: float = 0.005
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            min_conf (int): Минимальное количество подтверждений (по умолчанию 1).
+            addresses (Optional[List[str]]): Ограничить выбор адресами (опционально).
+            refresh_interval (float): Интервал инкрементального обновления в секундах (по умолчанию 10).
+            full_refresh_interval (float): Интервал полного обновления в секундах (по умолчанию 300).
+            recent_conf (int): Максимум подтверждений при инкрементальном обновлении (по умолчанию 10).
+            reservation_timeout (float): Время жизни резервирования в секундах (по умолчанию 60).
+            lock_batch_delay (float): Время накопления пакета lockunspent в секундах (по умолчанию 0.005).
+        """
+        self.coind_implementation = coind_implementation
+        self.min_conf = min_conf
+        self.addresses = addresses
+        self.refresh_interval = refresh_interval
+        self.full_refresh_interval = full_refresh_interval
+        self.recent_conf = max(recent_conf, min_conf)
+        self.reservation_timeout = reservation_timeout
+        self.lock_batch_delay = lock_batch_delay
+        self.reservations: Dict[int, Reservation] = {}
+        self._available = {}
+        self._reserved = set()
+        self._spent = {}
+        self._timers = {}
+        self._unlocks = set()
+        self._refreshed_at = float('-inf')
+        self._full_refreshed_at = float('-inf')
+        self._refresh_lock = asyncio.Lock()
+        self._ids = itertools.count(1)
+        self._lock_batch = []
+        self._lock_flush = None
+
+    def _merge(self, utxos: List[dict], full: bool, started: float):
+        if full:
+            self._available.clear()
+            # Монеты, потраченные во время запроса, могли попасть в ответ.
+            self._spent = {key: spent_at for key, spent_at in self._spent.items() if spent_at >= started}
+        else:
+            # Выход из диапазона инкрементального запроса, которого нет в ответе, потрачен
+            # (или набрал больше recent_conf подтверждений и вернется при полном обновлении).
+            listed = {_outpoint_key(utxo) for utxo in utxos}
+            for key in [key for key, utxo in self._available.items()
+                        if utxo.get('confirmations', 0) <= self.recent_conf and key not in listed]:
+                del self._available[key]
+        for utxo in utxos:
+            if not utxo.get('spendable', True):
+                continue
+            key = _outpoint_key(utxo)
+            if key not in self._reserved and key not in self._spent:
+                self._available[key] = utxo
+
+    async def refresh(self, full: bool = False):
+        """Обновляет кэш непотраченных выходов.
+
+        Args:
+            full (bool): Выполнить полное обновление вместо инкрементального (по умолчанию False).
+        """
+        started = time.monotonic()
+        async with self._refresh_lock:
+            if self._refreshed_at >= started and (not full or self._full_refreshed_at >= started):
+                # Обновление уже выполнено другой корутиной, пока эта ждала блокировку.
+                return
+            if started - self._full_refreshed_at >= self.full_refresh_interval:
+                full = True
+            max_conf = 9999999 if full else self.recent_conf
+            utxos = await self.coind_implementation.wallet.list_unspent(self.min_conf, max_conf, self.addresses)
+            self._merge(utxos, full, started)
+            self._refreshed_at = time.monotonic()
+            if full:
+                self._full_refreshed_at = self._refreshed_at
+
+    def _select(self, amount: float) -> Optional[List[dict]]:
+        selected = []
+        total = 0.0
+        for utxo in sorted(self._available.values(), key=lambda coin: coin['amount'], reverse=True):
+            selected.append(utxo)
+            total += utxo['amount']
+            if total >= amount:
+                return selected
+        return None
+
+    async def _flush_locks(self):
+        await asyncio.sleep(self.lock_batch_delay)
+        batch, self._lock_batch = self._lock_batch, []
+        self._lock_flush = None
+        outputs = [output for reservation, _ in batch for output in reservation.outputs]
+        try:
+            await self.coind_implementation.wallet.lock_unspent(False, outputs)
+        except Exception as e:
+            for reservation, waiter in batch:
+                self._drop(reservation, restore=True)
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        abandoned = []
+        for reservation, waiter in batch:
+            if waiter.done():
+                # Ожидавший отменен: монеты заблокированы, но резервирование никому не достанется.
+                self._drop(reservation, restore=True)
+                abandoned.extend(reservation.outputs)
+            else:
+                waiter.set_result(None)
+        if abandoned:
+            await self._unlock(abandoned)
+
+    async def _unlock(self, outputs: List[dict]):
+        try:
+            await self.coind_implementation.wallet.lock_unspent(True, outputs)
+        except Exception:
+            # Монеты останутся заблокированными в узле до его перезапуска.
+            logger.exception('Failed to unlock %d outputs', len(outputs))
+
+    async def reserve(self, amount: float) -> Reservation:
+        """Атомарно резервирует и блокирует монеты на сумму не меньше amount.
+
+        Args:
+            amount (float): Требуемая сумма, включая комиссию.
+
+        Returns:
+            Reservation: Зарезервированные монеты.
+
+        Raises:
+            CoindError: Если средств недостаточно (код -6) или блокировка не удалась.
+        """
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            await self.refresh()
+        coins = self._select(amount)
+        if coins is None:
+            await self.refresh(full=True)
+            coins = self._select(amount)
+            if coins is None:
+                raise CoindError(-6, 'Insufficient funds')
+        reservation = Reservation(next(self._ids), coins, time.monotonic() + self.reservation_timeout)
+        for coin in coins:
+            key = _outpoint_key(coin)
+            del self._available[key]
+            self._reserved.add(key)
+        self.reservations[reservation.id] = reservation
+        self._timers[reservation.id] = asyncio.get_running_loop().call_later(
+            self.reservation_timeout, self._expire, reservation)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._lock_batch.append((reservation, waiter))
+        if self._lock_flush is None:
+            self._lock_flush = asyncio.ensure_future(self._flush_locks())
+        await waiter
+        return reservation
+
+    def _drop(self, reservation: Reservation, restore: bool):
+        self.reservations.pop(reservation.id, None)
+        timer = self._timers.pop(reservation.id, None)
+        if timer is not None:
+            timer.cancel()
+        now = time.monotonic()
+        for coin in reservation.coins:
+            key = _outpoint_key(coin)
+            self._reserved.discard(key)
+            if restore:
+                self._available[key] = coin
+            else:
+                self._spent[key] = now
+
+    async def release(self, reservation: Reservation):
+        """Снимает резервирование и разблокирует монеты.
+
+        Args:
+            reservation (Reservation): Резервирование.
+        """
+        if reservation.id not in self.reservations:
+            return
+        self._drop(reservation, restore=True)
+        await self._unlock(reservation.outputs)
+
+    def commit(self, reservation: Reservation):
+        """Отмечает монеты резервирования как потраченные.
+
+        Монеты считаются потраченными, даже если резервирование уже истекло.
+
+        Args:
+            reservation (Reservation): Резервирование, монеты которого вошли в отправленную транзакцию.
+        """
+        if reservation.id in self.reservations:
+            self._drop(reservation, restore=False)
+            return
+        # Истекшее резервирование: монеты уже вернулись в кэш, но потрачены.
+        now = time.monotonic()
+        for coin in reservation.coins:
+            key = _outpoint_key(coin)
+            self._available.pop(key, None)
+            self._spent[key] = now
+
+    def _expire(self, reservation: Reservation):
+        if reservation.id not in self.reservations:
+            return
+        self._timers.pop(reservation.id, None)
+        # Исполнитель мог все же отправить транзакцию: монеты не возвращаются в кэш
+        # до следующего полного обновления, которое покажет, потрачены ли они.
+        self._drop(reservation, restore=False)
+        task = asyncio.ensure_future(self._unlock(reservation.outputs))
+        self._unlocks.add(task)
+        task.add_done_callback(self._unlocks.discard)
+
+    def reservation(self, amount: float) -> 'ReservationContext':
+        """Возвращает асинхронный контекстный менеджер резервирования.
+
+        При выходе без исключения монеты отмечаются как потраченные,
+        при исключении резервирование снимается.
+
+        Args:
+            amount (float): Требуемая сумма, включая комиссию.
+        """
+        return ReservationContext(self, amount)
+
+
+class ReservationContext:
+    """Асинхронный контекстный менеджер для CoinSelector.reservation()."""
+
+    def __init__(self, selector: CoinSelector, amount: float):
+        self.selector = selector
+        self.amount = amount
+        self.reservation = None
+
+    async def __aenter__(self) -> Reservation:
+        self.reservation = await self.selector.reserve(self.amount)
+        return self.reservation
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.selector.commit(self.reservation)
+        else:
+            await self.selector.release(self.reservation)
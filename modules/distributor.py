@@ -0,0 +1,232 @@
+import asyncio
+import time
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, NamedTuple, Optional
+
+# Поля с хэшем предыдущего блока: getblocktemplate и getminingcandidate.
+PREVHASH_FIELDS = ('previousblockhash', 'prevhash')
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class TemplateSnapshot(NamedTuple):
+    """Неизменяемый снимок шаблона блока для раздачи подписчикам.
+
+    Attributes:
+        job_id (int): Порядковый номер задания.
+        template (Mapping): Шаблон блока или кандидат для майнинга (только для чтения).
+        prevhash (Optional[str]): Хэш предыдущего блока из шаблона или, если его там нет, опрошенная вершина цепи.
+        clean_jobs (bool): True, если предыдущие задания устарели (сменился предыдущий блок).
+        received_at (float): Время получения шаблона (time.monotonic()).
+        changed (FrozenSet[str]): Поля шаблона, отличающиеся от предыдущего снимка (все поля для первого).
+    """
+    job_id: int
+    template: Mapping
+    prevhash: Optional[str]
+    clean_jobs: bool
+    received_at: float
+    changed: FrozenSet[str] = frozenset()
+
+
+class TemplateSubscription:
+    """Асинхронный итератор по снимкам шаблонов для одного подписчика.
+
+    Подписчик всегда получает последний снимок: необработанный снимок
+    заменяется новым, а флаг clean_jobs при этом сохраняется.
+    """
+
+    def __init__(self, distributor):
+        self._distributor = distributor
+        self._queue = asyncio.Queue(maxsize=1)
+
+    def _push(self, snapshot: TemplateSnapshot):
+        if self._queue.full():
+            pending = self._queue.get_nowait()
+            if pending.clean_jobs and not snapshot.clean_jobs:
+                snapshot = snapshot._replace(clean_jobs=True)
+        self._queue.put_nowait(snapshot)
+
+    async def get(self) -> TemplateSnapshot:
+        """Ожидает и возвращает следующий снимок."""
+        return await self._queue.get()
+
+    def close(self):
+        """Отписывается от рассылки."""
+        self._distributor._subscriptions.discard(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> TemplateSnapshot:
+        return await self._queue.get()
+
+
+class TemplateDistributor:
+    """Общий цикл обновления шаблона блока для серверов пулов.
+
+    Один цикл опрашивает вершину цепи и запрашивает новый шаблон при смене
+    вершины или по истечении интервала обновления, сравнивает его с
+    предыдущим и раздает неизменяемый снимок всем подписчикам. Нагрузка на узел не зависит от
+    количества подписчиков.
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        source (str): Источник заданий: 'getblocktemplate' или 'getminingcandidate'.
+        refresh_interval (float): Интервал принудительного обновления шаблона в секундах.
+        tip_poll_interval (float): Интервал опроса лучшего блока в секундах.
+        latest (Optional[TemplateSnapshot]): Последний разосланный снимок.
+    """
+
+    SOURCES = ('getblocktemplate', 'getminingcandidate')
+
+    def __init__(
+            self,
+            coind_implementation,
+            source: str = 'getblocktemplate',
+            refresh_interval: float = 30.0,
+            tip_poll_interval: float = 0.5,
+            template_request: Optional[str] = None
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            source (str): Источник заданий (по умолчанию 'getblocktemplate').
+            refresh_interval (float): Интервал принудительного обновления в секундах (по умолчанию 30).
+            tip_poll_interval (float): Интервал опроса лучшего блока в секундах (по умолчанию 0.5).
+            template_request (Optional[str]): Параметры запроса getblocktemplate (опционально).
+        """
+        if source not in self.SOURCES:
+            raise ValueError(f'Unknown template source: {source}')
+        self.coind_implementation = coind_implementation
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.tip_poll_interval = tip_poll_interval
+        self.template_request = template_request
+        self.latest = None
+        self._subscriptions = set()
+        self._job_id = 0
+        self._tip = None
+        self._refreshed_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def subscribe(self) -> TemplateSubscription:
+        """Создает подписку на снимки шаблонов.
+
+        Если снимок уже есть, он сразу доступен новому подписчику.
+
+        Returns:
+            TemplateSubscription: Асинхронный итератор по снимкам.
+        """
+        subscription = TemplateSubscription(self)
+        self._subscriptions.add(subscription)
+        if self.latest is not None:
+            subscription._push(self.latest)
+        return subscription
+
+    def notify(self):
+        """Сообщает о возможной смене вершины (например, по уведомлению ZMQ)."""
+        self._tip = None
+        self._wakeup.set()
+
+    async def _fetch_template(self):
+        mining = self.coind_implementation.mining
+        if self.source == 'getminingcandidate':
+            return await mining.get_mining_candidate()
+        return await mining.get_block_template(self.template_request)
+
+    async def refresh(self, tip: Optional[str] = None) -> TemplateSnapshot:
+        """Запрашивает шаблон и рассылает его подписчикам.
+
+        Новый шаблон сравнивается с предыдущим: флаг clean_jobs ставится,
+        если сменился предыдущий блок, а шаблон без изменений не
+        рассылается. Предыдущий блок берется из самого шаблона
+        (previousblockhash или prevhash), а опрошенная вершина цепи
+        используется, только если такого поля нет.
+
+        Args:
+            tip (Optional[str]): Опрошенный хэш вершины цепи (по умолчанию запрашивается
+                getbestblockhash, если в шаблоне нет хэша предыдущего блока).
+
+        Returns:
+            TemplateSnapshot: Разосланный снимок или предыдущий, если шаблон не изменился.
+        """
+        template = _freeze(await self._fetch_template())
+        self._refreshed_at = time.monotonic()
+        prevhash = next((template[field] for field in PREVHASH_FIELDS if template.get(field)), None)
+        if prevhash is None:
+            if tip is None:
+                tip = await self.coind_implementation.fetch('getbestblockhash')
+            prevhash = tip
+        latest = self.latest
+        if latest is None:
+            changed = frozenset(template)
+        else:
+            changed = frozenset(
+                key for key in set(template) | set(latest.template)
+                if template.get(key) != latest.template.get(key)
+            )
+            if not changed and prevhash == latest.prevhash:
+                return latest
+        clean_jobs = latest is None or prevhash != latest.prevhash
+        self._job_id += 1
+        snapshot = TemplateSnapshot(self._job_id, template, prevhash, clean_jobs, self._refreshed_at, changed)
+        self.latest = snapshot
+        for subscription in tuple(self._subscriptions):
+            subscription._push(snapshot)
+        return snapshot
+
+    async def _poll_once(self):
+        tip = await self.coind_implementation.fetch('getbestblockhash')
+        expired = time.monotonic() - self._refreshed_at >= self.refresh_interval
+        if tip != self._tip or expired:
+            self._tip = tip
+            snapshot = await self.refresh(tip)
+            if snapshot.prevhash != tip:
+                # Шаблон еще построен на прежней вершине; повторить на следующем опросе.
+                self._tip = None
+
+    async def run(self):
+        """Выполняет цикл обновления до отмены задачи."""
+        while True:
+            try:
+                await self._poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Ошибки узла не должны останавливать раздачу заданий;
+                # следующая итерация повторит запрос.
+                self._tip = None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.tip_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        """Запускает цикл обновления в фоновой задаче."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """Останавливает цикл обновления."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
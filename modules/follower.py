@@ -0,0 +1,243 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK_CONNECTED = 'block_connected'
+BLOCK_DISCONNECTED = 'block_disconnected'
+
+
+class ChainEvent(NamedTuple):
+    """Событие изменения основной цепи.
+
+    Attributes:
+        type (str): 'block_connected' или 'block_disconnected'.
+        hash (str): Хэш блока.
+        height (int): Высота блока.
+        header (dict): Заголовок блока (getblockheader).
+    """
+    type: str
+    hash: str
+    height: int
+    header: dict
+
+
+class ChainSubscription:
+    """Асинхронный итератор по событиям цепи для одного подписчика.
+
+    События не отбрасываются: порядок подключений и отключений важен.
+    """
+
+    def __init__(self, follower):
+        self._follower = follower
+        self._queue = asyncio.Queue()
+
+    def close(self):
+        """Отписывается от событий."""
+        self._follower._subscriptions.discard(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ChainEvent:
+        return await self._queue.get()
+
+
+class ChainFollower:
+    """Отслеживает основную цепь узла и рассылает упорядоченные события блоков.
+
+    Один цикл опроса обслуживает любое количество подписчиков. При
+    реорганизации точка ветвления находится переходом по previousblockhash
+    через getblockheader; сначала рассылаются отключения блоков старой ветви,
+    затем подключения новой. Интервал опроса выводится из среднего времени
+    между блоками, которое начинается с expected_block_time и уточняется
+    по наблюдаемому появлению новых блоков, и сокращается на время
+    burst_duration после появления нового блока.
+
+    Состояние цепи обновляется целиком до рассылки событий, а ошибки
+    обработчиков записываются в журнал и не прерывают рассылку.
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        tip (Optional[dict]): Заголовок текущей вершины.
+        block_time (float): Наблюдаемое среднее время между блоками в секундах.
+    """
+
+    def __init__(
+            self,
+            coind_implementation,
+            expected_block_time: float = 120.0,
+            polls_per_block: int = 60,
+            min_interval: float = 0.25,
+            max_interval: float = 10.0,
+            burst_duration: float = 10.0,
+            max_reorg_depth: int = 100,
+            smoothing: float = 0.2
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            expected_block_time (float): Начальная оценка времени между блоками в секундах (по умолчанию 120).
+            polls_per_block (int): Количество опросов за ожидаемое время блока в покое (по умолчанию 60).
+            min_interval (float): Минимальный интервал опроса в секундах (по умолчанию 0.25).
+            max_interval (float): Максимальный интервал опроса в секундах (по умолчанию 10).
+            burst_duration (float): Время частого опроса после нового блока в секундах (по умолчанию 10).
+            max_reorg_depth (int): Количество хранимых заголовков для поиска точки ветвления (по умолчанию 100).
+            smoothing (float): Вес нового наблюдения в среднем времени между блоками (по умолчанию 0.2).
+        """
+        self.coind_implementation = coind_implementation
+        self.expected_block_time = expected_block_time
+        self.polls_per_block = polls_per_block
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.burst_duration = burst_duration
+        self.max_reorg_depth = max_reorg_depth
+        self.smoothing = smoothing
+        self.tip = None
+        self.block_time = expected_block_time
+        self._chain = OrderedDict()
+        self._last_activity = float('-inf')
+        self._subscriptions = set()
+        self._callbacks = {BLOCK_CONNECTED: [], BLOCK_DISCONNECTED: []}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    @property
+    def interval(self) -> float:
+        """Текущий интервал опроса в секундах."""
+        if time.monotonic() - self._last_activity < self.burst_duration:
+            return self.min_interval
+        idle = self.block_time / self.polls_per_block
+        return min(self.max_interval, max(self.min_interval, idle))
+
+    def _observe_blocks(self, connected: int, now: float):
+        # Время между блоками оценивается по моменту их обнаружения; блоки,
+        # найденные одним опросом, делят прошедшее время поровну.
+        if connected and self._last_activity != float('-inf'):
+            observed = (now - self._last_activity) / connected
+            self.block_time += self.smoothing * (observed - self.block_time)
+
+    def subscribe(self) -> ChainSubscription:
+        """Создает подписку на события цепи.
+
+        Returns:
+            ChainSubscription: Асинхронный итератор по событиям.
+        """
+        subscription = ChainSubscription(self)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def on(self, event_type: str, callback):
+        """Регистрирует обработчик событий.
+
+        Args:
+            event_type (str): 'block_connected' или 'block_disconnected'.
+            callback (Callable[[ChainEvent], Any]): Обычная функция или корутина.
+        """
+        self._callbacks[event_type].append(callback)
+
+    def notify(self):
+        """Запрашивает внеочередной опрос (например, по уведомлению ZMQ hashblock)."""
+        self._wakeup.set()
+
+    async def _emit(self, event_type: str, header: dict):
+        event = ChainEvent(event_type, header['hash'], header['height'], header)
+        for subscription in tuple(self._subscriptions):
+            subscription._queue.put_nowait(event)
+        for callback in tuple(self._callbacks[event_type]):
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Chain event callback failed for %s %s', event_type, event.hash)
+
+    async def poll(self) -> int:
+        """Проверяет вершину цепи и рассылает события изменений.
+
+        Returns:
+            int: Количество разосланных событий.
+        """
+        blockchain = self.coind_implementation.blockchain
+        best = await blockchain.get_best_block_hash()
+        if self.tip is not None and best == self.tip['hash']:
+            return 0
+        if self.tip is None:
+            self.tip = await blockchain.get_block_header(best)
+            self._chain[best] = self.tip
+            return 0
+
+        oldest_height = next(iter(self._chain.values()))['height']
+        new_headers = []
+        block_hash = best
+        while block_hash is not None and block_hash not in self._chain:
+            header = await blockchain.get_block_header(block_hash)
+            new_headers.append(header)
+            if header['height'] <= oldest_height:
+                # Точка ветвления глубже хранимых заголовков.
+                block_hash = None
+                break
+            block_hash = header.get('previousblockhash')
+
+        # Сначала применяются все изменения, затем рассылаются события: ошибка или
+        # отмена во время рассылки не оставляет цепь в промежуточном состоянии.
+        events = []
+        while self._chain and next(reversed(self._chain)) != block_hash:
+            _, header = self._chain.popitem()
+            events.append((BLOCK_DISCONNECTED, header))
+        for header in reversed(new_headers):
+            self._chain[header['hash']] = header
+            events.append((BLOCK_CONNECTED, header))
+        while len(self._chain) > self.max_reorg_depth:
+            self._chain.popitem(last=False)
+        self.tip = self._chain[best]
+        now = time.monotonic()
+        self._observe_blocks(len(new_headers), now)
+        self._last_activity = now
+        for event_type, header in events:
+            await self._emit(event_type, header)
+        return len(events)
+
+    async def run(self):
+        """Выполняет цикл опроса до отмены задачи."""
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Временные ошибки узла не прерывают отслеживание цепи.
+                logger.exception('Chain poll failed')
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        """Запускает цикл опроса в фоновой задаче."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """Останавливает цикл опроса."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
@@ -0,0 +1,144 @@
+from hashlib import sha256
+from typing import Iterable, List, Optional, Sequence
+
+
+def double_sha256(data: bytes) -> bytes:
+    """Возвращает двойной SHA-256 от данных.
+
+    Args:
+        data (bytes): Входные данные.
+
+    Returns:
+        bytes: Хэш (32 байта).
+    """
+    return sha256(sha256(data).digest()).digest()
+
+
+def hashes_from_hex(hex_hashes: Iterable[str]) -> List[bytes]:
+    """Преобразует хэши из отображаемого hex-вида во внутренний порядок байтов.
+
+    Args:
+        hex_hashes (Iterable[str]): Хэши в hex (как их возвращает RPC).
+
+    Returns:
+        List[bytes]: Хэши во внутреннем порядке байтов.
+    """
+    return [bytes.fromhex(h)[::-1] for h in hex_hashes]
+
+
+def _next_level(level: Sequence[bytes], start: int = 0) -> List[bytes]:
+    if (len(level) - start) & 1:
+        level = list(level)
+        level.append(level[-1])
+    return [sha256(sha256(level[i] + level[i + 1]).digest()).digest() for i in range(start, len(level), 2)]
+
+
+def merkle_root(hashes: Sequence[bytes]) -> bytes:
+    """Вычисляет корень Меркла по хэшам транзакций.
+
+    Args:
+        hashes (Sequence[bytes]): Хэши транзакций во внутреннем порядке байтов (включая coinbase).
+
+    Returns:
+        bytes: Корень Меркла во внутреннем порядке байтов.
+    """
+    if not hashes:
+        raise ValueError('Merkle root of an empty list')
+    level = hashes
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def merkle_branch(hashes: Sequence[bytes]) -> List[bytes]:
+    """Вычисляет ветвь Меркла для coinbase по остальным транзакциям блока.
+
+    Args:
+        hashes (Sequence[bytes]): Хэши транзакций без coinbase во внутреннем порядке байтов.
+
+    Returns:
+        List[bytes]: Ветвь Меркла от листа coinbase к корню.
+    """
+    branch = []
+    level = [None, *hashes]
+    while len(level) > 1:
+        branch.append(level[1])
+        level = [None, *_next_level(level, 2)]
+    return branch
+
+
+def root_from_branch(coinbase_hash: bytes, branch: Iterable[bytes]) -> bytes:
+    """Вычисляет корень Меркла по хэшу coinbase и ветви.
+
+    Args:
+        coinbase_hash (bytes): Хэш coinbase во внутреннем порядке байтов.
+        branch (Iterable[bytes]): Ветвь Меркла для coinbase.
+
+    Returns:
+        bytes: Корень Меркла во внутреннем порядке байтов.
+    """
+    root = coinbase_hash
+    for node in branch:
+        root = sha256(sha256(root + node).digest()).digest()
+    return root
+
+
+class MerkleBranch:
+    """Ветвь Меркла coinbase для шаблона блока.
+
+    Ветвь вычисляется один раз для набора транзакций шаблона; при смене
+    только coinbase корень пересчитывается за O(log n) хэширований.
+
+    Attributes:
+        branch (List[bytes]): Ветвь Меркла во внутреннем порядке байтов.
+    """
+
+    def __init__(self, hashes: Sequence[bytes]):
+        """
+        Args:
+            hashes (Sequence[bytes]): Хэши транзакций без coinbase во внутреннем порядке байтов.
+        """
+        self.branch = merkle_branch(hashes)
+
+    @classmethod
+    def from_template(cls, template, field: Optional[str] = None) -> 'MerkleBranch':
+        """Создает ветвь по транзакциям из getblocktemplate.
+
+        Args:
+            template (Mapping): Шаблон блока.
+            field (Optional[str]): Поле с хэшем транзакции (по умолчанию 'txid', иначе 'hash').
+
+        Returns:
+            MerkleBranch: Ветвь Меркла для coinbase шаблона.
+        """
+        transactions = template.get('transactions', ())
+        if field is None:
+            field = 'txid' if transactions and 'txid' in transactions[0] else 'hash'
+        return cls(hashes_from_hex(tx[field] for tx in transactions))
+
+    @property
+    def branch_hex(self) -> List[str]:
+        """Ветвь Меркла в hex во внутреннем порядке байтов (формат stratum)."""
+        return [node.hex() for node in self.branch]
+
+    def root(self, coinbase_hash: bytes) -> bytes:
+        """Вычисляет корень Меркла для хэша coinbase.
+
+        Args:
+            coinbase_hash (bytes): Хэш coinbase во внутреннем порядке байтов.
+
+        Returns:
+            bytes: Корень Меркла во внутреннем порядке байтов.
+        """
+        return root_from_branch(coinbase_hash, self.branch)
+
+    def root_for_coinbase(self, coinbase: bytes) -> bytes:
+        """Вычисляет корень Меркла для сериализованной coinbase-транзакции.
+
+        Args:
+            coinbase (bytes): Сериализованная coinbase-транзакция.
+
+        Returns:
+            bytes: Корень Меркла во внутреннем порядке байтов.
+        """
+        return root_from_branch(double_sha256(coinbase), self.branch)
@@ -0,0 +1,303 @@
+import base64
+import binascii
+import hashlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from .cashaddr import PUBKEY_TYPE, TEMPLATE_TYPE, Address, script_pub_key
+
+try:
+    import coincurve as _coincurve
+except ImportError:
+    _coincurve = None
+
+# strMessageMagic узла, унаследованный Nexa от Bitcoin без изменений. Подписи
+# signmessage узла проверяются с ним в tests/test_message.py.
+MESSAGE_MAGIC = 'Bitcoin Signed Message:\n'
+
+_process_pool = None
+
+_P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+)
+
+
+def default_executor() -> Optional[Executor]:
+    """Возвращает исполнитель для проверки подписей по умолчанию.
+
+    coincurve отпускает GIL, поэтому с ним достаточно пула потоков цикла
+    событий. Реализация на Python удерживает GIL и в потоках не
+    масштабируется; для нее создается общий ProcessPoolExecutor.
+
+    Returns:
+        Optional[Executor]: None (пул потоков цикла событий) или общий пул процессов.
+    """
+    global _process_pool
+    if _coincurve is not None:
+        return None
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor()
+    return _process_pool
+
+
+def _ripemd160(data: bytes) -> bytes:
+    try:
+        return hashlib.new('ripemd160', data).digest()
+    except ValueError:
+        return _ripemd160_fallback(data)
+
+
+def hash160(data: bytes) -> bytes:
+    """Возвращает RIPEMD160(SHA256(data))."""
+    return _ripemd160(hashlib.sha256(data).digest())
+
+
+def _compact_size(length: int) -> bytes:
+    if length < 0xfd:
+        return bytes([length])
+    if length <= 0xffff:
+        return b'\xfd' + length.to_bytes(2, 'little')
+    if length <= 0xffffffff:
+        return b'\xfe' + length.to_bytes(4, 'little')
+    return b'\xff' + length.to_bytes(8, 'little')
+
+
+def message_hash(message: str, magic: str = MESSAGE_MAGIC) -> bytes:
+    """Вычисляет хэш сообщения так же, как signmessage и verifymessage узла.
+
+    Args:
+        message (str): Сообщение.
+        magic (str): Префикс подписываемых сообщений (по умолчанию MESSAGE_MAGIC).
+
+    Returns:
+        bytes: Двойной SHA-256 от сериализованных префикса и сообщения.
+    """
+    magic_bytes = magic.encode()
+    message_bytes = message.encode()
+    data = _compact_size(len(magic_bytes)) + magic_bytes + _compact_size(len(message_bytes)) + message_bytes
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def _jacobian_double(p):
+    x, y, z = p
+    if not y:
+        return 0, 0, 0
+    ysq = y * y % _P
+    s = 4 * x * ysq % _P
+    m = 3 * x * x % _P
+    nx = (m * m - 2 * s) % _P
+    ny = (m * (s - nx) - 8 * ysq * ysq) % _P
+    nz = 2 * y * z % _P
+    return nx, ny, nz
+
+
+def _jacobian_add(p, q):
+    if not p[1]:
+        return q
+    if not q[1]:
+        return p
+    x1, y1, z1 = p
+    x2, y2, z2 = q
+    z1z1 = z1 * z1 % _P
+    z2z2 = z2 * z2 % _P
+    u1 = x1 * z2z2 % _P
+    u2 = x2 * z1z1 % _P
+    s1 = y1 * z2 * z2z2 % _P
+    s2 = y2 * z1 * z1z1 % _P
+    if u1 == u2:
+        if s1 != s2:
+            return 0, 0, 1
+        return _jacobian_double(p)
+    h = u2 - u1
+    r = s2 - s1
+    hh = h * h % _P
+    hhh = h * hh % _P
+    v = u1 * hh % _P
+    nx = (r * r - hhh - 2 * v) % _P
+    ny = (r * (v - nx) - s1 * hhh) % _P
+    nz = h * z1 * z2 % _P
+    return nx, ny, nz
+
+
+def _double_multiply(a, p, b, q):
+    # Вычисляет a*P + b*Q одним проходом (трюк Шамира).
+    pq = _jacobian_add(p, q)
+    result = (0, 0, 1)
+    for bit in range(max(a.bit_length(), b.bit_length()) - 1, -1, -1):
+        result = _jacobian_double(result)
+        a_bit = (a >> bit) & 1
+        b_bit = (b >> bit) & 1
+        if a_bit and b_bit:
+            result = _jacobian_add(result, pq)
+        elif a_bit:
+            result = _jacobian_add(result, p)
+        elif b_bit:
+            result = _jacobian_add(result, q)
+    return result
+
+
+def _to_affine(p):
+    x, y, z = p
+    if not y:
+        return None
+    z_inv = pow(z, -1, _P)
+    z_inv2 = z_inv * z_inv % _P
+    return x * z_inv2 % _P, y * z_inv2 * z_inv % _P
+
+
+def _serialize_pubkey(point, compressed: bool) -> bytes:
+    x, y = point
+    if compressed:
+        return bytes([2 + (y & 1)]) + x.to_bytes(32, 'big')
+    return b'\x04' + x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
+
+
+def recover_pubkey(digest: bytes, signature: bytes) -> Optional[bytes]:
+    """Восстанавливает публичный ключ из компактной подписи (65 байт).
+
+    Args:
+        digest (bytes): Хэш подписанного сообщения.
+        signature (bytes): Компактная подпись: байт заголовка, r и s.
+
+    Returns:
+        Optional[bytes]: Сериализованный публичный ключ или None, если подпись некорректна.
+    """
+    if len(signature) != 65 or not 27 <= signature[0] <= 34:
+        return None
+    header = signature[0] - 27
+    compressed = header >= 4
+    recid = header & 3
+    if _coincurve is not None:
+        try:
+            key = _coincurve.PublicKey.from_signature_and_message(
+                signature[1:] + bytes([recid]), digest, hasher=None)
+        except Exception:
+            return None
+        return key.format(compressed=compressed)
+
+    r = int.from_bytes(signature[1:33], 'big')
+    s = int.from_bytes(signature[33:65], 'big')
+    if not (0 < r < _N and 0 < s < _N):
+        return None
+    x = r + (recid >> 1) * _N
+    if x >= _P:
+        return None
+    alpha = (x * x * x + 7) % _P
+    y = pow(alpha, (_P + 1) // 4, _P)
+    if y * y % _P != alpha:
+        return None
+    if (y & 1) != (recid & 1):
+        y = _P - y
+    e = int.from_bytes(digest, 'big')
+    r_inv = pow(r, -1, _N)
+    u1 = (-e * r_inv) % _N
+    u2 = (s * r_inv) % _N
+    point = _to_affine(_double_multiply(u1, (_G[0], _G[1], 1), u2, (x, y, 1)))
+    if point is None:
+        return None
+    return _serialize_pubkey(point, compressed)
+
+
+def verify_message(address: Address, signature: str, message: str, magic: str = MESSAGE_MAGIC) -> Optional[bool]:
+    """Проверяет подпись сообщения локально.
+
+    Поддерживаются адреса pubkeyhash и шаблонные адреса P2PKT (шаблон 1
+    с хэшем аргументов, содержащих публичный ключ).
+
+    Args:
+        address (Address): Декодированный адрес.
+        signature (str): Подпись в base64.
+        message (str): Сообщение.
+        magic (str): Префикс подписываемых сообщений (по умолчанию MESSAGE_MAGIC).
+
+    Returns:
+        Optional[bool]: Результат проверки или None, если тип адреса не поддерживается.
+
+    Raises:
+        ValueError: Если подпись не является корректным base64.
+    """
+    try:
+        raw_signature = base64.b64decode(signature, validate=True)
+    except binascii.Error:
+        raise ValueError('Malformed base64 encoding') from None
+    if address.type == PUBKEY_TYPE:
+        expected = address.payload
+        template = False
+    elif address.type == TEMPLATE_TYPE:
+        script = script_pub_key(address)
+        if len(script) != 23 or script[:3] != b'\x00\x51\x14':
+            return None
+        expected = script[3:]
+        template = True
+    else:
+        return None
+    pubkey = recover_pubkey(message_hash(message, magic), raw_signature)
+    if pubkey is None:
+        return False
+    if template:
+        return hash160(_compact_size(len(pubkey)) + pubkey) == expected
+    return hash160(pubkey) == expected
+
+
+def _ripemd160_fallback(data: bytes) -> bytes:
+    # Реализация RIPEMD-160 для сборок OpenSSL без этого алгоритма.
+    r1 = [
+        0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+        3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12, 1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+        4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13,
+    ]
+    r2 = [
+        5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12, 6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+        15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13, 8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+        12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11,
+    ]
+    s1 = [
+        11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8, 7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+        11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5, 11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+        9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6,
+    ]
+    s2 = [
+        8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6, 9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+        9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5, 15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+        8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11,
+    ]
+    k1 = [0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E]
+    k2 = [0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000]
+    mask = 0xFFFFFFFF
+
+    def f(j, x, y, z):
+        if j < 16:
+            return x ^ y ^ z
+        if j < 32:
+            return (x & y) | (~x & z)
+        if j < 48:
+            return (x | ~y) ^ z
+        if j < 64:
+            return (x & z) | (y & ~z)
+        return x ^ (y | ~z)
+
+    def rol(x, n):
+        x &= mask
+        return ((x << n) | (x >> (32 - n))) & mask
+
+    h = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+    padded = data + b'\x80' + b'\x00' * ((55 - len(data)) % 64) + (8 * len(data)).to_bytes(8, 'little')
+    for offset in range(0, len(padded), 64):
+        x = [int.from_bytes(padded[offset + 4 * i:offset + 4 * i + 4], 'little') for i in range(16)]
+        al, bl, cl, dl, el = h
+        ar, br, cr, dr, er = h
+        for j in range(80):
+            t = rol(al + f(j, bl, cl, dl) + x[r1[j]] + k1[j >> 4], s1[j]) + el
+            al, el, dl, cl, bl = el, dl, rol(cl, 10), bl, t & mask
+            t = rol(ar + f(79 - j, br, cr, dr) + x[r2[j]] + k2[j >> 4], s2[j]) + er
+            ar, er, dr, cr, br = er, dr, rol(cr, 10), br, t & mask
+        t = (h[1] + cl + dr) & mask
+        h[1] = (h[2] + dl + er) & mask
+        h[2] = (h[3] + el + ar) & mask
+        h[3] = (h[4] + al + br) & mask
+        h[4] = (h[0] + bl + cr) & mask
+        h[0] = t
+    return b''.join(value.to_bytes(4, 'little') for value in h)
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+from typing import Iterable, List, Optional, Tuple
+
+from ..exceptions import CoindError
+from .storage import read_json, write_json
+
+PENDING = 'pending'
+SUBMITTING = 'submitting'
+SENT = 'sent'
+FAILED = 'failed'
+
+
+class PayoutEngine:
+    """Пакетные выплаты через sendmany с разбиением по размеру транзакции.
+
+    Список выплат разбивается на части, размер транзакции каждой из которых
+    (по оценке) не превышает max_tx_size, а оценочная комиссия по ставке
+    estimatesmartfee - max_fee. Части отправляются с ограниченным
+    параллелизмом; каждая получает ключ идемпотентности, который передается
+    узлу в комментарии sendmany.
+
+    План и статусы частей сохраняются в журнале. Перед отправкой часть
+    помечается как 'submitting'; после сбоя такие части сверяются по
+    комментарию со всеми транзакциями кошелька начиная с блока, бывшего
+    вершиной цепочки при планировании (listsinceblock, без ограничения
+    глубины). Часть, которую сверка не нашла или не смогла проверить,
+    остается 'submitting' и не отправляется повторно: после ручной проверки
+    ее можно вернуть в очередь методом release().
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        ledger_path (str): Путь к журналу выплат.
+    """
+
+    COMMENT_PREFIX = 'payout:'
+
+    def __init__(
+            self,
+            coind_implementation,
+            ledger_path: str,
+            from_account: str = '',
+            min_conf: int = 1,
+            max_tx_size: int = 100000,
+            output_size: int = 34,
+            input_size: int = 148,
+            base_size: int = 10,
+            input_share: float = 0.5,
+            fee_blocks: int = 6,
+            max_fee: Optional[float] = None,
+            concurrency: int = 2
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            ledger_path (str): Путь к журналу выплат.
+            from_account (str): Аккаунт отправителя (по умолчанию '').
+            min_conf (int): Минимальное количество подтверждений входов (по умолчанию 1).
+            max_tx_size (int): Максимальный оценочный размер транзакции в байтах (по умолчанию 100000).
+            output_size (int): Оценочный размер выхода в байтах (по умолчанию 34).
+            input_size (int): Оценочный размер входа в байтах (по умолчанию 148).
+            base_size (int): Оценочный размер заголовка транзакции в байтах (по умолчанию 10).
+            input_share (float): Доля размера транзакции, оставляемая под входы (по умолчанию 0.5).
+            fee_blocks (int): Целевое количество блоков для estimatesmartfee (по умолчанию 6).
+            max_fee (Optional[float]): Максимальная оценочная комиссия одной транзакции (опционально).
+            concurrency (int): Количество одновременно отправляемых частей (по умолчанию 2).
+        """
+        self.coind_implementation = coind_implementation
+        self.ledger_path = ledger_path
+        self.from_account = from_account
+        self.min_conf = min_conf
+        self.max_tx_size = max_tx_size
+        self.output_size = output_size
+        self.input_size = input_size
+        self.base_size = base_size
+        self.input_share = input_share
+        self.fee_blocks = fee_blocks
+        self.max_fee = max_fee
+        self.concurrency = concurrency
+
+    async def _fee_rate(self) -> float:
+        estimate = await self.coind_implementation.util.estimate_smart_fee(self.fee_blocks)
+        if isinstance(estimate, dict):
+            return max(estimate.get('feerate', 0.0), 0.0)
+        return max(estimate or 0.0, 0.0)
+
+    def _max_outputs(self, fee_rate: float) -> int:
+        size_budget = self.max_tx_size
+        if self.max_fee is not None and fee_rate > 0:
+            size_budget = min(size_budget, int(self.max_fee / fee_rate * 1000))
+        outputs_budget = size_budget * (1 - self.input_share) - self.base_size
+        return max(1, int(outputs_budget // self.output_size))
+
+    def _estimate_fee(self, outputs: int, fee_rate: float) -> float:
+        inputs_size = self.max_tx_size * self.input_share
+        size = self.base_size + outputs * self.output_size + min(inputs_size, self.input_size * outputs)
+        return round(size / 1000 * fee_rate, 8)
+
+    def _plan(self, batch_id: str, payouts: List[Tuple[str, float]], fee_rate: float, since_block: str) -> dict:
+        max_outputs = self._max_outputs(fee_rate)
+        chunks = {}
+        order = []
+        remaining = list(payouts)
+        while remaining:
+            items = []
+            addresses = set()
+            overflow = []
+            for address, amount in remaining:
+                if len(items) < max_outputs and address not in addresses:
+                    items.append([address, amount])
+                    addresses.add(address)
+                else:
+                    # Повторные адреса уходят в следующие части: sendmany принимает словарь.
+                    overflow.append((address, amount))
+            remaining = overflow
+            digest = hashlib.sha256(json.dumps([batch_id, len(order), items]).encode()).hexdigest()[:24]
+            chunks[digest] = {
+                'items': items,
+                'status': PENDING,
+                'txid': None,
+                'error': None,
+                'fee_estimate': self._estimate_fee(len(items), fee_rate),
+            }
+            order.append(digest)
+        return {'batch_id': batch_id, 'since_block': since_block, 'order': order, 'chunks': chunks}
+
+    async def _reconcile(self, ledger: dict) -> List[str]:
+        submitting = {
+            self.COMMENT_PREFIX + key: chunk
+            for key, chunk in ledger['chunks'].items() if chunk['status'] == SUBMITTING
+        }
+        if not submitting:
+            return []
+        try:
+            # Пустой хэш (журнал без since_block) означает всю историю кошелька.
+            since = await self.coind_implementation.wallet.list_since_block(ledger.get('since_block') or '')
+        except CoindError as e:
+            for chunk in submitting.values():
+                chunk['error'] = f'Reconciliation failed: {e}'
+            write_json(self.ledger_path, ledger)
+            return [comment[len(self.COMMENT_PREFIX):] for comment in submitting]
+        for entry in since.get('transactions', []):
+            chunk = submitting.pop(entry.get('comment'), None)
+            if chunk is not None:
+                chunk['status'] = SENT
+                chunk['txid'] = entry['txid']
+                chunk['error'] = None
+        for chunk in submitting.values():
+            chunk['error'] = 'Transaction not found in wallet; manual check required'
+        write_json(self.ledger_path, ledger)
+        return [comment[len(self.COMMENT_PREFIX):] for comment in submitting]
+
+    def release(self, keys: Iterable[str]):
+        """Возвращает в очередь части, оставшиеся 'submitting' после сверки.
+
+        Вызывается только после ручной проверки, что транзакция части не
+        создана: следующий вызов pay() отправит эти части повторно.
+
+        Args:
+            keys (Iterable[str]): Ключи частей.
+        """
+        ledger = read_json(self.ledger_path)
+        if ledger is None:
+            return
+        for key in keys:
+            chunk = ledger['chunks'].get(key)
+            if chunk is not None and chunk['status'] == SUBMITTING:
+                chunk['status'] = PENDING
+        write_json(self.ledger_path, ledger)
+
+    async def pay(self, payouts: Iterable[Tuple[str, float]], batch_id: str) -> List[dict]:
+        """Выполняет выплаты или продолжает ранее прерванную партию.
+
+        Args:
+            payouts (Iterable[Tuple[str, float]]): Пары (адрес, сумма).
+            batch_id (str): Идентификатор партии; при совпадении с журналом партия продолжается.
+
+        Returns:
+            List[dict]: Результат по каждому получателю: address, amount, chunk, status, txid, error.
+            Части, не подтвержденные сверкой, возвращаются со статусом 'submitting'.
+
+        Raises:
+            ValueError: Журнал содержит другую партию с неподтвержденными частями.
+        """
+        ledger = read_json(self.ledger_path)
+        if ledger is not None:
+            unresolved = await self._reconcile(ledger)
+            if unresolved and ledger.get('batch_id') != batch_id:
+                raise ValueError(
+                    f"Batch {ledger.get('batch_id')} has unconfirmed chunks: "
+                    f"{', '.join(unresolved)}"
+                )
+        if ledger is None or ledger.get('batch_id') != batch_id:
+            since_block = await self.coind_implementation.blockchain.get_best_block_hash()
+            ledger = self._plan(batch_id, list(payouts), await self._fee_rate(), since_block)
+            write_json(self.ledger_path, ledger)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(key: str, chunk: dict):
+            async with semaphore:
+                chunk['status'] = SUBMITTING
+                write_json(self.ledger_path, ledger)
+                try:
+                    chunk['txid'] = await self.coind_implementation.wallet.send_many(
+                        self.from_account,
+                        {address: amount for address, amount in chunk['items']},
+                        self.min_conf,
+                        self.COMMENT_PREFIX + key,
+                    )
+                    chunk['status'] = SENT
+                    chunk['error'] = None
+                except CoindError as e:
+                    # Ошибка узла означает, что транзакция не создана. При обрыве
+                    # соединения часть остается 'submitting' до сверки при следующем запуске.
+                    chunk['status'] = FAILED
+                    chunk['error'] = str(e)
+                write_json(self.ledger_path, ledger)
+
+        results = await asyncio.gather(*(
+            send(key, ledger['chunks'][key])
+            for key in ledger['order']
+            if ledger['chunks'][key]['status'] in (PENDING, FAILED)
+        ), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return [
+            {
+                'address': address,
+                'amount': amount,
+                'chunk': key,
+                'status': ledger['chunks'][key]['status'],
+                'txid': ledger['chunks'][key]['txid'],
+                'error': ledger['chunks'][key]['error'],
+            }
+            for key in ledger['order']
+            for address, amount in ledger['chunks'][key]['items']
+        ]
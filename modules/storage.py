@@ -0,0 +1,37 @@
+import json
+import os
+
+
+def read_json(path: str, default=None):
+    """Читает JSON-файл состояния.
+
+    Args:
+        path (str): Путь к файлу.
+        default: Значение, если файл не существует.
+
+    Returns:
+        Содержимое файла или default.
+    """
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path: str, data):
+    """Атомарно записывает JSON-файл состояния.
+
+    Данные пишутся во временный файл, сбрасываются на диск и заменяют
+    исходный файл, поэтому после сбоя остается либо старое, либо новое
+    состояние целиком.
+
+    Args:
+        path (str): Путь к файлу.
+        data: Сериализуемые в JSON данные.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
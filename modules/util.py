@@ -1,10 +1,21 @@
+import asyncio
+from concurrent.futures import Executor
 from typing import List, Optional
 
+from ..exceptions import CoindError
+from .cashaddr import AddressCodec
+from .message import MESSAGE_MAGIC, default_executor, verify_message
+
 
 class Util:
 
     def __init__(self, coind_implementation):
         self.coind_implementation = coind_implementation
+        self.address_codec = AddressCodec()
+        self.message_magic = MESSAGE_MAGIC
+
+    async def _fetch(self, method: str, params: Optional[list] = None):
+        return await self.coind_implementation.fetch(method, params)
 
     async def create_multi_sig(self, nrequired: int, keys: List[str]) -> dict:
         """Создает мультиподпись.
@@ -55,6 +66,27 @@ class Util:
         """
         return await self._fetch('getaddressforms', [address])
 
+    async def get_address_forms_local(self, address: str, fallback: bool = True) -> Optional[dict]:
+        """Возвращает формы адреса, вычисленные локально через address_codec.
+
+        Args:
+            address (str): Адрес.
+            fallback (bool): Обратиться к getaddressforms, если адрес нельзя разобрать локально (по умолчанию True).
+
+        Returns:
+            Optional[dict]: Формы адреса или None, если адрес нельзя разобрать локально и fallback отключен.
+
+        Raises:
+            CoindError: Если адрес некорректен (тот же код, что у getaddressforms).
+        """
+        try:
+            forms = self.address_codec.forms(address)
+        except ValueError:
+            raise CoindError(-5, 'Invalid address') from None
+        if forms is None and fallback:
+            return await self.get_address_forms(address)
+        return forms
+
     async def get_stat(self):
         """Возвращает статистику утилиты."""
         return await self._fetch('getstat')
@@ -103,6 +135,24 @@ class Util:
         """
         return await self._fetch('validateaddress', [address])
 
+    async def validate_address_local(self, address: str, fallback: bool = True) -> Optional[dict]:
+        """Проверяет адрес локально через address_codec.
+
+        Возвращает только поля, не зависящие от кошелька: isvalid, address,
+        type, isscript и scriptPubKey.
+
+        Args:
+            address (str): Адрес.
+            fallback (bool): Обратиться к validateaddress, если адрес нельзя разобрать локально (по умолчанию True).
+
+        Returns:
+            Optional[dict]: Информация о валидности адреса или None, если адрес нельзя разобрать локально и fallback отключен.
+        """
+        result = self.address_codec.validate(address)
+        if result is None and fallback:
+            return await self.validate_address(address)
+        return result
+
     async def validate_chain_history(self, hash: Optional[str] = None) -> dict:
         """Проверяет цепочку истории блоков на валидность.
 
@@ -129,3 +179,49 @@ class Util:
             bool: True, если подпись верна, False в противном случае.
         """
         return await self._fetch('verifymessage', [address, signature, message])
+
+    async def verify_message_local(
+            self,
+            address: str,
+            signature: str,
+            message: str,
+            executor: Optional[Executor] = None,
+            fallback: bool = True
+    ) -> Optional[bool]:
+        """Проверяет подпись сообщения локально, без вызова verifymessage.
+
+        Восстановление публичного ключа выполняется в executor. По умолчанию
+        это пул потоков цикла событий, если установлен coincurve, и общий
+        пул процессов иначе (см. message.default_executor).
+
+        Args:
+            address (str): Адрес.
+            signature (str): Подпись.
+            message (str): Сообщение.
+            executor (Optional[Executor]): Исполнитель для проверки подписи (по умолчанию message.default_executor()).
+            fallback (bool): Обратиться к verifymessage, если тип адреса не поддерживается локально (по умолчанию True).
+
+        Returns:
+            Optional[bool]: True, если подпись верна, False в противном случае;
+            None, если проверка локально невозможна и fallback отключен.
+
+        Raises:
+            CoindError: Если адрес или подпись некорректны (те же коды, что у узла).
+        """
+        try:
+            decoded = self.address_codec.decode(address)
+        except ValueError:
+            raise CoindError(-3, 'Invalid address') from None
+        result = None
+        if decoded is not None:
+            loop = asyncio.get_running_loop()
+            if executor is None:
+                executor = default_executor()
+            try:
+                result = await loop.run_in_executor(
+                    executor, verify_message, decoded, signature, message, self.message_magic)
+            except ValueError as e:
+                raise CoindError(-5, str(e)) from None
+        if result is None and fallback:
+            return await self.verify_message(address, signature, message)
+        return result
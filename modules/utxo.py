@@ -0,0 +1,482 @@
+import asyncio
+import logging
+import math
+import os
+import struct
+import time
+from array import array
+from collections import OrderedDict
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TxOuts(NamedTuple):
+    """Компактный результат массовой проверки выходов транзакций.
+
+    Attributes:
+        values (array): Суммы выходов (0.0 для потраченных или отсутствующих).
+        confirmations (array): Количество подтверждений (-1 для потраченных или отсутствующих).
+        unspent (bytearray): Битовая карта непотраченных выходов (бит i соответствует outpoints[i]).
+    """
+    values: array
+    confirmations: array
+    unspent: bytearray
+
+    def is_unspent(self, index: int) -> bool:
+        """Возвращает True, если выход с указанным индексом не потрачен."""
+        return bool(self.unspent[index >> 3] & (1 << (index & 7)))
+
+
+class TxOutCache:
+    """Кратковременный кэш результатов gettxout, сбрасываемый при смене блока.
+
+    Записи живут не дольше ttl секунд. Хэш лучшего блока проверяется не чаще
+    одного раза в tip_check_interval секунд; при его изменении кэш очищается.
+
+    Attributes:
+        ttl (float): Время жизни записи в секундах.
+        tip_check_interval (float): Интервал проверки лучшего блока в секундах.
+        max_size (int): Максимальное количество записей.
+    """
+
+    def __init__(self, ttl: float = 5.0, tip_check_interval: float = 1.0, max_size: int = 100000):
+        self.ttl = ttl
+        self.tip_check_interval = tip_check_interval
+        self.max_size = max_size
+        self._entries = {}
+        self._tip = None
+        self._tip_checked = 0.0
+
+    async def validate(self, coind_implementation, force: bool = False) -> Optional[str]:
+        """Сбрасывает кэш, если лучший блок изменился с момента последней проверки.
+
+        Args:
+            coind_implementation (CoindImplementation): Клиент для запроса лучшего блока.
+            force (bool): Проверить лучший блок независимо от tip_check_interval (по умолчанию False).
+
+        Returns:
+            Optional[str]: Хэш лучшего блока, для которого действительны записи кэша.
+        """
+        now = time.monotonic()
+        if not force and now - self._tip_checked < self.tip_check_interval:
+            return self._tip
+        tip = await coind_implementation.fetch('getbestblockhash')
+        self._tip_checked = time.monotonic()
+        if tip != self._tip:
+            self._entries.clear()
+            self._tip = tip
+        return tip
+
+    def get(self, key):
+        """Возвращает пару (найдено, результат) для ключа."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        result, expires = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return False, None
+        return True, result
+
+    def put(self, key, result):
+        """Сохраняет результат gettxout для ключа."""
+        if len(self._entries) >= self.max_size:
+            self._entries.clear()
+        self._entries[key] = (result, time.monotonic() + self.ttl)
+
+    def clear(self):
+        """Очищает кэш."""
+        self._entries.clear()
+        self._tip = None
+        self._tip_checked = 0.0
+
+
+def pack_tx_outs(results, count: Optional[int] = None) -> TxOuts:
+    """Упаковывает результаты gettxout в компактную структуру TxOuts.
+
+    Args:
+        results (list): Результаты gettxout (dict или None).
+        count (Optional[int]): Количество выходов (по умолчанию len(results)).
+
+    Returns:
+        TxOuts: Компактный результат.
+    """
+    count = len(results) if count is None else count
+    values = array('d', bytes(8 * count))
+    confirmations = array('q', [-1]) * count
+    unspent = bytearray((count + 7) >> 3)
+    for i, result in enumerate(results):
+        if result:
+            values[i] = result.get('value', 0.0)
+            confirmations[i] = result.get('confirmations', 0)
+            unspent[i >> 3] |= 1 << (i & 7)
+    return TxOuts(values, confirmations, unspent)
+
+
+# Запись выхода: сумма и высота, за которыми следует scriptPubKey.
+_ENTRY = struct.Struct('<dq')
+_INDEX = struct.Struct('<I')
+_SNAPSHOT_MAGIC = b'AIOUTXO\n'
+_SNAPSHOT_HEADER = struct.Struct('<HqQI')
+_SIZES = struct.Struct('<BH')
+_COUNTS = struct.Struct('<II')
+_NONE = 0xFFFFFFFF
+
+
+def _pack_key(outpoint: str) -> bytes:
+    # Хэш outpoint Nexa - 32 байта; пара txid:n - 36 байт.
+    txid, separator, n = outpoint.partition(':')
+    if separator:
+        return bytes.fromhex(txid) + _INDEX.pack(int(n))
+    return bytes.fromhex(outpoint)
+
+
+def _unpack_key(key: bytes) -> str:
+    if len(key) == 36:
+        return f'{key[:32].hex()}:{_INDEX.unpack_from(key, 32)[0]}'
+    return key.hex()
+
+
+def _pack_entry(value: float, height: int, script: Optional[str]) -> bytes:
+    return _ENTRY.pack(value, height) + (bytes.fromhex(script) if script else b'')
+
+
+def _unpack_entry(entry: bytes) -> Tuple[float, int, Optional[str]]:
+    value, height = _ENTRY.unpack_from(entry)
+    return value, height, entry[_ENTRY.size:].hex() or None
+
+
+def _pack_str(value: Optional[str]) -> bytes:
+    if value is None:
+        return _INDEX.pack(_NONE)
+    data = value.encode()
+    return _INDEX.pack(len(data)) + data
+
+
+def _write_snapshot(path: str, tip_hash, tip_height, utxos: dict, undo: list):
+    # Выполняется в пуле потоков по копии состояния.
+    parts = [
+        _SNAPSHOT_MAGIC,
+        _SNAPSHOT_HEADER.pack(UtxoTracker.SNAPSHOT_VERSION, tip_height, len(utxos), len(undo)),
+        _pack_str(tip_hash),
+    ]
+    for key, entry in utxos.items():
+        parts.append(_SIZES.pack(len(key), len(entry)))
+        parts.append(key)
+        parts.append(entry)
+    for block_hash, (prev_hash, created, spent) in undo:
+        parts.append(_pack_str(block_hash))
+        parts.append(_pack_str(prev_hash))
+        parts.append(_COUNTS.pack(len(created), len(spent)))
+        for key in created:
+            parts.append(_SIZES.pack(len(key), 0))
+            parts.append(key)
+        for key, entry in spent:
+            parts.append(_SIZES.pack(len(key), len(entry)))
+            parts.append(key)
+            parts.append(entry)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(b''.join(parts))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _Reader:
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, fmt: struct.Struct):
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def take(self, size: int) -> bytes:
+        if self.offset + size > len(self.data):
+            raise ValueError('Truncated snapshot')
+        value = bytes(self.data[self.offset:self.offset + size])
+        self.offset += size
+        return value
+
+    def text(self) -> Optional[str]:
+        size, = self.unpack(_INDEX)
+        return None if size == _NONE else self.take(size).decode()
+
+    def pair(self) -> Tuple[bytes, bytes]:
+        key_size, entry_size = self.unpack(_SIZES)
+        return self.take(key_size), self.take(entry_size)
+
+
+class UtxoTracker:
+    """Локальный набор непотраченных выходов, ведущийся по подключаемым блокам.
+
+    Трекер получает блоки от клиента (getblock с verbosity 2), применяет их
+    подключение и отключение при реорганизациях и периодически сохраняет
+    снимок состояния на диск. Можно отслеживать все выходы или только
+    выходы с указанными скриптами и адресами.
+
+    Выходы хранятся компактно: ключ - хэш outpoint (или txid и номер
+    выхода) в байтах, значение - упакованные сумма, высота и скрипт.
+    Снимок - двоичный файл того же вида; он записывается в пуле потоков
+    по копии набора, не блокируя цикл событий.
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        utxos (dict): Выходы: ключ (bytes) -> упакованная запись (bytes); см. items() и get().
+        tip_hash (Optional[str]): Хэш последнего примененного блока.
+        tip_height (int): Высота последнего примененного блока.
+    """
+
+    SNAPSHOT_VERSION = 2
+
+    def __init__(
+            self,
+            coind_implementation,
+            scripts=None,
+            addresses=None,
+            start_height: int = 0,
+            snapshot_path: Optional[str] = None,
+            snapshot_interval: int = 100,
+            max_reorg_depth: int = 100
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            scripts (Optional[Iterable[str]]): Отслеживаемые scriptPubKey в hex (опционально).
+            addresses (Optional[Iterable[str]]): Отслеживаемые адреса (опционально).
+            start_height (int): Высота, с которой начинается синхронизация (по умолчанию 0).
+            snapshot_path (Optional[str]): Путь к файлу снимка (опционально).
+            snapshot_interval (int): Количество блоков между снимками (по умолчанию 100).
+            max_reorg_depth (int): Глубина хранения данных для отката блоков (по умолчанию 100).
+        """
+        self.coind_implementation = coind_implementation
+        self.scripts = frozenset(scripts) if scripts is not None else None
+        self.addresses = frozenset(addresses) if addresses is not None else None
+        self.start_height = start_height
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.max_reorg_depth = max_reorg_depth
+        self.utxos = {}
+        self.tip_hash = None
+        self.tip_height = start_height - 1
+        self._undo = OrderedDict()
+        self._since_snapshot = 0
+        self._snapshot_task = None
+        if snapshot_path is not None and os.path.exists(snapshot_path):
+            self.load_snapshot()
+
+    def _is_tracked(self, script_pub_key: dict) -> bool:
+        if self.scripts is None and self.addresses is None:
+            return True
+        if self.scripts is not None and script_pub_key.get('hex') in self.scripts:
+            return True
+        if self.addresses is not None:
+            return any(address in self.addresses for address in script_pub_key.get('addresses', ()))
+        return False
+
+    @staticmethod
+    def _output_key(tx: dict, vout: dict) -> bytes:
+        if 'outpoint' in vout:
+            return bytes.fromhex(vout['outpoint'])
+        return bytes.fromhex(tx['txid']) + _INDEX.pack(vout['n'])
+
+    @staticmethod
+    def _input_key(vin: dict) -> Optional[bytes]:
+        if 'outpoint' in vin:
+            return bytes.fromhex(vin['outpoint'])
+        if 'txid' in vin:
+            return bytes.fromhex(vin['txid']) + _INDEX.pack(vin['vout'])
+        return None
+
+    def connect_block(self, block: dict):
+        """Применяет подключение блока к набору выходов.
+
+        Args:
+            block (dict): Блок в формате getblock с verbosity 2.
+
+        Raises:
+            ValueError: Если блок не продолжает текущую вершину.
+        """
+        if self.tip_hash is not None and block.get('previousblockhash') != self.tip_hash:
+            raise ValueError(f"Block {block['hash']} does not connect to tip {self.tip_hash}")
+        height = block['height']
+        created = []
+        spent = []
+        for tx in block['tx']:
+            for vin in tx.get('vin', ()):
+                key = self._input_key(vin)
+                entry = self.utxos.pop(key, None) if key is not None else None
+                if entry is not None:
+                    spent.append((key, entry))
+            for vout in tx.get('vout', ()):
+                script_pub_key = vout.get('scriptPubKey', {})
+                if self._is_tracked(script_pub_key):
+                    key = self._output_key(tx, vout)
+                    self.utxos[key] = _pack_entry(vout['value'], height, script_pub_key.get('hex'))
+                    created.append(key)
+        self._undo[block['hash']] = (block.get('previousblockhash'), created, spent)
+        while len(self._undo) > self.max_reorg_depth:
+            self._undo.popitem(last=False)
+        self.tip_hash = block['hash']
+        self.tip_height = height
+        self._since_snapshot += 1
+        if self.snapshot_path is not None and self._since_snapshot >= self.snapshot_interval:
+            self._schedule_snapshot()
+
+    def disconnect_block(self):
+        """Откатывает последний примененный блок.
+
+        Returns:
+            str: Хэш отключенного блока.
+
+        Raises:
+            ValueError: Если данные для отката недоступны.
+        """
+        if not self._undo or next(reversed(self._undo)) != self.tip_hash:
+            raise ValueError(f'No undo data for block {self.tip_hash}')
+        block_hash, (prev_hash, created, spent) = self._undo.popitem()
+        # Сначала восстанавливаются потраченные выходы, затем удаляются созданные:
+        # выход, созданный и потраченный внутри блока, не должен остаться в наборе.
+        for key, entry in reversed(spent):
+            self.utxos[key] = entry
+        for key in created:
+            self.utxos.pop(key, None)
+        self.tip_hash = prev_hash
+        self.tip_height -= 1
+        return block_hash
+
+    async def sync(self):
+        """Догоняет лучший блок узла, откатывая блоки, ушедшие из основной цепи.
+
+        Returns:
+            int: Высота вершины после синхронизации.
+        """
+        blockchain = self.coind_implementation.blockchain
+        while True:
+            while self.tip_hash is not None:
+                header = await blockchain.get_block_header(self.tip_hash)
+                if header.get('confirmations', 0) >= 0:
+                    break
+                self.disconnect_block()
+            best_height = await blockchain.get_block_count()
+            if self.tip_height >= best_height:
+                return self.tip_height
+            reorged = False
+            for height in range(self.tip_height + 1, best_height + 1):
+                block_hash = await blockchain.get_block_hash(height)
+                block = await blockchain.get_block(block_hash, 2)
+                if self.tip_hash is not None and block.get('previousblockhash') != self.tip_hash:
+                    reorged = True
+                    break
+                self.connect_block(block)
+            if not reorged:
+                await self.wait_snapshot()
+                return self.tip_height
+
+    def get(self, txid_or_outpoint: str, n: Optional[int] = None):
+        """Возвращает выход (сумма, высота, скрипт) или None, если он потрачен или не отслеживается.
+
+        Args:
+            txid_or_outpoint (str): Хэш outpoint, 'txid:n' или идентификатор транзакции.
+            n (Optional[int]): Номер выхода, если передан идентификатор транзакции (опционально).
+        """
+        key = _pack_key(txid_or_outpoint) if n is None else bytes.fromhex(txid_or_outpoint) + _INDEX.pack(n)
+        entry = self.utxos.get(key)
+        return None if entry is None else _unpack_entry(entry)
+
+    def items(self) -> Iterator[Tuple[str, Tuple[float, int, Optional[str]]]]:
+        """Перебирает выходы в виде пар (outpoint или 'txid:n', (сумма, высота, скрипт))."""
+        for key, entry in self.utxos.items():
+            yield _unpack_key(key), _unpack_entry(entry)
+
+    def balance(self, script: str) -> float:
+        """Возвращает сумму непотраченных выходов для scriptPubKey."""
+        script = bytes.fromhex(script)
+        size = _ENTRY.size
+        return math.fsum(
+            _ENTRY.unpack_from(entry)[0] for entry in self.utxos.values() if entry[size:] == script
+        )
+
+    def stats(self) -> dict:
+        """Возвращает агрегированную статистику по набору выходов.
+
+        Returns:
+            dict: Высота, хэш вершины, количество выходов и их общая сумма.
+        """
+        return {
+            'height': self.tip_height,
+            'bestblock': self.tip_hash,
+            'txouts': len(self.utxos),
+            'total_amount': math.fsum(_ENTRY.unpack_from(entry)[0] for entry in self.utxos.values()),
+        }
+
+    def _snapshot_state(self) -> tuple:
+        # Записи неизменяемы, поэтому достаточно поверхностных копий.
+        return self.snapshot_path, self.tip_hash, self.tip_height, dict(self.utxos), list(self._undo.items())
+
+    def _schedule_snapshot(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save_snapshot()
+            return
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            # Предыдущий снимок еще пишется; повторить на следующем блоке.
+            return
+        self._since_snapshot = 0
+        self._snapshot_task = loop.run_in_executor(None, _write_snapshot, *self._snapshot_state())
+        self._snapshot_task.add_done_callback(self._snapshot_written)
+
+    def _snapshot_written(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error('Failed to write UTXO snapshot %s', self.snapshot_path, exc_info=future.exception())
+            self._since_snapshot = self.snapshot_interval
+
+    async def wait_snapshot(self):
+        """Ожидает завершения записи снимка, запущенной connect_block."""
+        if self._snapshot_task is not None:
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+            self._snapshot_task = None
+
+    def save_snapshot(self):
+        """Атомарно сохраняет состояние трекера в snapshot_path (синхронно)."""
+        _write_snapshot(*self._snapshot_state())
+        self._since_snapshot = 0
+
+    def load_snapshot(self):
+        """Загружает состояние трекера из snapshot_path.
+
+        Raises:
+            ValueError: Если файл не является снимком поддерживаемой версии или поврежден.
+        """
+        with open(self.snapshot_path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(_SNAPSHOT_MAGIC):
+            raise ValueError('Not a UTXO snapshot')
+        reader = _Reader(data)
+        reader.offset = len(_SNAPSHOT_MAGIC)
+        try:
+            version, tip_height, utxo_count, undo_count = reader.unpack(_SNAPSHOT_HEADER)
+            if version != self.SNAPSHOT_VERSION:
+                raise ValueError(f'Unsupported snapshot version {version}')
+            tip_hash = reader.text()
+            utxos = dict(reader.pair() for _ in range(utxo_count))
+            undo = OrderedDict()
+            for _ in range(undo_count):
+                block_hash = reader.text()
+                prev_hash = reader.text()
+                created_count, spent_count = reader.unpack(_COUNTS)
+                created = [reader.pair()[0] for _ in range(created_count)]
+                spent = [reader.pair() for _ in range(spent_count)]
+                undo[block_hash] = (prev_hash, created, spent)
+        except struct.error:
+            raise ValueError('Truncated snapshot') from None
+        self.tip_hash = tip_hash
+        self.tip_height = tip_height
+        self.utxos = utxos
+        self._undo = undo
+        self._since_snapshot = 0
@@ -1,4 +1,6 @@
-from typing import Optional, List, Dict, Union
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Optional, List, Dict, Union
 
 
 class Wallet:
@@ -454,6 +456,127 @@ class Wallet:
         params = [account, count, from_, include_watch_only]
         return await self.coind_implementation.fetch('listtransactionsfrom', params)
 
+    async def _iter_pages(
+            self,
+            method: str,
+            account: str,
+            page_size: int,
+            prefetch: int,
+            include_watch_only: bool,
+            newest_first: bool,
+            overlap: int
+    ) -> AsyncIterator[Dict[str, Union[str, float]]]:
+        """Постранично обходит список транзакций с упреждающей загрузкой страниц.
+
+        Одновременно загружается не более prefetch страниц впереди текущей.
+        Новые транзакции сдвигают записи на следующую страницу, а удаленные
+        (например, отмененные) - на предыдущую, уже прочитанную. Поэтому
+        каждая страница после первой захватывает overlap записей предыдущей,
+        а повторы отбрасываются по ключам записей последних prefetch + 1 страниц.
+        """
+        if page_size <= 0:
+            raise ValueError('page_size must be positive')
+        if overlap < 0:
+            raise ValueError('overlap must not be negative')
+        pending = deque()
+        offset = 0
+
+        def schedule():
+            nonlocal offset
+            start = max(offset - overlap, 0)
+            count = offset + page_size - start
+            params = [account, count, start, include_watch_only]
+            pending.append((count, asyncio.ensure_future(self.coind_implementation.fetch(method, params))))
+            offset += page_size
+
+        recent_keys = deque(maxlen=prefetch + 1)
+        for _ in range(prefetch + 1):
+            schedule()
+        try:
+            while pending:
+                count, task = pending.popleft()
+                page = await task
+                last_page = len(page) < count
+                if not last_page:
+                    schedule()
+                seen = set().union(*recent_keys)
+                keys = set()
+                for entry in reversed(page) if newest_first else page:
+                    key = (entry.get('txid'), entry.get('vout'), entry.get('category'), entry.get('address'))
+                    keys.add(key)
+                    if key not in seen:
+                        yield entry
+                recent_keys.append(keys)
+                if last_page:
+                    break
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def iter_transactions(
+            self,
+            page_size: int = 100,
+            prefetch: int = 2,
+            account: Optional[str] = "*",
+            include_watch_only: Optional[bool] = False,
+            overlap: int = 10
+    ) -> AsyncIterator[Dict[str, Union[str, float]]]:
+        """Асинхронно перебирает транзакции аккаунта от новых к старым.
+
+        Следующие prefetch страниц listtransactions загружаются параллельно
+        с обработкой текущей; в памяти хранится не более prefetch + 1 страниц.
+
+        Args:
+            page_size (int): Размер страницы (по умолчанию 100).
+            prefetch (int): Количество страниц, загружаемых заранее (по умолчанию 2).
+            account (Optional[str]): Имя аккаунта (опционально).
+            include_watch_only (Optional[bool]): Включить наблюдаемые адреса (опционально).
+            overlap (int): Количество записей предыдущей страницы, загружаемых повторно,
+                чтобы не пропустить записи, сдвинутые удалением транзакций (по умолчанию 10).
+
+        Yields:
+            Dict[str, Union[str, float]]: Транзакция.
+        """
+        pages = self._iter_pages('listtransactions', account, page_size, prefetch, include_watch_only, True, overlap)
+        try:
+            async for entry in pages:
+                yield entry
+        finally:
+            # Закрываем сразу, иначе загрузка страниц отменится только при сборке мусора.
+            await pages.aclose()
+
+    async def iter_transactions_from(
+            self,
+            page_size: int = 100,
+            prefetch: int = 2,
+            account: Optional[str] = "*",
+            include_watch_only: Optional[bool] = False,
+            overlap: int = 10
+    ) -> AsyncIterator[Dict[str, Union[str, float]]]:
+        """Асинхронно перебирает транзакции аккаунта через listtransactionsfrom.
+
+        Записи выдаются в порядке, возвращаемом узлом; страницы загружаются
+        заранее так же, как в iter_transactions.
+
+        Args:
+            page_size (int): Размер страницы (по умолчанию 100).
+            prefetch (int): Количество страниц, загружаемых заранее (по умолчанию 2).
+            account (Optional[str]): Имя аккаунта (опционально).
+            include_watch_only (Optional[bool]): Включить наблюдаемые адреса (опционально).
+            overlap (int): Количество записей предыдущей страницы, загружаемых повторно,
+                чтобы не пропустить записи, сдвинутые удалением транзакций (по умолчанию 10).
+
+        Yields:
+            Dict[str, Union[str, float]]: Транзакция.
+        """
+        pages = self._iter_pages('listtransactionsfrom', account, page_size, prefetch, include_watch_only, False, overlap)
+        try:
+            async for entry in pages:
+                yield entry
+        finally:
+            # Закрываем сразу, иначе загрузка страниц отменится только при сборке мусора.
+            await pages.aclose()
+
     async def list_unspent(
             self,
             min_conf: Optional[int] = 1,
@@ -0,0 +1,133 @@
+from typing import Iterable, List, NamedTuple, Optional
+
+from .storage import read_json, write_json
+
+NEW = 'new'
+CHANGED = 'changed'
+REMOVED = 'removed'
+
+
+class DepositEvent(NamedTuple):
+    """Изменение входящей транзакции кошелька.
+
+    Attributes:
+        kind (str): 'new', 'changed' или 'removed'.
+        status (str): 'conflicted', 'unconfirmed', 'confirming' или 'final'.
+        entry (dict): Запись транзакции из listsinceblock.
+    """
+    kind: str
+    status: str
+    entry: dict
+
+
+class WalletSync:
+    """Инкрементальная синхронизация кошелька через listsinceblock.
+
+    Курсор (хэш последнего блока) и состояние транзакций текущего окна
+    хранятся в файле, поэтому после перезапуска синхронизация продолжается
+    с места остановки. Транзакции из перекрывающихся окон сравниваются
+    с сохраненным состоянием, и наружу выдаются только новые и изменившиеся
+    записи, а также удаленные после реорганизации.
+
+    Состояние фиксируется отдельным вызовом commit() после обработки событий,
+    так что при сбое события будут выданы повторно, а не потеряны.
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        state_path (str): Путь к файлу состояния.
+        cursor (str): Хэш блока, с которого выполняется следующий запрос.
+    """
+
+    def __init__(
+            self,
+            coind_implementation,
+            state_path: str,
+            target_confirmations: int = 6,
+            categories: Optional[Iterable[str]] = ('receive',),
+            include_watch_only: bool = False
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            state_path (str): Путь к файлу состояния.
+            target_confirmations (int): Количество подтверждений для статуса 'final' (по умолчанию 6).
+            categories (Optional[Iterable[str]]): Отслеживаемые категории (None - все, по умолчанию 'receive').
+            include_watch_only (bool): Включить наблюдаемые адреса (по умолчанию False).
+        """
+        self.coind_implementation = coind_implementation
+        self.state_path = state_path
+        self.target_confirmations = target_confirmations
+        self.categories = frozenset(categories) if categories is not None else None
+        self.include_watch_only = include_watch_only
+        state = read_json(state_path, {'cursor': '', 'known': {}})
+        self.cursor = state['cursor']
+        self._known = state['known']
+        self._staged = None
+
+    @staticmethod
+    def _key(entry: dict) -> str:
+        return f"{entry.get('txid')}:{entry.get('vout')}:{entry.get('address')}:{entry.get('category')}"
+
+    def _status(self, entry: dict) -> str:
+        confirmations = entry.get('confirmations', 0)
+        if confirmations < 0:
+            return 'conflicted'
+        if confirmations == 0:
+            return 'unconfirmed'
+        if confirmations < self.target_confirmations:
+            return 'confirming'
+        return 'final'
+
+    def _tracked(self, entry: dict) -> bool:
+        return self.categories is None or entry.get('category') in self.categories
+
+    async def poll(self) -> List[DepositEvent]:
+        """Запрашивает изменения с момента курсора.
+
+        Returns:
+            List[DepositEvent]: Новые, изменившиеся и удаленные транзакции.
+        """
+        result = await self.coind_implementation.wallet.list_since_block(
+            self.cursor, self.target_confirmations, self.include_watch_only)
+        events = []
+        known = {}
+        for entry in result.get('transactions', ()):
+            if not self._tracked(entry):
+                continue
+            key = self._key(entry)
+            status = self._status(entry)
+            state = [status, entry.get('blockhash')]
+            known[key] = state
+            previous = self._known.get(key)
+            if previous is None:
+                events.append(DepositEvent(NEW, status, entry))
+            elif previous != state:
+                events.append(DepositEvent(CHANGED, status, entry))
+        for entry in result.get('removed', ()):
+            if not self._tracked(entry):
+                continue
+            key = self._key(entry)
+            # Транзакция, снова попавшая в основную цепь, есть в transactions этого же ответа.
+            if key in self._known and key not in known:
+                events.append(DepositEvent(REMOVED, self._status(entry), entry))
+        self._staged = {'cursor': result.get('lastblock', self.cursor), 'known': known}
+        return events
+
+    def commit(self):
+        """Фиксирует состояние после обработки событий последнего poll()."""
+        if self._staged is None:
+            return
+        write_json(self.state_path, self._staged)
+        self.cursor = self._staged['cursor']
+        self._known = self._staged['known']
+        self._staged = None
+
+    async def sync(self) -> List[DepositEvent]:
+        """Выполняет poll() и сразу фиксирует состояние.
+
+        Returns:
+            List[DepositEvent]: Новые, изменившиеся и удаленные транзакции.
+        """
+        events = await self.poll()
+        self.commit()
+        return events
@@ -1,3 +1,19 @@
+import asyncio
+import inspect
+import logging
+from typing import Dict, Iterable, NamedTuple, Optional
+
+try:
+    import zmq as _zmq
+    import zmq.asyncio as _zmq_asyncio
+except ImportError:
+    _zmq = None
+    _zmq_asyncio = None
+
+from ..exceptions import CoindError
+
+logger = logging.getLogger(__name__)
+
 
 class Zmq:
 
@@ -11,3 +27,312 @@ class Zmq:
             dict: Конфигурация ZMQ-уведомлений.
         """
         return await self.coind_implementation.fetch('getzmqnotifications')
+
+    def subscriber(self, topics: Iterable[str] = None, **kwargs) -> 'ZmqSubscriber':
+        """Создает подписчика на ZMQ-уведомления узла.
+
+        Args:
+            topics (Iterable[str]): Темы уведомлений (по умолчанию все поддерживаемые).
+            **kwargs: Дополнительные параметры ZmqSubscriber.
+
+        Returns:
+            ZmqSubscriber: Подписчик на уведомления.
+        """
+        return ZmqSubscriber(self.coind_implementation, topics, **kwargs)
+
+
+class ZmqNotification(NamedTuple):
+    """Уведомление узла.
+
+    Attributes:
+        topic (str): Тема уведомления ('hashblock', 'hashtx', 'rawblock' или 'rawtx').
+        body (bytes): Тело уведомления (хэш или сериализованные данные).
+        sequence (Optional[int]): Порядковый номер сообщения (None в режиме опроса).
+    """
+    topic: str
+    body: bytes
+    sequence: Optional[int]
+
+
+class ZmqStream:
+    """Асинхронный итератор по уведомлениям для одного потребителя.
+
+    При переполнении очереди самое старое уведомление отбрасывается,
+    а счетчик dropped увеличивается.
+    """
+
+    def __init__(self, subscriber, topics, maxsize):
+        self._subscriber = subscriber
+        self.topics = frozenset(topics)
+        self.dropped = 0
+        self._queue = asyncio.Queue(maxsize=maxsize)
+
+    def _push(self, notification: ZmqNotification):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(notification)
+
+    def close(self):
+        """Отписывает поток от уведомлений."""
+        self._subscriber._streams.discard(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ZmqNotification:
+        return await self._queue.get()
+
+
+class ZmqSubscriber:
+    """Асинхронный подписчик на ZMQ-уведомления узла.
+
+    Адреса публикации определяются вызовом getzmqnotifications. Порядковые
+    номера сообщений отслеживаются по каждой теме для обнаружения пропусков.
+    Если библиотека pyzmq не установлена, все темы получаются опросом
+    getbestblockhash и getrawtxpool; темы, которые узел не публикует,
+    опрашиваются, а остальные принимаются по ZMQ. Обработчики вызываются
+    по очереди в отдельной задаче, поэтому медленный обработчик не
+    задерживает прием сообщений. Ошибки узла и обработчиков записываются
+    в журнал и не останавливают прием уведомлений.
+
+    Attributes:
+        coind_implementation (CoindImplementation): Клиент Coind.
+        topics (frozenset): Темы уведомлений.
+        endpoints (Dict[str, str]): Адреса публикации по темам.
+        polling (bool): True, если хотя бы одна тема получается опросом.
+        polled_topics (frozenset): Темы, получаемые опросом.
+        gaps (Dict[str, int]): Количество пропущенных сообщений по темам.
+        dropped_callbacks (int): Количество вызовов обработчиков, отброшенных при переполнении очереди.
+    """
+
+    TOPICS = ('hashblock', 'hashtx', 'rawblock', 'rawtx')
+
+    def __init__(
+            self,
+            coind_implementation,
+            topics: Iterable[str] = None,
+            endpoints: Optional[Dict[str, str]] = None,
+            poll_interval: float = 1.0,
+            queue_size: int = 1000,
+            use_zmq: Optional[bool] = None
+    ):
+        """
+        Args:
+            coind_implementation (CoindImplementation): Клиент Coind.
+            topics (Iterable[str]): Темы уведомлений (по умолчанию все поддерживаемые).
+            endpoints (Optional[Dict[str, str]]): Адреса публикации по темам вместо getzmqnotifications (опционально).
+            poll_interval (float): Интервал опроса в режиме без ZMQ в секундах (по умолчанию 1).
+            queue_size (int): Размер очереди каждого потока и очереди обработчиков (по умолчанию 1000).
+            use_zmq (Optional[bool]): Принудительно включить или отключить ZMQ (по умолчанию автоматически).
+        """
+        self.coind_implementation = coind_implementation
+        self.topics = frozenset(self.TOPICS if topics is None else topics)
+        unknown = self.topics.difference(self.TOPICS)
+        if unknown:
+            raise ValueError(f'Unknown ZMQ topics: {sorted(unknown)}')
+        self.endpoints = endpoints
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.use_zmq = _zmq is not None if use_zmq is None else use_zmq and _zmq is not None
+        self.polling = False
+        self.polled_topics = frozenset()
+        self.gaps = {topic: 0 for topic in self.topics}
+        self.dropped_callbacks = 0
+        self._sequences = {}
+        self._callbacks = {topic: [] for topic in self.topics}
+        self._gap_callbacks = []
+        self._streams = set()
+        self._pending = asyncio.Queue(maxsize=queue_size)
+        self._context = None
+        self._sockets = []
+        self._tasks = []
+
+    def on(self, topic: str, callback):
+        """Регистрирует обработчик уведомлений темы.
+
+        Args:
+            topic (str): Тема уведомления.
+            callback (Callable[[ZmqNotification], Any]): Обычная функция или корутина.
+        """
+        self._callbacks[topic].append(callback)
+
+    def on_gap(self, callback):
+        """Регистрирует обработчик пропуска сообщений.
+
+        Args:
+            callback (Callable[[str, int], Any]): Принимает тему и количество пропущенных сообщений.
+        """
+        self._gap_callbacks.append(callback)
+
+    def stream(self, topics: Iterable[str] = None) -> ZmqStream:
+        """Создает асинхронный итератор по уведомлениям.
+
+        Args:
+            topics (Iterable[str]): Темы уведомлений (по умолчанию все темы подписчика).
+
+        Returns:
+            ZmqStream: Поток уведомлений.
+        """
+        stream = ZmqStream(self, self.topics if topics is None else topics, self.queue_size)
+        self._streams.add(stream)
+        return stream
+
+    async def discover(self) -> Dict[str, str]:
+        """Определяет адреса публикации нужных тем через getzmqnotifications.
+
+        Returns:
+            Dict[str, str]: Адреса публикации по темам.
+        """
+        notifications = await self.coind_implementation.zmq.get_zmq_notifications()
+        if isinstance(notifications, dict):
+            notifications = [{'type': key, 'address': value} for key, value in notifications.items()]
+        endpoints = {}
+        for notification in notifications:
+            topic = notification['type']
+            topic = topic[3:] if topic.startswith('pub') else topic
+            if topic in self.topics:
+                endpoints[topic] = notification['address']
+        return endpoints
+
+    def _schedule(self, callback, *args):
+        if self._pending.full():
+            self._pending.get_nowait()
+            self.dropped_callbacks += 1
+        self._pending.put_nowait((callback, args))
+
+    async def _run_callbacks(self):
+        while True:
+            callback, args = await self._pending.get()
+            try:
+                result = callback(*args)
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('ZMQ callback %r failed', callback)
+
+    def _dispatch(self, notification: ZmqNotification):
+        for stream in tuple(self._streams):
+            if notification.topic in stream.topics:
+                stream._push(notification)
+        for callback in self._callbacks[notification.topic]:
+            self._schedule(callback, notification)
+
+    def _check_sequence(self, topic: str, sequence: int):
+        last = self._sequences.get(topic)
+        self._sequences[topic] = sequence
+        if last is None:
+            return
+        missed = (sequence - last - 1) & 0xFFFFFFFF
+        if missed:
+            self.gaps[topic] += missed
+            for callback in self._gap_callbacks:
+                self._schedule(callback, topic, missed)
+
+    async def _receive(self, socket):
+        while True:
+            frames = await socket.recv_multipart()
+            topic = frames[0].decode()
+            sequence = None
+            try:
+                if len(frames) > 2 and len(frames[2]) == 4:
+                    sequence = int.from_bytes(frames[2], 'little')
+                    self._check_sequence(topic, sequence)
+                self._dispatch(ZmqNotification(topic, frames[1], sequence))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Failed to handle ZMQ notification %s', topic)
+
+    async def _poll(self, topics: frozenset):
+        blockchain = self.coind_implementation.blockchain
+        raw_transactions = self.coind_implementation.raw_transactions
+        best = None
+        txpool = None
+        while True:
+            try:
+                if topics.intersection(('hashblock', 'rawblock')):
+                    tip = await blockchain.get_best_block_hash()
+                    if tip != best:
+                        if best is not None:
+                            if 'hashblock' in topics:
+                                self._dispatch(ZmqNotification('hashblock', bytes.fromhex(tip), None))
+                            if 'rawblock' in topics:
+                                block = await blockchain.get_block(tip, 0)
+                                self._dispatch(ZmqNotification('rawblock', bytes.fromhex(block), None))
+                        best = tip
+                if topics.intersection(('hashtx', 'rawtx')):
+                    current = set(await blockchain.get_raw_tx_pool())
+                    if txpool is not None:
+                        for txid in current.difference(txpool):
+                            if 'rawtx' in topics:
+                                try:
+                                    raw = await raw_transactions.get_raw_transaction(txid)
+                                except CoindError as e:
+                                    if e.code != -5:
+                                        raise
+                                    # Транзакция уже вытеснена из пула или попала в блок.
+                                    txpool.add(txid)
+                                    continue
+                            if 'hashtx' in topics:
+                                self._dispatch(ZmqNotification('hashtx', bytes.fromhex(txid), None))
+                            if 'rawtx' in topics:
+                                self._dispatch(ZmqNotification('rawtx', bytes.fromhex(raw), None))
+                            txpool.add(txid)
+                    txpool = current
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Следующая итерация повторит необработанные изменения.
+                logger.exception('ZMQ polling iteration failed')
+            await asyncio.sleep(self.poll_interval)
+
+    async def start(self):
+        """Подключается к адресам публикации и запускает опрос тем, которые узел не публикует."""
+        self._tasks.append(asyncio.ensure_future(self._run_callbacks()))
+        endpoints = self.endpoints
+        if self.use_zmq and endpoints is None:
+            endpoints = await self.discover()
+        endpoints = {
+            topic: address for topic, address in (endpoints or {}).items() if topic in self.topics
+        } if self.use_zmq else {}
+        if endpoints:
+            self.endpoints = endpoints
+            self._context = _zmq_asyncio.Context()
+            topics_by_address = {}
+            for topic, address in endpoints.items():
+                topics_by_address.setdefault(address, []).append(topic)
+            for address, topics in topics_by_address.items():
+                socket = self._context.socket(_zmq.SUB)
+                socket.setsockopt(_zmq.RCVHWM, 0)
+                for topic in topics:
+                    socket.setsockopt(_zmq.SUBSCRIBE, topic.encode())
+                socket.connect(address)
+                self._sockets.append(socket)
+                self._tasks.append(asyncio.ensure_future(self._receive(socket)))
+        self.polled_topics = self.topics.difference(endpoints)
+        if self.polled_topics:
+            self.polling = True
+            self._tasks.append(asyncio.ensure_future(self._poll(self.polled_topics)))
+
+    async def stop(self):
+        """Останавливает прием уведомлений и закрывает сокеты."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for socket in self._sockets:
+            socket.close(linger=0)
+        self._sockets = []
+        if self._context is not None:
+            self._context.term()
+            self._context = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
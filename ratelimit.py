@@ -0,0 +1,151 @@
+import asyncio
+from time import monotonic
+
+HEAVY = 'heavy'
+
+# Methods that scan the UTXO set, the block index or the wallet and can take minutes.
+HEAVY_METHODS = frozenset({
+    'backupwallet',
+    'dumpwallet',
+    'gettxoutsetinfo',
+    'importprunedfunds',
+    'importwallet',
+    'scantokens',
+    'validatechainhistory',
+    'verifychain',
+})
+
+# listtransactions pages larger than this are treated as heavy.
+LARGE_LIST_COUNT = 1000
+
+
+def classify(method, params):
+    """
+    Return the group of a call for rate limiting and routing.
+
+    Besides HEAVY_METHODS, listtransactions with a large count and imports
+    with rescan are heavy. Imports without the rescan argument are heavy too,
+    since Coind rescans by default.
+
+    Args:
+        method (str): Coind method.
+        params (list): Method parameters.
+
+    Returns:
+        str: HEAVY, or None for ordinary calls.
+    """
+    if method in HEAVY_METHODS:
+        return HEAVY
+    if method == 'listtransactions' or method == 'listtransactionsfrom':
+        if len(params) > 1 and isinstance(params[1], int) and params[1] > LARGE_LIST_COUNT:
+            return HEAVY
+    elif method == 'importaddresses' or method == 'importprivatekeys':
+        if params and params[0] == 'rescan':
+            return HEAVY
+    elif method == 'importprivkey' or method == 'importpubkey':
+        if len(params) < 2 or params[-1] is True:
+            return HEAVY
+    elif method == 'importaddress':
+        if len(params) < 3 or params[-2] is True:
+            return HEAVY
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket with FIFO waiting.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (float): Bucket capacity.
+        tokens (float): Tokens currently available.
+    """
+
+    def __init__(self, rate, burst=1):
+        """
+        Initialize the TokenBucket instance.
+
+        Args:
+            rate (float): Tokens added per second.
+            burst (float): Bucket capacity (default is 1).
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _take(self, tokens):
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens=1):
+        """
+        Wait until tokens are available and take them.
+
+        Args:
+            tokens (float): Number of tokens (default is 1).
+
+        Raises:
+            ValueError: If more tokens than the bucket capacity are requested,
+                since they would never become available.
+        """
+        if tokens > self.burst:
+            raise ValueError(f'Cannot acquire {tokens} tokens from a bucket of {self.burst}')
+        if not self._lock.locked() and self._take(tokens):
+            return
+        async with self._lock:
+            while not self._take(tokens):
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limits per Coind method or method group.
+
+    A call waits for the bucket of its method and for the bucket of its
+    group (see classify()), so that e.g. all heavy calls share one budget
+    while a single method can have a tighter one. Calls without a bucket
+    are not delayed.
+
+    Attributes:
+        buckets (dict): TokenBucket by method or group name.
+        classifier (callable): Function (method, params) -> group name or None.
+    """
+
+    def __init__(self, limits, classifier=classify):
+        """
+        Initialize the RateLimiter instance.
+
+        Args:
+            limits (dict): Limits by method or group name, as TokenBucket instances
+                or (rate, burst) pairs, e.g. {'heavy': (0.2, 1), 'getblock': (50, 100)}.
+            classifier (callable): Function (method, params) -> group name or None (default is classify).
+        """
+        self.buckets = {
+            name: limit if isinstance(limit, TokenBucket) else TokenBucket(*limit)
+            for name, limit in limits.items()
+        }
+        self.classifier = classifier
+
+    async def acquire(self, method, params):
+        """
+        Wait until the call is allowed by its method and group limits.
+
+        Args:
+            method (str): Coind method.
+            params (list): Method parameters.
+        """
+        bucket = self.buckets.get(method)
+        if bucket is not None:
+            await bucket.acquire()
+        group = self.classifier(method, params)
+        if group is not None:
+            bucket = self.buckets.get(group)
+            if bucket is not None:
+                await bucket.acquire()
@@ -1,7 +1,10 @@
-from aiohttp import ClientSession
+from aiohttp import ClientTimeout, TCPConnector
 
 from .coind import CoindImplementation
 from .http import HttpProvider
+from .limiter import AdaptiveLimiter
+from .metrics import Metrics
+from .ratelimit import HEAVY, RateLimiter, classify
 
 
 class CoindSession:
@@ -10,10 +13,30 @@ class CoindSession:
 
     Attributes:
         http_provider (HttpProvider): HTTP provider for Coind.
-        session (ClientSession): AIOHTTP client session.
+        session (ClientSession): AIOHTTP client session, or None when the transport does not use one.
+        metrics (Metrics): Per-method call metrics, or None when disabled.
+        hooks (Hooks): Request lifecycle hooks, or None when disabled.
+        limiter (AdaptiveLimiter): Adaptive concurrency limiter, or None when disabled.
+        rate_limiter (RateLimiter): Per-method rate limits, or None when disabled.
+        heavy_session (ClientSession): AIOHTTP client session of the heavy call pool, or None when disabled.
     """
 
-    def __init__(self, username, password, port=5996, host='127.0.0.1'):
+    def __init__(
+            self,
+            username,
+            password,
+            port=5996,
+            host='127.0.0.1',
+            metrics=False,
+            hooks=None,
+            transport=None,
+            limiter=False,
+            rate_limits=None,
+            timeout=None,
+            heavy_pool_size=None,
+            heavy_timeout=3600,
+            heavy_methods=classify
+    ):
         """
         Initialize the CoindSession instance.
 
@@ -22,9 +45,56 @@ class CoindSession:
             password (str): Coind password.
             port (int): Coind port (default is 5996).
             host (str): Coind host (default is '127.0.0.1').
+            metrics (bool or Metrics): Collect per-method call metrics (default is False).
+            hooks (Hooks): Request lifecycle hooks (default is None).
+            transport (Transport): Transport for request bodies, e.g. a RecordingTransport (default is None).
+            limiter (bool or AdaptiveLimiter): Adapt the number of in-flight requests to the
+                daemon's capacity (default is False).
+            rate_limits (dict or RateLimiter): Token-bucket limits by method or group, e.g.
+                {'heavy': (0.1, 1)}; calls wait instead of failing (default is None).
+            timeout (float): Total timeout of ordinary calls in seconds (default is the AIOHTTP default).
+            heavy_pool_size (int): Connections of a separate pool for heavy calls, so that they
+                do not hold up the main pool; None or 0 sends them through the main pool
+                (default is None). By default heavy calls are those in ratelimit.HEAVY_METHODS,
+                listtransactions with a count above ratelimit.LARGE_LIST_COUNT, and import*
+                calls with rescan enabled. Has no effect with transports that do not use
+                AIOHTTP sessions, such as KeepAliveTransport.
+            heavy_timeout (float): Total timeout of heavy calls in seconds (default is 3600).
+            heavy_methods (callable or set): Method names, or a function (method, params) -> group
+                or None, selecting heavy calls (default is ratelimit.classify).
         """
-        self.http_provider = HttpProvider(f'http://{username}:{password}@{host}:{port}')
+        if metrics is True:
+            metrics = Metrics()
+        if limiter is True:
+            limiter = AdaptiveLimiter()
+        self.metrics = metrics or None
+        self.hooks = hooks
+        self.limiter = limiter or None
+        if rate_limits is not None and not isinstance(rate_limits, RateLimiter):
+            rate_limits = RateLimiter(rate_limits)
+        self.rate_limiter = rate_limits
+        if self.metrics is not None and self.limiter is not None:
+            self.metrics.gauge('concurrency_limit', lambda: self.limiter.limit)
+            self.metrics.gauge('concurrency_in_flight', lambda: self.limiter.in_flight)
+            self.metrics.gauge('concurrency_queued', lambda: self.limiter.queued)
+        self.http_provider = HttpProvider(
+            f'http://{username}:{password}@{host}:{port}',
+            self.metrics,
+            hooks,
+            transport,
+            self.limiter,
+            self.rate_limiter,
+        )
+        self.timeout = timeout
+        self.heavy_pool_size = heavy_pool_size
+        self.heavy_timeout = heavy_timeout
+        if callable(heavy_methods):
+            self.route = heavy_methods
+        else:
+            heavy_methods = frozenset(heavy_methods)
+            self.route = lambda method, params: HEAVY if method in heavy_methods else None
         self.session = None
+        self.heavy_session = None
 
     async def __aenter__(self):
         """
@@ -33,8 +103,19 @@ class CoindSession:
         Returns:
             CoindImplementation instance.
         """
-        self.session = ClientSession()
-        return CoindImplementation(self.http_provider, self.session)
+        if not self.http_provider.client.transport.needs_session:
+            return CoindImplementation(self.http_provider, None)
+        if self.timeout is None:
+            self.session = self.http_provider.new_session()
+        else:
+            self.session = self.http_provider.new_session(timeout=ClientTimeout(total=self.timeout))
+        if self.heavy_pool_size:
+            # Heavy calls get their own connections, so they never hold up the main pool.
+            self.heavy_session = self.http_provider.new_session(
+                connector=TCPConnector(limit=self.heavy_pool_size),
+                timeout=ClientTimeout(total=self.heavy_timeout),
+            )
+        return CoindImplementation(self.http_provider, self.session, self.heavy_session, self.route)
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """
@@ -45,4 +126,8 @@ class CoindSession:
             exc_val: Exception value.
             exc_tb: Exception traceback.
         """
-        await self.session.close()
+        if self.session is not None:
+            await self.session.close()
+        if self.heavy_session is not None:
+            await self.heavy_session.close()
+        await self.http_provider.close()
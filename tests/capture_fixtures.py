@@ -0,0 +1,140 @@
+"""
+Capture node responses used as test fixtures.
+
+Run against a node with a wallet (regtest is fine):
+
+    python -m aio_coind.tests.capture_fixtures --port 7228 --user u --password p
+
+The responses are written to tests/fixtures/node_*.json; tests that
+compare the local implementations with the node are skipped until they exist.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from ..exceptions import CoindError
+from ..session import CoindSession
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+MESSAGES = ['Hello, world!', '', 'Привет, мир!', 'x' * 300]
+
+
+def _flip_last(address):
+    last = address[-1]
+    return address[:-1] + ('q' if last != 'q' else 'p')
+
+
+async def _error(call):
+    try:
+        await call
+    except CoindError as e:
+        return [e.code, e.msg]
+    return None
+
+
+async def capture_addresses(coind, addresses, new_addresses=3):
+    """
+    Capture validateaddress and getaddressforms for wallet and given addresses.
+
+    Args:
+        coind (CoindImplementation): Connected node.
+        addresses (list): Extra addresses to capture (e.g. multisig or group addresses).
+        new_addresses (int): Number of new wallet addresses to create.
+
+    Returns:
+        dict: Captured responses.
+    """
+    addresses = list(addresses)
+    for _ in range(new_addresses):
+        addresses.append(await coind.wallet.get_new_address())
+    captured = []
+    for address in addresses:
+        forms = await coind.util.get_address_forms(address)
+        entry = {
+            'address': address,
+            'validateaddress': await coind.util.validate_address(address),
+            'getaddressforms': forms,
+        }
+        if 'legacy' in forms:
+            entry['validateaddress_legacy'] = await coind.util.validate_address(forms['legacy'])
+        captured.append(entry)
+    invalid = []
+    for address in addresses[:1]:
+        broken = _flip_last(address)
+        invalid.append({
+            'address': broken,
+            'validateaddress': await coind.util.validate_address(broken),
+            'getaddressforms_error': await _error(coind.util.get_address_forms(broken)),
+        })
+    return {
+        'chain': (await coind.blockchain.get_blockchain_info())['chain'],
+        'addresses': captured,
+        'invalid': invalid,
+    }
+
+
+async def capture_messages(coind, new_addresses=3):
+    """
+    Capture signmessage signatures made by new wallet addresses.
+
+    Args:
+        coind (CoindImplementation): Connected node.
+        new_addresses (int): Number of new wallet addresses to sign with.
+
+    Returns:
+        list: Address, message, signature and the node's verifymessage result.
+    """
+    captured = []
+    for _ in range(new_addresses):
+        address = await coind.wallet.get_new_address()
+        for message in MESSAGES:
+            signature = await coind.wallet.sign_message(address, message)
+            captured.append({
+                'address': address,
+                'message': message,
+                'signature': signature,
+                'verifymessage': await coind.util.verify_message(address, signature, message),
+            })
+    return captured
+
+
+async def _capture(args):
+    async with CoindSession(args.user, args.password, args.port, args.host) as coind:
+        return {
+            'addresses': await capture_addresses(coind, args.address, args.new_addresses),
+            'messages': await capture_messages(coind, args.new_addresses),
+        }
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): Command line arguments (default is sys.argv[1:]).
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m aio_coind.tests.capture_fixtures',
+        description='Capture node responses used as test fixtures.',
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='node host (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=5996, help='node RPC port (default: %(default)s)')
+    parser.add_argument('--user', default='', help='RPC username')
+    parser.add_argument('--password', default='', help='RPC password')
+    parser.add_argument('--address', action='append', default=[], help='extra address to capture (repeatable)')
+    parser.add_argument('--new-addresses', type=int, default=3, help='new wallet addresses to capture')
+    args = parser.parse_args(argv)
+
+    captured = asyncio.run(_capture(args))
+    os.makedirs(FIXTURES, exist_ok=True)
+    for name, data in captured.items():
+        path = os.path.join(FIXTURES, f'node_{name}.json')
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import importlib.util
+import inspect
+import os
+import sys
+
+# The repository root is the aio_coind package itself; register it under its
+# import name so the tests can run from a plain checkout. The root must not be
+# on sys.path (``python -m pytest`` adds the working directory): its http.py
+# would shadow the standard library module.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:] = [path for path in sys.path if os.path.abspath(path or os.curdir) != ROOT]
+
+if 'aio_coind' not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        'aio_coind',
+        os.path.join(ROOT, '__init__.py'),
+        submodule_search_locations=[ROOT],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['aio_coind'] = module
+    spec.loader.exec_module(module)
+
+import pytest  # noqa: E402
+
+from aio_coind.coind import CoindImplementation  # noqa: E402
+from aio_coind.exceptions import CoindError  # noqa: E402
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    # Coroutine tests run in a fresh event loop each.
+    if inspect.iscoroutinefunction(pyfuncitem.obj):
+        kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+        asyncio.run(pyfuncitem.obj(**kwargs))
+        return True
+    return None
+
+
+class FakeProvider:
+    """
+    HttpProvider stand-in answering calls from Python handlers.
+
+    Handlers are plain functions or coroutines taking the call parameters;
+    a missing handler answers like Coind does for an unknown method.
+    """
+
+    rate_limiter = None
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+        self.calls = []
+
+    async def _call(self, method, params):
+        self.calls.append((method, params))
+        handler = self.handlers.get(method)
+        if handler is None:
+            raise CoindError(-32601, 'Method not found')
+        result = handler(*params)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def request(self, method, params, session=None):
+        return await self._call(method, params)
+
+    async def request_batch(self, calls, session=None):
+        results = []
+        for method, params in calls:
+            try:
+                results.append(await self._call(method, params))
+            except CoindError as e:
+                results.append(e)
+        return results
+
+    def count(self, method):
+        return sum(1 for called, _ in self.calls if called == method)
+
+
+@pytest.fixture
+def make_coind():
+    """Return a factory of CoindImplementation instances backed by FakeProvider."""
+    return lambda handlers: CoindImplementation(FakeProvider(handlers), None)
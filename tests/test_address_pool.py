@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules import address_pool as address_pool_module
+from aio_coind.modules.address_pool import KEYPOOL_RAN_OUT, AddressPool
+
+
+class Wallet:
+    """Wallet handing out numbered addresses from a limited keypool."""
+
+    def __init__(self, keypool=None, latency=0.0):
+        self.latency = latency
+        self.issued = 0
+        self.keypool = keypool
+        self.refills = 0
+
+    def handlers(self):
+        return {'getnewaddress': self.get_new_address, 'keypoolrefill': self.keypool_refill}
+
+    async def get_new_address(self, *params):
+        await asyncio.sleep(self.latency)
+        if self.keypool is not None:
+            if not self.keypool:
+                raise CoindError(KEYPOOL_RAN_OUT, 'Error: Keypool ran out, please call keypoolrefill first')
+            self.keypool -= 1
+        self.issued += 1
+        return f'nexa:addr{self.issued}'
+
+    def keypool_refill(self, size):
+        self.refills += 1
+        self.keypool = size
+
+
+def _journal(path):
+    with open(path) as f:
+        return f.read().split()
+
+
+async def test_journal_replay(make_coind, tmp_path):
+    path = str(tmp_path / 'pool.journal')
+    wallet = Wallet()
+    pool = AddressPool(make_coind(wallet.handlers()), path, size=5)
+    await pool.refill()
+    acquired = [await pool.acquire(), pool.acquire_nowait()]
+    await pool.stop()
+    assert acquired == ['nexa:addr1', 'nexa:addr2']
+
+    # After a restart the issued addresses are gone and the rest keep their order.
+    pool = AddressPool(make_coind(wallet.handlers()), path, size=5)
+    assert len(pool) == 3
+    assert await pool.acquire() == 'nexa:addr3'
+    await pool.refill()
+    await pool.stop()
+    assert wallet.issued == 8
+
+    pool = AddressPool(make_coind(wallet.handlers()), path, size=5)
+    assert [pool.acquire_nowait() for _ in range(len(pool))] == [f'nexa:addr{i}' for i in range(4, 9)]
+    await pool.stop()
+
+
+async def test_load_compacts_and_skips_blank_lines(make_coind, tmp_path):
+    path = tmp_path / 'pool.journal'
+    path.write_text('+a\n+b\n\n-a\n+c\n-c\n+d\n')
+    pool = AddressPool(make_coind({}), str(path), size=5)
+    assert [pool.acquire_nowait() for _ in range(len(pool))] == ['b', 'd']
+    await pool.stop()
+    assert _journal(path) == ['+b', '+d', '-b', '-d']
+
+
+async def test_cancelled_acquire_returns_the_address(make_coind, tmp_path, monkeypatch):
+    path = str(tmp_path / 'pool.journal')
+    pool = AddressPool(make_coind(Wallet().handlers()), path, size=3)
+    await pool.refill()
+    monkeypatch.setattr(address_pool_module.os, 'fsync', lambda fd: time.sleep(0.1))
+    task = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0.02)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    else:
+        raise AssertionError('acquire was not cancelled')
+    assert len(pool) == 3
+    monkeypatch.undo()
+    assert await pool.acquire() == 'nexa:addr1'
+    await pool.stop()
+
+    pool = AddressPool(make_coind({}), path, size=3)
+    assert [pool.acquire_nowait() for _ in range(len(pool))] == ['nexa:addr2', 'nexa:addr3']
+    await pool.stop()
+
+
+async def test_acquire_from_empty_pool(make_coind, tmp_path):
+    wallet = Wallet(latency=0.001)
+    pool = AddressPool(make_coind(wallet.handlers()), str(tmp_path / 'pool.journal'), size=50, concurrency=1)
+    assert await pool.acquire() == 'nexa:addr1'
+    # The address is returned before the whole refill is done.
+    assert wallet.issued < 50
+    await pool.stop()
+
+
+async def test_keypool_refill(make_coind, tmp_path):
+    wallet = Wallet(keypool=2)
+    coind = make_coind(wallet.handlers())
+    async with AddressPool(coind, str(tmp_path / 'pool.journal'), size=10, keypool_size=20) as pool:
+        addresses = [await pool.acquire() for _ in range(10)]
+    assert len(set(addresses)) == 10
+    assert wallet.refills == 1
+    assert coind.provider.count('keypoolrefill') == 1
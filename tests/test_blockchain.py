@@ -0,0 +1,77 @@
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules.utxo import TxOutCache
+
+
+class Node:
+    """Node answering gettxout, with a tip that can move during a request."""
+
+    def __init__(self):
+        self.tip = 'aa' * 32
+        self.spent = set()
+        self.on_gettxout = None
+
+    def handlers(self):
+        return {'getbestblockhash': lambda: self.tip, 'gettxout': self.get_tx_out}
+
+    def get_tx_out(self, txid, n, includetxpool):
+        if self.on_gettxout is not None:
+            self.on_gettxout()
+        if txid == 'bad':
+            raise CoindError(-8, 'txid must be hexadecimal')
+        if (txid, n) in self.spent:
+            return None
+        return {'value': float(n), 'confirmations': 1}
+
+
+OUTPOINTS = [(f'{i:064x}', i) for i in range(7)]
+
+
+async def test_get_tx_outs(make_coind):
+    node = Node()
+    node.spent.add(OUTPOINTS[2])
+    coind = make_coind(node.handlers())
+    tx_outs = await coind.blockchain.get_tx_outs(OUTPOINTS, batch_size=3)
+    assert list(tx_outs.values) == [0.0, 1.0, 0.0, 3.0, 4.0, 5.0, 6.0]
+    assert list(tx_outs.confirmations) == [1, 1, -1, 1, 1, 1, 1]
+    assert [tx_outs.is_unspent(i) for i in range(7)] == [True, True, False, True, True, True, True]
+    assert coind.provider.count('gettxout') == 7
+
+
+async def test_get_tx_outs_error(make_coind):
+    coind = make_coind(Node().handlers())
+    with pytest.raises(CoindError) as e:
+        await coind.blockchain.get_tx_outs(OUTPOINTS[:2] + [('bad', 0)])
+    assert e.value.code == -8
+
+
+async def test_cache_hit(make_coind):
+    node = Node()
+    coind = make_coind(node.handlers())
+    cache = TxOutCache(tip_check_interval=60)
+    await coind.blockchain.get_tx_outs(OUTPOINTS, cache=cache)
+    node.spent.add(OUTPOINTS[0])
+    tx_outs = await coind.blockchain.get_tx_outs(OUTPOINTS, cache=cache)
+    # Served from the cache: the tip did not move.
+    assert tx_outs.is_unspent(0)
+    assert coind.provider.count('gettxout') == 7
+
+
+async def test_new_block_during_fetch_is_not_cached(make_coind):
+    node = Node()
+    coind = make_coind(node.handlers())
+    cache = TxOutCache(tip_check_interval=60)
+
+    def new_block():
+        node.tip = 'bb' * 32
+        node.on_gettxout = None
+
+    node.on_gettxout = new_block
+    await coind.blockchain.get_tx_outs(OUTPOINTS[:3], cache=cache)
+    node.spent.add(OUTPOINTS[0])
+    tx_outs = await coind.blockchain.get_tx_outs(OUTPOINTS[:3], cache=cache)
+    # The first results may predate the block, so they were fetched again.
+    assert not tx_outs.is_unspent(0)
+    assert coind.provider.count('gettxout') == 6
+    assert await cache.validate(coind) == 'bb' * 32
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules.bulk_import import BulkImporter
+
+
+class Wallet:
+    """Wallet recording imported addresses and pubkeys."""
+
+    def __init__(self, fail=None, cancel=None):
+        self.fail = fail
+        self.cancel = cancel
+        self.imported = []
+        self.rescans = []
+
+    def handlers(self):
+        return {'importaddresses': self.import_addresses, 'importpubkey': self.import_pubkey}
+
+    async def import_addresses(self, rescan, *addresses):
+        await asyncio.sleep(0.001)
+        if self.fail in addresses:
+            raise CoindError(-1, 'import failed')
+        if self.cancel in addresses:
+            raise asyncio.CancelledError()
+        if rescan == 'rescan':
+            self.rescans.extend(addresses)
+        else:
+            self.imported.extend(addresses)
+
+    def import_pubkey(self, pubkey, label, rescan):
+        if pubkey == self.fail:
+            raise CoindError(-5, 'Pubkey is not a valid public key')
+        if rescan:
+            self.rescans.append(pubkey)
+        else:
+            self.imported.append(pubkey)
+
+
+def _addresses(n):
+    return [f'nexa:addr{i}' for i in range(n)]
+
+
+async def test_import_addresses_in_chunks_with_one_rescan(make_coind, tmp_path):
+    wallet = Wallet()
+    coind = make_coind(wallet.handlers())
+    reports = []
+    importer = BulkImporter(coind, str(tmp_path / 'job.json'), chunk_size=3, concurrency=2, progress=reports.append)
+    state = await importer.import_addresses(iter(_addresses(10)), 'job')
+    assert sorted(wallet.imported) == sorted(_addresses(10))
+    assert coind.provider.count('importaddresses') == 5
+    assert wallet.rescans == [state['last_item']]
+    assert state['items'] == 10 and state['done'] == 4 and state['rescanned']
+    assert len(reports) == 5 and reports[-1]['rescanned']
+    assert json.loads((tmp_path / 'job.json').read_text()) == state
+
+
+async def test_resume_after_failure(make_coind, tmp_path):
+    path = str(tmp_path / 'job.json')
+    wallet = Wallet(fail='nexa:addr7')
+    importer = BulkImporter(make_coind(wallet.handlers()), path, chunk_size=3, concurrency=1)
+    with pytest.raises(CoindError):
+        await importer.import_addresses(_addresses(10), 'job')
+    assert wallet.imported == _addresses(6) and not wallet.rescans
+
+    # The same job continues from the failed chunk and rescans once.
+    wallet.fail = None
+    coind = make_coind(wallet.handlers())
+    state = await BulkImporter(coind, path, chunk_size=3).import_addresses(_addresses(10), 'job')
+    assert wallet.imported == _addresses(10)
+    assert coind.provider.count('importaddresses') == 3
+    assert state['rescanned'] and len(wallet.rescans) == 1
+
+    # A finished job is not rescanned again; a new job starts over.
+    assert (await BulkImporter(coind, path).import_addresses(_addresses(10), 'job'))['rescanned']
+    assert len(wallet.rescans) == 1
+    await BulkImporter(coind, path).import_addresses(_addresses(2), 'other')
+    assert len(wallet.rescans) == 2
+
+
+async def test_cancelled_chunk_does_not_lose_the_others(make_coind, tmp_path):
+    path = str(tmp_path / 'job.json')
+    wallet = Wallet(cancel='nexa:addr4')
+    importer = BulkImporter(make_coind(wallet.handlers()), path, chunk_size=3, concurrency=4)
+    with pytest.raises(asyncio.CancelledError):
+        await importer.import_addresses(_addresses(12), 'job')
+    state = json.loads(open(path).read())
+    assert state['done'] == 1 and sorted(state['completed']) == [2, 3]
+    assert not wallet.rescans
+
+    wallet.cancel = None
+    coind = make_coind(wallet.handlers())
+    await BulkImporter(coind, path, chunk_size=3).import_addresses(_addresses(12), 'job')
+    assert coind.provider.count('importaddresses') == 2
+    assert sorted(wallet.imported) == sorted(_addresses(12))
+
+
+async def test_cancelling_the_import_cancels_chunks(make_coind, tmp_path):
+    wallet = Wallet()
+    coind = make_coind(wallet.handlers())
+    importer = BulkImporter(coind, str(tmp_path / 'job.json'), chunk_size=1, concurrency=4)
+
+    def items():
+        yield from _addresses(4)
+        raise RuntimeError('source failed')
+
+    with pytest.raises(RuntimeError):
+        await importer.import_addresses(items(), 'job')
+    await asyncio.sleep(0.01)
+    assert not wallet.imported
+    assert not [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+
+async def test_import_pubkeys_batches_and_raises_item_errors(make_coind, tmp_path):
+    pubkeys = [f'{i:02x}' * 33 for i in range(5)]
+    wallet = Wallet(fail=pubkeys[3])
+    coind = make_coind(wallet.handlers())
+    importer = BulkImporter(coind, str(tmp_path / 'job.json'), chunk_size=2, concurrency=1)
+    with pytest.raises(CoindError) as e:
+        await importer.import_pubkeys(pubkeys, 'job', 'watch')
+    assert e.value.code == -5
+    assert wallet.imported == pubkeys[:3]
+
+    wallet.fail = None
+    state = await importer.import_pubkeys(pubkeys, 'job', 'watch')
+    assert wallet.imported == pubkeys[:3] + pubkeys[2:]
+    assert wallet.rescans == [pubkeys[-1]] and state['rescanned']
@@ -0,0 +1,196 @@
+import json
+import os
+
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules.cashaddr import (
+    GROUP_TYPE,
+    PUBKEY_TYPE,
+    SCRIPT_TYPE,
+    TEMPLATE_TYPE,
+    AddressCodec,
+    _base58check_decode,
+    decode,
+    encode,
+    script_pub_key,
+)
+
+HASH = bytes.fromhex('f5bf48b397dae70be82b3cca4793f8eb2b6cdac9')
+GROUP = bytes(range(32))
+TEMPLATE = bytes.fromhex('17005114') + HASH
+
+# Test vectors of the cashaddr specification; Nexa uses the same checksum and encoding.
+SPEC_VECTORS = [
+    ('bitcoincash:qr6m7j9njldwwzlg9v7v53unlr4jkmx6eylep8ekg2', 'bitcoincash', PUBKEY_TYPE, HASH),
+    ('bchtest:pr6m7j9njldwwzlg9v7v53unlr4jkmx6eyvwc0uz5t', 'bchtest', SCRIPT_TYPE, HASH),
+    ('pref:pr6m7j9njldwwzlg9v7v53unlr4jkmx6ey65nvtks5', 'pref', SCRIPT_TYPE, HASH),
+    (
+        'bitcoincash:qpm2qsznhks23z7629mms6s4cwef74vcwvy22gdx6a', 'bitcoincash', PUBKEY_TYPE,
+        bytes.fromhex('76a04053bda0a88bda5177b86a15c3b29f559873'),
+    ),
+]
+
+PREFIXES = ['nexa', 'nexatest', 'nexareg']
+PAYLOADS = [
+    (PUBKEY_TYPE, HASH),
+    (SCRIPT_TYPE, HASH),
+    (GROUP_TYPE, GROUP),
+    (TEMPLATE_TYPE, TEMPLATE),
+    # 256-bit hash and a 34-byte group identifier.
+    (PUBKEY_TYPE, GROUP),
+    (GROUP_TYPE, bytes(range(34))),
+]
+
+# Nexa addresses produced by this encoder; the tests using them check round
+# trips and error handling. Agreement with the node is checked against the
+# captured fixtures below.
+VECTORS = [
+    (encode(prefix, address_type, payload), prefix, address_type, payload)
+    for prefix in PREFIXES
+    for address_type, payload in PAYLOADS
+]
+
+NODE_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'node_addresses.json')
+NODE_MISSING = pytest.mark.skip(reason='no node fixtures; run python -m aio_coind.tests.capture_fixtures')
+
+
+def _node_cases(key):
+    if not os.path.exists(NODE_FIXTURES):
+        return [pytest.param(None, marks=NODE_MISSING)]
+    with open(NODE_FIXTURES) as f:
+        return json.load(f)[key]
+
+
+def _node_codec(entry):
+    # The prefix and base58 versions are those of the node's network.
+    prefix = entry['address'].split(':')[0]
+    legacy = entry.get('getaddressforms', {}).get('legacy')
+    if legacy is None:
+        return AddressCodec(prefix)
+    version, _ = _base58check_decode(legacy)
+    if entry['validateaddress'].get('isscript'):
+        return AddressCodec(prefix, base58_script=version)
+    return AddressCodec(prefix, base58_pubkey=version)
+
+
+def _flip_last(address):
+    last = address[-1]
+    return address[:-1] + ('q' if last != 'q' else 'p')
+
+
+@pytest.mark.parametrize('address, prefix, address_type, payload', SPEC_VECTORS + VECTORS)
+def test_decode(address, prefix, address_type, payload):
+    decoded = decode(address)
+    assert (decoded.prefix, decoded.type, decoded.payload) == (prefix, address_type, payload)
+
+
+@pytest.mark.parametrize('address, prefix, address_type, payload', SPEC_VECTORS)
+def test_encode(address, prefix, address_type, payload):
+    assert encode(prefix, address_type, payload) == address
+
+
+@pytest.mark.parametrize('address, prefix, address_type, payload', VECTORS)
+def test_uppercase(address, prefix, address_type, payload):
+    assert decode(address.upper()) == decode(address)
+
+
+def test_default_prefix():
+    assert decode(VECTORS[0][0].split(':')[1]).prefix == 'nexa'
+    assert decode(VECTORS[6][0].split(':')[1], 'nexatest').prefix == 'nexatest'
+
+
+@pytest.mark.parametrize('address, prefix, address_type, payload', SPEC_VECTORS + VECTORS)
+def test_invalid_checksum(address, prefix, address_type, payload):
+    with pytest.raises(ValueError, match='checksum'):
+        decode(_flip_last(address))
+
+
+@pytest.mark.parametrize('address, prefix, address_type, payload', VECTORS)
+def test_wrong_prefix(address, prefix, address_type, payload):
+    other = 'nexareg' if prefix != 'nexareg' else 'nexa'
+    with pytest.raises(ValueError, match='checksum'):
+        decode(other + ':' + address.split(':')[1])
+
+
+@pytest.mark.parametrize('address', [
+    'nexa:Qr6m7j9njldwwzlg9v7v53unlr4jkmx6eynjmksl5n',
+    'NEXA:qr6m7j9njldwwzlg9v7v53unlr4jkmx6eynjmksl5n',
+    'nexa:qr6m7j9njldwwzlg9v7v53unlr4jkmx6eynjmksl5N',
+])
+def test_mixed_case(address):
+    with pytest.raises(ValueError, match='Mixed case'):
+        decode(address)
+
+
+@pytest.mark.parametrize('address', [
+    'nexa:qr6m7j9njldwwzlg9v7v53unlr4jkmx6eynjmksl5b',
+    'nexa:',
+    ':qr6m7j9njldwwzlg9v7v53unlr4jkmx6eynjmksl5n',
+    'nexa:qqqqqqqq',
+])
+def test_malformed(address):
+    with pytest.raises(ValueError):
+        decode(address)
+
+
+def test_script_pub_key():
+    assert script_pub_key(decode(VECTORS[0][0])).hex() == '76a914' + HASH.hex() + '88ac'
+    assert script_pub_key(decode(VECTORS[1][0])).hex() == 'a914' + HASH.hex() + '87'
+    assert script_pub_key(decode(VECTORS[3][0])) == TEMPLATE[1:]
+    assert script_pub_key(decode(VECTORS[2][0])) is None
+
+
+def test_codec_validate():
+    codec = AddressCodec('nexa')
+    result = codec.validate(VECTORS[1][0].upper())
+    assert result == {
+        'isvalid': True,
+        'address': VECTORS[1][0],
+        'type': 'scripthash',
+        'isscript': True,
+        'scriptPubKey': 'a914' + HASH.hex() + '87',
+    }
+    assert codec.validate(VECTORS[6][0]) == {'isvalid': False}
+    assert codec.validate(_flip_last(VECTORS[0][0])) == {'isvalid': False}
+
+
+@pytest.mark.parametrize('entry', _node_cases('addresses'))
+def test_node_validateaddress(entry):
+    codec = _node_codec(entry)
+    local = codec.validate(entry['address'])
+    node = entry['validateaddress']
+    assert {key: node.get(key) for key in local} == local
+    if 'validateaddress_legacy' in entry:
+        local = codec.validate(entry['getaddressforms']['legacy'])
+        node = entry['validateaddress_legacy']
+        assert {key: node.get(key) for key in local} == local
+
+
+@pytest.mark.parametrize('entry', _node_cases('addresses'))
+def test_node_getaddressforms(entry):
+    assert _node_codec(entry).forms(entry['address']) == entry['getaddressforms']
+
+
+@pytest.mark.parametrize('entry', _node_cases('invalid'))
+async def test_node_invalid(entry, make_coind):
+    assert _node_codec(entry).validate(entry['address']) == entry['validateaddress']
+    coind = make_coind({})
+    coind.util.address_codec = _node_codec(entry)
+    with pytest.raises(CoindError) as e:
+        await coind.util.get_address_forms_local(entry['address'])
+    assert [e.value.code, e.value.msg] == entry['getaddressforms_error']
+
+
+async def test_get_address_forms_local(make_coind):
+    coind = make_coind({'getaddressforms': lambda address: {'nexa': address}})
+    assert await coind.util.get_address_forms_local(VECTORS[0][0]) == {'nexa': VECTORS[0][0]}
+    with pytest.raises(CoindError) as e:
+        await coind.util.get_address_forms_local(_flip_last(VECTORS[0][0]))
+    assert e.value.code == -5
+    # Base58 addresses need the node unless the codec knows the network versions.
+    assert await coind.util.get_address_forms_local('1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2') == {
+        'nexa': '1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2',
+    }
+    assert await coind.util.get_address_forms_local('1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2', fallback=False) is None
+    assert coind.provider.count('getaddressforms') == 1
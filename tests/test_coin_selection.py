@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules.coin_selection import CoinSelector
+
+
+class Wallet:
+    """Wallet state behind listunspent and lockunspent."""
+
+    def __init__(self, amounts, confirmations=100):
+        self.utxos = {
+            f't{i}:0': {'txid': f't{i}', 'vout': 0, 'amount': amount, 'confirmations': confirmations}
+            for i, amount in enumerate(amounts)
+        }
+        self.locked = set()
+
+    def handlers(self):
+        return {'listunspent': self.list_unspent, 'lockunspent': self.lock_unspent}
+
+    def list_unspent(self, min_conf, max_conf, *args):
+        return [
+            dict(utxo) for key, utxo in self.utxos.items()
+            if key not in self.locked and min_conf <= utxo['confirmations'] <= max_conf
+        ]
+
+    def lock_unspent(self, unlock, outputs):
+        for output in outputs:
+            key = f"{output['txid']}:{output['vout']}"
+            if unlock:
+                self.locked.discard(key)
+            else:
+                self.locked.add(key)
+        return True
+
+    def spend(self, reservation):
+        for coin in reservation.coins:
+            key = f"{coin['txid']}:{coin['vout']}"
+            self.locked.discard(key)
+            del self.utxos[key]
+
+
+async def test_concurrent_reserve_never_shares_coins(make_coind):
+    wallet = Wallet([float(i + 1) for i in range(20)])
+    coind = make_coind(wallet.handlers())
+    selector = CoinSelector(coind)
+    results = await asyncio.gather(*(selector.reserve(15) for _ in range(8)), return_exceptions=True)
+    reservations = [r for r in results if not isinstance(r, Exception)]
+    coins = [coin['txid'] for r in reservations for coin in r.coins]
+    assert len(coins) == len(set(coins))
+    assert all(r.total >= 15 for r in reservations)
+    assert {coin for coin in coins} == {key.split(':')[0] for key in wallet.locked}
+    # One batched lockunspent for all concurrent reservations.
+    assert coind.provider.count('lockunspent') == 1
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert all(isinstance(e, CoindError) and e.code == -6 for e in errors)
+
+
+async def test_release_and_context_manager(make_coind):
+    wallet = Wallet([5.0, 3.0])
+    selector = CoinSelector(make_coind(wallet.handlers()))
+    with pytest.raises(RuntimeError):
+        async with selector.reservation(4):
+            raise RuntimeError
+    assert not wallet.locked and not selector.reservations
+    async with selector.reservation(4) as reservation:
+        assert [coin['txid'] for coin in reservation.coins] == ['t0']
+    assert not selector.reservations
+    with pytest.raises(CoindError):
+        await selector.reserve(5)
+
+
+async def test_expiry_runs_without_new_reservations(make_coind):
+    wallet = Wallet([5.0])
+    selector = CoinSelector(make_coind(wallet.handlers()), reservation_timeout=0.05)
+    reservation = await selector.reserve(1)
+    assert wallet.locked == {'t0:0'}
+    await asyncio.sleep(0.1)
+    assert not selector.reservations
+    assert not wallet.locked
+    assert (await selector.reserve(1)).coins == reservation.coins
+
+
+async def test_late_commit_marks_coins_spent(make_coind):
+    wallet = Wallet([5.0, 1.0])
+    selector = CoinSelector(make_coind(wallet.handlers()), reservation_timeout=0.05, refresh_interval=0)
+    reservation = await selector.reserve(4)
+    await asyncio.sleep(0.1)
+    # Expired coins are not handed out again before a full refresh.
+    await selector.refresh(full=False)
+    assert selector._select(4) is None
+    # The worker still sends its transaction after the reservation expired.
+    wallet.spend(reservation)
+    selector.commit(reservation)
+    await selector.refresh(full=False)
+    assert selector._select(4) is None
+    with pytest.raises(CoindError):
+        await selector.reserve(4)
+    assert (await selector.reserve(1)).coins[0]['txid'] == 't1'
+
+
+async def test_incremental_refresh_drops_spent_outputs(make_coind):
+    wallet = Wallet([5.0, 1.0], confirmations=2)
+    selector = CoinSelector(make_coind(wallet.handlers()), refresh_interval=3600)
+    await selector.refresh()
+    del wallet.utxos['t0:0']
+    await selector.refresh()
+    reservation = await selector.reserve(1)
+    assert [coin['txid'] for coin in reservation.coins] == ['t1']
+
+
+async def test_cancelled_reserve_unlocks_coins(make_coind):
+    wallet = Wallet([5.0, 3.0])
+    selector = CoinSelector(make_coind(wallet.handlers()), lock_batch_delay=0.05)
+    cancelled = asyncio.ensure_future(selector.reserve(4))
+    kept = asyncio.ensure_future(selector.reserve(3))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    reservation = await kept
+    await asyncio.sleep(0.01)
+    assert list(selector.reservations) == [reservation.id]
+    assert wallet.locked == {f"{coin['txid']}:0" for coin in reservation.coins}
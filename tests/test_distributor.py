@@ -0,0 +1,141 @@
+import asyncio
+
+from aio_coind.modules.distributor import TemplateDistributor
+
+
+class Node:
+    """Chain tip and block template served to the distributor."""
+
+    def __init__(self, tip='a' * 64, **template):
+        self.tip = tip
+        self.template = template
+
+    def handlers(self):
+        return {
+            'getbestblockhash': lambda: self.tip,
+            'getblocktemplate': lambda *params: dict(self.template),
+            'getminingcandidate': lambda: dict(self.template),
+        }
+
+    def mine(self, tip, **changes):
+        self.tip = tip
+        self.template.update(changes)
+
+
+async def test_prevhash_from_template(make_coind):
+    node = Node(previousblockhash='b' * 64, height=10)
+    coind = make_coind(node.handlers())
+    distributor = TemplateDistributor(coind)
+    snapshot = await distributor.refresh('a' * 64)
+    # The template's own field wins over the polled tip.
+    assert snapshot.prevhash == 'b' * 64
+    assert coind.provider.count('getbestblockhash') == 0
+
+
+async def test_prevhash_from_candidate(make_coind):
+    node = Node(prevhash='c' * 64, id=1)
+    coind = make_coind(node.handlers())
+    snapshot = await TemplateDistributor(coind, 'getminingcandidate').refresh()
+    assert snapshot.prevhash == 'c' * 64
+
+
+async def test_prevhash_falls_back_to_tip(make_coind):
+    node = Node(id=1)
+    coind = make_coind(node.handlers())
+    distributor = TemplateDistributor(coind, 'getminingcandidate')
+    assert (await distributor.refresh()).prevhash == 'a' * 64
+    assert (await distributor.refresh('d' * 64)).prevhash == 'd' * 64
+    assert coind.provider.count('getbestblockhash') == 1
+
+
+async def test_diff_successive_templates(make_coind):
+    node = Node(previousblockhash='a' * 64, height=10, transactions=[{'txid': '1'}], curtime=100)
+    distributor = TemplateDistributor(make_coind(node.handlers()))
+    first = await distributor.refresh()
+    assert first.clean_jobs
+    assert first.changed == {'previousblockhash', 'height', 'transactions', 'curtime'}
+
+    # Nothing changed: no new job.
+    assert await distributor.refresh() is first
+
+    node.template['transactions'] = [{'txid': '1'}, {'txid': '2'}]
+    node.template['curtime'] = 101
+    second = await distributor.refresh()
+    assert second.job_id == first.job_id + 1
+    assert not second.clean_jobs
+    assert second.changed == {'transactions', 'curtime'}
+
+    node.template['longpollid'] = 'x'
+    assert (await distributor.refresh()).changed == {'longpollid'}
+
+    node.mine('b' * 64, previousblockhash='b' * 64, height=11, transactions=[])
+    third = await distributor.refresh()
+    assert third.clean_jobs
+    assert third.changed == {'previousblockhash', 'height', 'transactions'}
+
+
+async def test_snapshot_is_immutable(make_coind):
+    node = Node(previousblockhash='a' * 64, transactions=[{'txid': '1'}])
+    snapshot = await TemplateDistributor(make_coind(node.handlers())).refresh()
+    try:
+        snapshot.template['transactions'] = []
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('template is writable')
+    assert snapshot.template['transactions'] == ({'txid': '1'},)
+
+
+async def test_subscriber_keeps_clean_jobs(make_coind):
+    node = Node(previousblockhash='a' * 64, curtime=100)
+    distributor = TemplateDistributor(make_coind(node.handlers()))
+    await distributor.refresh()
+    subscription = distributor.subscribe()
+    node.mine('b' * 64, previousblockhash='b' * 64)
+    await distributor.refresh()
+    node.template['curtime'] = 101
+    await distributor.refresh()
+    # The unread clean job was replaced, but its flag carries over.
+    snapshot = await subscription.get()
+    assert snapshot.job_id == 3 and snapshot.clean_jobs
+    subscription.close()
+    assert not distributor._subscriptions
+
+
+async def test_fan_out_load_is_constant(make_coind):
+    node = Node(previousblockhash='a' * 64)
+    coind = make_coind(node.handlers())
+    async with TemplateDistributor(coind, tip_poll_interval=0.01) as distributor:
+        subscriptions = [distributor.subscribe() for _ in range(50)]
+        first = await asyncio.gather(*(subscription.get() for subscription in subscriptions))
+        node.mine('b' * 64, previousblockhash='b' * 64)
+        second = await asyncio.wait_for(asyncio.gather(*(s.get() for s in subscriptions)), 1)
+    assert {snapshot.job_id for snapshot in first} == {1}
+    assert {snapshot.job_id for snapshot in second} == {2}
+    assert all(snapshot.clean_jobs for snapshot in second)
+    assert coind.provider.count('getblocktemplate') == 2
+
+
+async def test_stale_template_is_retried(make_coind):
+    node = Node(previousblockhash='a' * 64)
+    coind = make_coind(node.handlers())
+    async with TemplateDistributor(coind, tip_poll_interval=0.01) as distributor:
+        subscription = distributor.subscribe()
+        await subscription.get()
+        # The tip moved but the node still hands out a template on the old block.
+        node.tip = 'b' * 64
+        await asyncio.sleep(0.05)
+        node.template['previousblockhash'] = 'b' * 64
+        snapshot = await asyncio.wait_for(subscription.get(), 1)
+    assert snapshot.prevhash == 'b' * 64 and snapshot.clean_jobs
+
+
+async def test_notify_wakes_the_loop(make_coind):
+    node = Node(previousblockhash='a' * 64)
+    async with TemplateDistributor(make_coind(node.handlers()), tip_poll_interval=60) as distributor:
+        subscription = distributor.subscribe()
+        await subscription.get()
+        node.mine('b' * 64, previousblockhash='b' * 64)
+        distributor.notify()
+        snapshot = await asyncio.wait_for(subscription.get(), 1)
+    assert snapshot.prevhash == 'b' * 64
@@ -0,0 +1,21 @@
+import json
+
+import pytest
+
+from aio_coind.bench import encoder as encoder_bench
+from aio_coind.encoder import RequestEncoder
+
+
+@pytest.mark.parametrize('method, params', list(encoder_bench.CASES.values()))
+def test_encoded_request_matches_legacy(method, params):
+    request_id, body = RequestEncoder().encode(method, params)
+    _, legacy_body, _ = encoder_bench._legacy_encode([0], method, params)
+    assert request_id == 1
+    assert json.loads(body) == json.loads(legacy_body)
+
+
+def test_encoder_allocates_less_than_legacy():
+    results = encoder_bench.run(calls=100, traced_calls=500)
+    assert [result['case'] for result in results] == list(encoder_bench.CASES)
+    for result in results:
+        assert result['encoder_bytes_per_call'] < result['legacy_bytes_per_call'], result
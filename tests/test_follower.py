@@ -0,0 +1,183 @@
+import asyncio
+import logging
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules.follower import BLOCK_CONNECTED, BLOCK_DISCONNECTED, ChainFollower
+
+
+class Chain:
+    """Block tree with a movable best tip."""
+
+    def __init__(self, length=5):
+        self.headers = {}
+        self.best = None
+        self.fail = False
+        self.extend(None, length, 'a')
+
+    def extend(self, parent, count, branch):
+        height = -1 if parent is None else self.headers[parent]['height']
+        for _ in range(count):
+            height += 1
+            block_hash = f'{branch}{height:063x}'
+            header = {'hash': block_hash, 'height': height}
+            if parent is not None:
+                header['previousblockhash'] = parent
+            self.headers[block_hash] = header
+            parent = block_hash
+        self.best = parent
+        return parent
+
+    def at(self, height, branch='a'):
+        return f'{branch}{height:063x}'
+
+    def handlers(self):
+        def best():
+            if self.fail:
+                raise CoindError(-28, 'Loading block index...')
+            return self.best
+
+        return {
+            'getbestblockhash': best,
+            'getblockheader': lambda block_hash, verbose: dict(self.headers[block_hash]),
+        }
+
+
+def _events(subscription):
+    events = []
+    while not subscription._queue.empty():
+        event = subscription._queue.get_nowait()
+        events.append((event.type, event.height, event.hash[0]))
+    return events
+
+
+async def test_connect_blocks(make_coind):
+    chain = Chain()
+    follower = ChainFollower(make_coind(chain.handlers()))
+    subscription = follower.subscribe()
+    assert await follower.poll() == 0
+    assert follower.tip['height'] == 4
+    chain.extend(chain.best, 3, 'a')
+    assert await follower.poll() == 3
+    assert _events(subscription) == [(BLOCK_CONNECTED, height, 'a') for height in (5, 6, 7)]
+    assert await follower.poll() == 0
+
+
+async def test_reorg(make_coind):
+    chain = Chain(length=10)
+    follower = ChainFollower(make_coind(chain.handlers()))
+    subscription = follower.subscribe()
+    await follower.poll()
+    chain.extend(chain.best, 3, 'a')
+    await follower.poll()
+    _events(subscription)
+    # A competing branch forks off block 10 and overtakes the two blocks after it.
+    chain.extend(chain.at(10), 3, 'b')
+    assert await follower.poll() == 5
+    assert _events(subscription) == [
+        (BLOCK_DISCONNECTED, 12, 'a'),
+        (BLOCK_DISCONNECTED, 11, 'a'),
+        (BLOCK_CONNECTED, 11, 'b'),
+        (BLOCK_CONNECTED, 12, 'b'),
+        (BLOCK_CONNECTED, 13, 'b'),
+    ]
+    assert follower.tip['hash'] == chain.best
+    # Back to the first branch, which grows longer.
+    chain.extend(chain.at(12), 2, 'a')
+    await follower.poll()
+    assert _events(subscription) == [
+        (BLOCK_DISCONNECTED, 13, 'b'),
+        (BLOCK_DISCONNECTED, 12, 'b'),
+        (BLOCK_DISCONNECTED, 11, 'b'),
+        (BLOCK_CONNECTED, 11, 'a'),
+        (BLOCK_CONNECTED, 12, 'a'),
+        (BLOCK_CONNECTED, 13, 'a'),
+        (BLOCK_CONNECTED, 14, 'a'),
+    ]
+
+
+async def test_reorg_deeper_than_stored_headers(make_coind):
+    chain = Chain(length=10)
+    follower = ChainFollower(make_coind(chain.handlers()), max_reorg_depth=3)
+    subscription = follower.subscribe()
+    await follower.poll()
+    chain.extend(chain.best, 5, 'a')
+    await follower.poll()
+    _events(subscription)
+    # The fork point (block 5) is below the three stored headers (12 to 14).
+    chain.extend(chain.at(5), 10, 'b')
+    await follower.poll()
+    assert _events(subscription) == [
+        (BLOCK_DISCONNECTED, 14, 'a'),
+        (BLOCK_DISCONNECTED, 13, 'a'),
+        (BLOCK_DISCONNECTED, 12, 'a'),
+    ] + [(BLOCK_CONNECTED, height, 'b') for height in range(12, 16)]
+    assert follower.tip['hash'] == chain.best
+    assert list(follower._chain) == [chain.at(height, 'b') for height in (13, 14, 15)]
+
+
+async def test_callback_errors_do_not_stop_delivery(make_coind, caplog):
+    chain = Chain()
+    follower = ChainFollower(make_coind(chain.handlers()))
+    seen = []
+
+    def broken(event):
+        raise RuntimeError('handler bug')
+
+    async def record(event):
+        # The chain state is already final when handlers run.
+        seen.append((event.height, follower.tip['height']))
+
+    follower.on(BLOCK_CONNECTED, broken)
+    follower.on(BLOCK_CONNECTED, record)
+    await follower.poll()
+    chain.extend(chain.best, 2, 'a')
+    with caplog.at_level(logging.ERROR, logger='aio_coind.modules.follower'):
+        await follower.poll()
+    assert seen == [(5, 6), (6, 6)]
+    assert len(caplog.records) == 2
+
+
+async def test_run_logs_node_errors(make_coind, caplog):
+    chain = Chain()
+    chain.fail = True
+    follower = ChainFollower(make_coind(chain.handlers()), min_interval=0.01, expected_block_time=0.6)
+    subscription = follower.subscribe()
+    with caplog.at_level(logging.ERROR, logger='aio_coind.modules.follower'):
+        async with follower:
+            await asyncio.sleep(0.03)
+            chain.fail = False
+            while follower.tip is None:
+                await asyncio.sleep(0.01)
+            chain.extend(chain.best, 1, 'a')
+            follower.notify()
+            event = await asyncio.wait_for(subscription.__anext__(), 1)
+    assert event.height == 5
+    assert caplog.records and all(record.message == 'Chain poll failed' for record in caplog.records)
+
+
+async def test_interval_adapts_to_block_time(make_coind, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('aio_coind.modules.follower.time.monotonic', lambda: now[0])
+    chain = Chain()
+    follower = ChainFollower(
+        make_coind(chain.handlers()), expected_block_time=120, polls_per_block=60,
+        min_interval=0.25, max_interval=10, burst_duration=5, smoothing=0.5,
+    )
+    await follower.poll()
+    assert follower.interval == 2.0
+    # Blocks every 30 seconds pull the estimate down from 120.
+    for _ in range(8):
+        now[0] += 30
+        chain.extend(chain.best, 1, 'a')
+        await follower.poll()
+    assert 30 <= follower.block_time < 31
+    assert follower.interval == 0.25
+    now[0] += 6
+    assert follower.interval == follower.block_time / 60 < 1
+    # Two blocks found by one poll count as two intervals.
+    now[0] += 594
+    chain.extend(chain.best, 2, 'a')
+    await follower.poll()
+    assert 160 < follower.block_time < 170
+    now[0] += 6
+    assert follower.interval == min(10, follower.block_time / 60)
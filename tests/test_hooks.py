@@ -0,0 +1,78 @@
+import logging
+
+import pytest
+
+from aio_coind import CoindSession, Hooks
+from aio_coind import http as http_module
+from aio_coind.bench.mockd import MockDaemon
+from aio_coind.exceptions import CoindError
+from aio_coind.hooks import EVENTS
+
+PAYLOADS = {'getblockcount': b'42'}
+
+
+def _record(hooks, events):
+    for event in EVENTS:
+        hooks.on(event, lambda trace, event=event: events.append((event, trace)))
+
+
+async def test_events_in_order():
+    hooks = Hooks()
+    events = []
+    _record(hooks, events)
+    async with MockDaemon(PAYLOADS) as daemon:
+        async with CoindSession('user', 'password', daemon.port, hooks=hooks) as coind:
+            assert await coind.blockchain.get_block_count() == 42
+            await coind.fetch_batch([('getblockcount', []), ('getblockcount', [])])
+    assert [event for event, _ in events] == list(EVENTS) * 2
+    single, batch = events[0][1], events[-1][1]
+    assert (single.method, batch.method) == ('getblockcount', 'batch')
+    assert single.error is None and single.response_bytes > 0
+    assert all(value is not None and value >= 0 for value in single.timings().values())
+
+
+async def test_failing_hooks_are_logged(caplog):
+    hooks = Hooks()
+    events = []
+
+    @hooks.on('request_start')
+    def broken(trace):
+        raise RuntimeError('hook bug')
+
+    hooks.on('request_end', broken)
+    _record(hooks, events)
+    async with MockDaemon(PAYLOADS) as daemon:
+        async with CoindSession('user', 'password', daemon.port, hooks=hooks) as coind:
+            with caplog.at_level(logging.ERROR, logger='aio_coind.hooks'):
+                assert await coind.blockchain.get_block_count() == 42
+                # A failing request_end hook does not replace the request's own error.
+                with pytest.raises(CoindError) as e:
+                    await coind.fetch('getnetworkinfo')
+    assert e.value.code == -32601
+    assert len([record for record in caplog.records if 'hook bug' in record.exc_text]) == 4
+    # Later callbacks of the same event still run.
+    assert [event for event, _ in events].count('request_end') == 2
+    assert events[-1][1].error == -32601
+
+
+async def test_empty_hooks_take_the_fast_path(monkeypatch):
+    def traced(*args):
+        raise AssertionError('traced path taken')
+
+    monkeypatch.setattr(http_module, 'RequestTrace', traced)
+    hooks = Hooks()
+    async with MockDaemon(PAYLOADS) as daemon:
+        async with CoindSession('user', 'password', daemon.port, hooks=hooks) as coind:
+            assert not hooks
+            assert await coind.blockchain.get_block_count() == 42
+            assert await coind.fetch_batch([('getblockcount', [])]) == [42]
+            # Registering a callback later switches to the traced path.
+            hooks.on('request_end', lambda trace: None)
+            assert hooks
+            with pytest.raises(AssertionError, match='traced path'):
+                await coind.blockchain.get_block_count()
+
+
+def test_unknown_event():
+    with pytest.raises(ValueError):
+        Hooks().on('request_done', print)
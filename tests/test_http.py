@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.http import HttpClient
+from aio_coind.transport import Transport
+
+
+class CannedTransport(Transport):
+    """Transport answering every request with a response built from the request."""
+
+    needs_session = False
+
+    def __init__(self, respond):
+        self.respond = respond
+
+    async def post(self, body, session, trace=None):
+        return json.dumps(self.respond(json.loads(body))).encode()
+
+
+def _client(respond):
+    return HttpClient('http://127.0.0.1:1', transport=CannedTransport(respond))
+
+
+async def test_batch_results_in_call_order():
+    def respond(request):
+        items = [{'result': item['params'][0], 'error': None, 'id': item['id']} for item in request]
+        items[1] = {'result': None, 'error': {'code': -5, 'message': 'Not found'}, 'id': request[1]['id']}
+        return items[::-1]
+
+    results = await _client(respond).request_batch([('echo', [1]), ('echo', [2]), ('echo', [3])], None)
+    assert results[0] == 1 and results[2] == 3
+    assert isinstance(results[1], CoindError) and results[1].code == -5
+
+
+@pytest.mark.parametrize('item, code, message', [
+    ({'result': None, 'error': {'code': -32700, 'message': 'Parse error'}, 'id': None}, -32700, 'Parse error'),
+    ({'result': 1, 'error': None, 'id': None}, None, 'Invalid batch response'),
+    ({'result': 1, 'error': None, 'id': 10 ** 9}, None, 'Invalid batch response'),
+    ({'result': 1, 'error': None}, None, 'Invalid batch response'),
+])
+async def test_batch_item_without_known_id(item, code, message):
+    def respond(request):
+        return [{'result': 0, 'error': None, 'id': request[0]['id']}, item]
+
+    with pytest.raises(CoindError) as e:
+        await _client(respond).request_batch([('echo', [1]), ('echo', [2])], None)
+    assert (e.value.code, e.value.msg) == (code, message)
+
+
+async def test_batch_rejected_as_a_whole():
+    def respond(request):
+        return {'result': None, 'error': {'code': -32600, 'message': 'Invalid Request'}, 'id': None}
+
+    with pytest.raises(CoindError) as e:
+        await _client(respond).request_batch([('echo', [1])], None)
+    assert e.value.code == -32600
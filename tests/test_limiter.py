@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from aio_coind.bench.limiter import WorkQueueDaemon
+from aio_coind.exceptions import CoindError
+from aio_coind.limiter import AdaptiveLimiter
+from aio_coind.session import CoindSession
+
+
+async def test_calls_over_the_limit_wait_in_order():
+    limiter = AdaptiveLimiter(initial_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+    order = []
+
+    async def waiter(i):
+        await limiter.acquire()
+        order.append(i)
+
+    tasks = [asyncio.ensure_future(waiter(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert limiter.queued == 3 and not order
+    limiter.release('getblockcount')
+    await asyncio.sleep(0)
+    assert order == [0]
+    limiter.release('getblockcount')
+    limiter.release('getblockcount')
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2] and limiter.in_flight == 2
+
+
+async def test_cancelled_waiter_passes_its_slot_on():
+    limiter = AdaptiveLimiter(initial_limit=1)
+    await limiter.acquire()
+    first = asyncio.ensure_future(limiter.acquire())
+    second = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    # The slot is handed to the first waiter, which is cancelled before it runs.
+    limiter.release('getblockcount')
+    first.cancel()
+    await asyncio.sleep(0)
+    assert first.cancelled()
+    await asyncio.wait_for(second, 1)
+    assert limiter.in_flight == 1 and limiter.queued == 0
+
+
+async def test_overload_backs_off_once_per_round_trip():
+    limiter = AdaptiveLimiter(initial_limit=16, min_limit=2)
+    for _ in range(4):
+        await limiter.acquire()
+    limiter.release('getblockcount', 0.01)
+    for _ in range(3):
+        limiter.release('getblockcount', overloaded=True)
+    # Overloads within one round trip of each other count as one congestion event.
+    assert limiter.limit == 8 and limiter.overloads == 3
+    await asyncio.sleep(0.02)
+    for _ in range(3):
+        await limiter.acquire()
+        await asyncio.sleep(0.02)
+        limiter.release('getblockcount', overloaded=True)
+    assert limiter.limit == 2
+
+
+async def test_additive_increase_only_when_saturated():
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=5)
+    await limiter.acquire()
+    limiter.release('getblockcount', 0.01)
+    assert limiter.limit == 4
+    for _ in range(40):
+        for _ in range(4):
+            await limiter.acquire()
+        for _ in range(4):
+            limiter.release('getblockcount', 0.01)
+    assert limiter.limit == 5
+
+
+async def test_inflated_latency_shrinks_the_limit():
+    limiter = AdaptiveLimiter(initial_limit=10, smoothing=1.0)
+    await limiter.acquire()
+    limiter.release('getblock', 0.01)
+    # A slower method has its own baseline.
+    await limiter.acquire()
+    limiter.release('gettxoutsetinfo', 1.0)
+    assert limiter.limit == 10
+    await limiter.acquire()
+    limiter.release('getblock', 0.05)
+    assert limiter.limit == 9
+    assert limiter.snapshot()['latency_ratio'] == 5.0
+
+
+async def test_work_queue_overload_reduces_the_limit():
+    daemon = WorkQueueDaemon(workers=2, queue_depth=2, service_time=0.005)
+    port = await daemon.start()
+    limiter = AdaptiveLimiter(initial_limit=64)
+    rejected = 0
+    try:
+        async with CoindSession('user', 'password', port, limiter=limiter) as coind:
+            async def caller():
+                nonlocal rejected
+                for _ in range(5):
+                    try:
+                        await coind.blockchain.get_block_count()
+                    except CoindError as e:
+                        assert e.code == 503
+                        rejected += 1
+
+            await asyncio.gather(*(caller() for _ in range(64)))
+    finally:
+        await daemon.stop()
+    assert rejected == daemon.rejected > 0
+    assert limiter.overloads == rejected
+    assert limiter.limit < 16
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize('overloaded', [False, True])
+async def test_limit_bounds(overloaded):
+    limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1)
+    for _ in range(5):
+        await limiter.acquire()
+        await asyncio.sleep(0.002)
+        limiter.release('getblockcount', 0.001, overloaded)
+    assert limiter.limit == 1
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from aio_coind.bench import load
+from aio_coind.bench.load import LoadGenerator, Window, parse_mix
+from aio_coind.bench.mockd import MockDaemon, canned_payloads
+from aio_coind.session import CoindSession
+
+
+def _payloads():
+    return canned_payloads(block_transactions=5, txpool_size=3, unspent_count=3)
+
+
+def test_parse_mix():
+    assert parse_mix('gettxout=5, getblock') == (['gettxout', 'getblock'], [5.0, 1.0])
+    with pytest.raises(ValueError):
+        parse_mix('getbalance=1')
+    with pytest.raises(ValueError):
+        parse_mix('gettxout=0')
+
+
+def test_window_report():
+    window = Window()
+    for latency in (0.001, 0.002, 0.003):
+        window.add('gettxout', latency)
+    other = Window()
+    other.add('getblock', 0.010, error=-5)
+    other.dropped = 2
+    window.merge(other)
+    report = window.report(elapsed=2.0, duration=0.5)
+    assert report['calls'] == 4 and report['calls_per_sec'] == 8.0
+    assert report['p50_ms'] == 3.0 and report['max_ms'] == 10.0
+    assert report['error_rate'] == 0.25 and report['errors'] == {'getblock:-5': 1}
+    assert report['dropped'] == 2
+    assert report['methods']['getblock']['error_rate'] == 1.0
+    assert report['methods']['gettxout']['error_rate'] == 0.0
+    assert Window().report(1.0, 0)['calls_per_sec'] is None
+
+
+@pytest.mark.parametrize('mode', [{'concurrency': 4}, {'rate': 400}])
+async def test_one_report_per_interval(mode):
+    async with MockDaemon(_payloads(), latency=0.002) as daemon:
+        async with CoindSession('user', 'password', daemon.port) as coind:
+            generator = LoadGenerator(coind, *parse_mix('getblockcount=3,gettxout=1,getrawtransaction=1'))
+            await generator.prepare()
+            reports = []
+            total = await generator.run(0.4, interval=0.1, report=reports.append, **mode)
+    # No extra window for the calls that finish after the deadline.
+    assert len(reports) == 4
+    assert all(report['calls'] > 0 for report in reports)
+    assert total['calls'] == sum(report['calls'] for report in reports)
+    assert set(total['methods']) == {'getblockcount', 'gettxout', 'getrawtransaction'}
+    assert total['error_rate'] == 0.0
+
+
+async def test_errors_and_dropped_calls():
+    payloads = _payloads()
+    del payloads['getblocktemplate']
+    async with MockDaemon(payloads, latency=0.05) as daemon:
+        async with CoindSession('user', 'password', daemon.port) as coind:
+            generator = LoadGenerator(coind, *parse_mix('getblocktemplate'))
+            total = await generator.run(0.2, rate=500, interval=1.0, max_in_flight=5)
+    assert total['error_rate'] == 1.0
+    assert total['errors'] == {'getblocktemplate:-32601': total['calls']}
+    assert total['dropped'] > 0
+
+
+def test_main_with_mock_daemon(capsys):
+    assert load.main(['--mock', '--json', '--duration', '0.3', '--interval', '0.1', '--concurrency', '2']) == 0
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(lines) == 4
+    assert lines[-1]['total']['calls'] == sum(line['calls'] for line in lines[:-1])
+
+
+def test_main_rejects_unknown_methods(capsys):
+    with pytest.raises(SystemExit):
+        load.main(['--mix', 'getbalance'])
+    assert 'Unknown method' in capsys.readouterr().err
@@ -0,0 +1,49 @@
+import pytest
+
+from aio_coind.modules.merkle import (
+    MerkleBranch, double_sha256, hashes_from_hex, merkle_branch, merkle_root, root_from_branch,
+)
+
+# Bitcoin block 100000.
+BLOCK_TXIDS = [
+    '8c14f0db3df150123e6f3dbbf30f8b955a8249b62ac1d1ff16284aefa3d06d87',
+    'fff2525b8931402dd09222c50775608f75787bd2b87e56995a7bdd30f79702c4',
+    '6359f0868171b1d194cbee1af2f16ea598ae8fad666d9b012c8ed2b79a236ec4',
+    'e9a66845e05d5abc0ad04ec80f774a7e585c6e8db975962d069a522137b80c1d',
+]
+BLOCK_MERKLE_ROOT = 'f3e94742aca4b5ef85488dc37c06c3282295ffec960994b2c0d5ac2a25a95766'
+
+
+def _hashes(n):
+    return [double_sha256(i.to_bytes(4, 'little')) for i in range(n)]
+
+
+def test_merkle_root_of_a_block():
+    assert merkle_root(hashes_from_hex(BLOCK_TXIDS))[::-1].hex() == BLOCK_MERKLE_ROOT
+
+
+def test_merkle_root_of_empty_list():
+    with pytest.raises(ValueError):
+        merkle_root([])
+
+
+@pytest.mark.parametrize('n', range(20))
+def test_branch_matches_root(n):
+    coinbase = b'coinbase %d' % n
+    hashes = _hashes(n)
+    expected = merkle_root([double_sha256(coinbase), *hashes])
+    branch = merkle_branch(hashes)
+    # n transactions plus coinbase make a tree of depth ceil(log2(n + 1)).
+    assert len(branch) == n.bit_length()
+    assert root_from_branch(double_sha256(coinbase), branch) == expected
+    assert MerkleBranch(hashes).root_for_coinbase(coinbase) == expected
+
+
+def test_branch_from_template():
+    txids = BLOCK_TXIDS[1:]
+    template = {'transactions': [{'txid': txid, 'hash': '00' * 32} for txid in txids]}
+    branch = MerkleBranch.from_template(template)
+    assert branch.root(hashes_from_hex(BLOCK_TXIDS[:1])[0])[::-1].hex() == BLOCK_MERKLE_ROOT
+    assert branch.branch_hex[0] == hashes_from_hex(txids[:1])[0].hex()
+    assert MerkleBranch.from_template({'transactions': [{'hash': txid} for txid in txids]}).branch == branch.branch
+    assert MerkleBranch.from_template({}).branch == []
@@ -0,0 +1,160 @@
+import base64
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules import message as message_module
+from aio_coind.modules.cashaddr import SCRIPT_TYPE, decode, encode
+from aio_coind.modules.message import default_executor, message_hash, recover_pubkey, verify_message
+
+MESSAGE = 'Hello, world!'
+
+# Signatures produced by a local RFC 6979 signer; node signatures are in NODE_FIXTURES.
+# (private key, compressed, public key, pubkeyhash address, signature of MESSAGE)
+VECTORS = [
+    (
+        1, True,
+        '0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798',
+        'nexa:qp63uahgrxged4z5jswyt5dn5v3lzsem6cg72sy3kw',
+        'H+0Hz9TQ827HsHUaT+4G7FBJ6ssQOzZoSE2T32jxUmnjUu9NzFVynL9v1C++nr4IwhT5KX3iJcNRGgjAjdqKvIs=',
+    ),
+    (
+        1, False,
+        '0479be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798'
+        '483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb10d4b8',
+        'nexa:qzgmyjle755g2v5kptrg02asx5f8k8fg55wxu07yfx',
+        'G+0Hz9TQ827HsHUaT+4G7FBJ6ssQOzZoSE2T32jxUmnjUu9NzFVynL9v1C++nr4IwhT5KX3iJcNRGgjAjdqKvIs=',
+    ),
+    (
+        0x1e99423a4ed27608a15a2616a2b0e9e52ced330ac530edcc32c8ffc6a526aedd, True,
+        '03f028892bad7ed57d2fb57bf33081d5cfcf6f9ed3d3d7f159c2e2fff579dc341a',
+        'nexa:qzaurep288g95nxxzafdd93m0a5apxaj0vskyqjmrp',
+        'IC3fF8DJZL73Ym4hPS5CF28NBeWG8Oiig1XO/7aLVusnDTIKNpZnRiULeGcXSzmX8yPMD5RdeZS9SF4L/XlBX28=',
+    ),
+    (
+        0x1e99423a4ed27608a15a2616a2b0e9e52ced330ac530edcc32c8ffc6a526aedd, False,
+        '04f028892bad7ed57d2fb57bf33081d5cfcf6f9ed3d3d7f159c2e2fff579dc341a'
+        '07cf33da18bd734c600b96a72bbc4749d5141c90ec8ac328ae52ddfe2e505bdb',
+        'nexa:qqs3kax2g6r0s8ha54jpwelusnh3dkh7pvsptjt2l9',
+        'HC3fF8DJZL73Ym4hPS5CF28NBeWG8Oiig1XO/7aLVusnDTIKNpZnRiULeGcXSzmX8yPMD5RdeZS9SF4L/XlBX28=',
+    ),
+]
+
+# Script template (P2PKT) addresses of the compressed keys above.
+TEMPLATE_VECTORS = [
+    ('nexa:nqtsq5g5rt0sjjrkjrptwlpva56yhf6nr7learc2rqwcv06w', VECTORS[0][4]),
+    ('nexa:nqtsq5g5ce7drj4fu6qdm94tzxugs3qva3r8uck6xzqvqmce', VECTORS[2][4]),
+]
+
+
+NODE_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'node_messages.json')
+
+
+def _node_cases():
+    if not os.path.exists(NODE_FIXTURES):
+        return [pytest.param(
+            None, marks=pytest.mark.skip(reason='no node fixtures; run python -m aio_coind.tests.capture_fixtures'))]
+    with open(NODE_FIXTURES) as f:
+        return json.load(f)
+
+
+@pytest.fixture(params=['python', 'coincurve'], autouse=True)
+def backend(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(message_module, '_coincurve', None)
+    elif message_module._coincurve is None:
+        pytest.skip('coincurve is not installed')
+    return request.param
+
+
+def _with_header(signature, header):
+    raw = base64.b64decode(signature)
+    return base64.b64encode(bytes([header]) + raw[1:]).decode()
+
+
+@pytest.mark.parametrize('_, compressed, pubkey, address, signature', VECTORS)
+def test_recover_pubkey(_, compressed, pubkey, address, signature):
+    recovered = recover_pubkey(message_hash(MESSAGE), base64.b64decode(signature))
+    assert recovered.hex() == pubkey
+
+
+@pytest.mark.parametrize('_, compressed, pubkey, address, signature', VECTORS)
+def test_verify_pubkeyhash(_, compressed, pubkey, address, signature):
+    assert verify_message(decode(address), signature, MESSAGE) is True
+
+
+@pytest.mark.parametrize('address, signature', TEMPLATE_VECTORS)
+def test_verify_template(address, signature):
+    assert verify_message(decode(address), signature, MESSAGE) is True
+
+
+@pytest.mark.parametrize('_, compressed, pubkey, address, signature', VECTORS)
+def test_wrong_message(_, compressed, pubkey, address, signature):
+    assert verify_message(decode(address), signature, MESSAGE + ' ') is False
+
+
+def test_wrong_address():
+    assert verify_message(decode(VECTORS[2][3]), VECTORS[0][4], MESSAGE) is False
+    # The same key, but the signature commits to the compressed form.
+    assert verify_message(decode(VECTORS[1][3]), VECTORS[0][4], MESSAGE) is False
+    assert verify_message(decode(TEMPLATE_VECTORS[1][0]), TEMPLATE_VECTORS[0][1], MESSAGE) is False
+
+
+@pytest.mark.parametrize('header', [0, 26, 35, 255])
+def test_bad_header_byte(header):
+    signature = _with_header(VECTORS[0][4], header)
+    assert verify_message(decode(VECTORS[0][3]), signature, MESSAGE) is False
+
+
+def test_flipped_compression_flag():
+    signature = _with_header(VECTORS[0][4], base64.b64decode(VECTORS[0][4])[0] - 4)
+    assert verify_message(decode(VECTORS[0][3]), signature, MESSAGE) is False
+
+
+def test_truncated_signature():
+    signature = base64.b64encode(base64.b64decode(VECTORS[0][4])[:64]).decode()
+    assert verify_message(decode(VECTORS[0][3]), signature, MESSAGE) is False
+
+
+@pytest.mark.parametrize('signature', ['not base64!', VECTORS[0][4][:-1], VECTORS[0][4] + '='])
+def test_bad_base64(signature):
+    with pytest.raises(ValueError):
+        verify_message(decode(VECTORS[0][3]), signature, MESSAGE)
+
+
+@pytest.mark.parametrize('entry', _node_cases())
+def test_node_signmessage(entry):
+    # Signatures made by signmessage on a node, checked with the default MESSAGE_MAGIC.
+    assert entry['verifymessage'] is True
+    address = decode(entry['address'], entry['address'].split(':')[0])
+    assert verify_message(address, entry['signature'], entry['message']) is True
+    assert verify_message(address, entry['signature'], entry['message'] + ' ') is False
+
+
+def test_default_executor(backend):
+    if backend == 'python':
+        executor = default_executor()
+        assert isinstance(executor, ProcessPoolExecutor)
+        assert default_executor() is executor
+    else:
+        assert default_executor() is None
+
+
+async def test_verify_message_local(make_coind):
+    coind = make_coind({'verifymessage': lambda address, signature, message: 'node'})
+    assert await coind.util.verify_message_local(VECTORS[0][3], VECTORS[0][4], MESSAGE) is True
+    assert await coind.util.verify_message_local(TEMPLATE_VECTORS[0][0], VECTORS[0][4], MESSAGE + ' ') is False
+    # Script hash addresses are left to the node.
+    script_address = encode('nexa', SCRIPT_TYPE, bytes(20))
+    assert await coind.util.verify_message_local(script_address, VECTORS[0][4], MESSAGE) == 'node'
+    assert await coind.util.verify_message_local(script_address, VECTORS[0][4], MESSAGE, fallback=False) is None
+    assert coind.provider.count('verifymessage') == 1
+    with pytest.raises(CoindError) as e:
+        await coind.util.verify_message_local('nexa:qqqq', VECTORS[0][4], MESSAGE)
+    assert e.value.code == -3
+    with pytest.raises(CoindError) as e:
+        await coind.util.verify_message_local(VECTORS[0][3], 'not base64!', MESSAGE)
+    assert e.value.code == -5
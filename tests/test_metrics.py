@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.http import HttpClient
+from aio_coind.metrics import BUCKET_UNIT_NS, BUCKETS, Metrics
+from aio_coind.transport import Transport
+
+
+class ScriptedTransport(Transport):
+    """Transport answering each method with a result, a JSON-RPC error or an exception."""
+
+    needs_session = False
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    def _answer(self, request):
+        answer = self.answers[request['method']]
+        if isinstance(answer, CoindError):
+            return {'result': None, 'error': {'code': answer.code, 'message': answer.msg}, 'id': request['id']}
+        if isinstance(answer, BaseException):
+            raise answer
+        return {'result': answer, 'error': None, 'id': request['id']}
+
+    async def post(self, body, session, trace=None):
+        request = json.loads(body)
+        if isinstance(request, list):
+            return json.dumps([self._answer(item) for item in request]).encode()
+        return json.dumps(self._answer(request)).encode()
+
+
+def _record(metrics, method, elapsed_ns, error=None):
+    metrics.end(metrics.begin(method), elapsed_ns, 10, 20, error)
+
+
+@pytest.mark.parametrize('elapsed_ns, bucket', [
+    (0, 0),
+    (BUCKET_UNIT_NS, 0),
+    (BUCKET_UNIT_NS + 1, 1),
+    (2 * BUCKET_UNIT_NS, 1),
+    (2 * BUCKET_UNIT_NS + 1, 2),
+    (1000 * BUCKET_UNIT_NS, 10),
+    (1 << 62, BUCKETS - 1),
+])
+def test_latency_bucket_bounds(elapsed_ns, bucket):
+    metrics = Metrics()
+    _record(metrics, 'getblockcount', elapsed_ns)
+    buckets = metrics.snapshot()['getblockcount']['latency_buckets']
+    assert buckets[bucket] == 1 and sum(buckets) == 1
+
+
+def test_snapshot_and_prometheus():
+    metrics = Metrics()
+    _record(metrics, 'getblock', BUCKET_UNIT_NS)
+    _record(metrics, 'getblock', 3 * BUCKET_UNIT_NS, error=-5)
+    _record(metrics, 'getblock', 3 * BUCKET_UNIT_NS, error='TimeoutError')
+    in_flight = metrics.begin('getblock')
+    metrics.gauge('concurrency_limit', lambda: 8)
+    snapshot = metrics.snapshot()['getblock']
+    assert snapshot['calls'] == 3 and snapshot['in_flight'] == 1
+    assert snapshot['errors'] == {-5: 1, 'TimeoutError': 1}
+    assert snapshot['request_bytes'] == 30 and snapshot['response_bytes'] == 60
+    assert snapshot['latency_sum_ns'] == 7 * BUCKET_UNIT_NS
+
+    lines = metrics.prometheus('rpc').splitlines()
+    assert 'rpc_calls_total{method="getblock"} 3' in lines
+    assert 'rpc_errors_total{method="getblock",code="-5"} 1' in lines
+    assert 'rpc_errors_total{method="getblock",code="TimeoutError"} 1' in lines
+    assert 'rpc_in_flight{method="getblock"} 1' in lines
+    assert 'rpc_latency_seconds_bucket{method="getblock",le="1.024e-06"} 1' in lines
+    assert 'rpc_latency_seconds_bucket{method="getblock",le="2.048e-06"} 1' in lines
+    assert 'rpc_latency_seconds_bucket{method="getblock",le="4.096e-06"} 3' in lines
+    assert 'rpc_latency_seconds_bucket{method="getblock",le="+Inf"} 3' in lines
+    assert 'rpc_latency_seconds_count{method="getblock"} 3' in lines
+    assert lines[-2:] == ['# TYPE rpc_concurrency_limit gauge', 'rpc_concurrency_limit 8']
+    buckets = [line for line in lines if line.startswith('rpc_latency_seconds_bucket')]
+    assert len(buckets) == BUCKETS
+    Metrics.end(in_flight, 0, 0, 0)
+    assert metrics.snapshot()['getblock']['in_flight'] == 0
+
+
+async def test_http_client_records_calls():
+    metrics = Metrics()
+    transport = ScriptedTransport({
+        'getblockcount': 250000,
+        'getblock': CoindError(-5, 'Block not found'),
+        'gettxoutsetinfo': asyncio.TimeoutError(),
+    })
+    client = HttpClient('http://127.0.0.1:1', metrics=metrics, transport=transport)
+    assert await client.request('getblockcount', [], None) == 250000
+    with pytest.raises(CoindError):
+        await client.request('getblock', ['00' * 32], None)
+    with pytest.raises(asyncio.TimeoutError):
+        await client.request('gettxoutsetinfo', [], None)
+    await client.request_batch([('getblockcount', []), ('getblock', ['00'])], None)
+
+    snapshot = metrics.snapshot()
+    assert set(snapshot) == {'getblockcount', 'getblock', 'gettxoutsetinfo', 'batch'}
+    assert all(stats['in_flight'] == 0 and stats['calls'] == 1 for stats in snapshot.values())
+    assert snapshot['getblockcount']['errors'] == {}
+    assert snapshot['getblock']['errors'] == {-5: 1}
+    assert snapshot['gettxoutsetinfo']['errors'] == {'TimeoutError': 1}
+    assert snapshot['gettxoutsetinfo']['response_bytes'] == 0
+    assert snapshot['getblockcount']['response_bytes'] > 0
+    assert snapshot['batch']['request_bytes'] > snapshot['getblockcount']['request_bytes']
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import multiprocessing
+import time
+
+import pytest
+from aiohttp import ClientSession
+
+from aio_coind.bench.mockd import MockDaemon, canned_payloads, serve
+from aio_coind.exceptions import CoindError
+from aio_coind.session import CoindSession
+
+
+def _payloads():
+    return canned_payloads(block_transactions=5, txpool_size=3, unspent_count=4)
+
+
+def test_canned_payloads_are_deterministic():
+    payloads = _payloads()
+    assert payloads == _payloads()
+    assert payloads != canned_payloads(block_transactions=5, txpool_size=3, unspent_count=4, seed=2)
+    block = json.loads(payloads['getblock'])
+    assert block['txcount'] == len(block['tx']) == 5
+    assert block['hash'] == json.loads(payloads['getbestblockhash'])
+    assert len(json.loads(payloads['getrawtxpool'])) == 3
+    assert len(json.loads(payloads['listunspent'])) == 4
+    assert json.loads(payloads['getblocktemplate'])['previousblockhash'] == block['hash']
+
+
+async def test_daemon_answers_calls_and_batches():
+    payloads = _payloads()
+    async with MockDaemon(payloads) as daemon:
+        async with CoindSession('user', 'password', daemon.port) as coind:
+            assert await coind.blockchain.get_block_count() == 250000
+            assert await coind.fetch('getblock', ['00' * 32, 2]) == json.loads(payloads['getblock'])
+            with pytest.raises(CoindError) as e:
+                await coind.fetch('stop')
+            assert e.value.code == -32601
+            results = await coind.fetch_batch([('getblockcount', []), ('stop', []), ('getconnectioncount', [])])
+            assert results[0] == 250000 and results[2] == 8
+            assert isinstance(results[1], CoindError) and results[1].code == -32601
+
+        # Request ids are echoed as sent, whatever their type.
+        async with ClientSession() as session:
+            url = f'http://127.0.0.1:{daemon.port}/'
+            async with session.post(url, data=b'{"method":"getblockcount","id":"abc"}') as resp:
+                assert json.loads(await resp.read()) == {'result': 250000, 'error': None, 'id': 'abc'}
+
+
+async def test_daemon_latency():
+    async with MockDaemon(_payloads(), latency=0.05) as daemon:
+        async with CoindSession('user', 'password', daemon.port) as coind:
+            start = time.perf_counter()
+            await asyncio.gather(*(coind.blockchain.get_block_count() for _ in range(5)))
+            elapsed = time.perf_counter() - start
+    # Responses are delayed concurrently, not one after another.
+    assert 0.05 <= elapsed < 0.2
+
+
+def test_serve_in_a_process():
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.get_context('fork').Process(target=serve, kwargs={'ready': child}, daemon=True)
+    process.start()
+    try:
+        assert parent.poll(30)
+        port = parent.recv()
+
+        async def call():
+            async with CoindSession('user', 'password', port) as coind:
+                return await coind.blockchain.get_best_block_hash()
+
+        assert asyncio.run(call()) == json.loads(canned_payloads()['getbestblockhash'])
+    finally:
+        process.terminate()
+        process.join()
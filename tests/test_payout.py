@@ -0,0 +1,163 @@
+import json
+
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules.payout import FAILED, PENDING, SENT, SUBMITTING, PayoutEngine
+
+
+class Wallet:
+    """Node wallet answering sendmany and listsinceblock."""
+
+    def __init__(self):
+        self.sent = []
+        self.fail = {}
+
+    def handlers(self):
+        return {
+            'estimatesmartfee': lambda blocks: {'feerate': 0.0001, 'blocks': blocks},
+            'getbestblockhash': lambda: 'aa' * 32,
+            'sendmany': self.send_many,
+            'listsinceblock': self.list_since_block,
+        }
+
+    def send_many(self, account, to, min_conf, comment, subtract_fee):
+        fail = self.fail.pop(len(self.sent), None)
+        if isinstance(fail, CoindError):
+            raise fail
+        txid = f'{len(self.sent):064x}'
+        self.sent.append({'to': to, 'comment': comment, 'txid': txid})
+        if fail is not None:
+            # The node created the transaction but the reply never arrived.
+            raise fail
+        return txid
+
+    def list_since_block(self, blockhash, target_confirmations, include_watch_only):
+        return {'transactions': [{'txid': tx['txid'], 'comment': tx['comment']} for tx in self.sent]}
+
+    def comments(self):
+        return [tx['comment'] for tx in self.sent]
+
+
+PAYOUTS = [(f'nexa:addr{i}', 1.0 + i) for i in range(7)] + [('nexa:addr0', 0.5)]
+
+
+def _engine(make_coind, wallet, tmp_path, **kwargs):
+    kwargs.setdefault('max_tx_size', 230)
+    kwargs.setdefault('concurrency', 1)
+    return PayoutEngine(make_coind(wallet.handlers()), str(tmp_path / 'ledger.json'), **kwargs)
+
+
+def _ledger(tmp_path):
+    with open(tmp_path / 'ledger.json') as f:
+        return json.load(f)
+
+
+async def test_chunking(make_coind, tmp_path):
+    wallet = Wallet()
+    results = await _engine(make_coind, wallet, tmp_path).pay(PAYOUTS, 'batch-1')
+    # (230 * 0.5 - 10) // 34 == 3 outputs per transaction.
+    assert [len(tx['to']) for tx in wallet.sent] == [3, 3, 2]
+    assert sum(sum(tx['to'].values()) for tx in wallet.sent) == pytest.approx(sum(a for _, a in PAYOUTS))
+    # The repeated address goes to another transaction instead of being merged.
+    assert [tx['to'].get('nexa:addr0') for tx in wallet.sent] == [1.0, None, 0.5]
+    assert {result['status'] for result in results} == {SENT}
+    assert len(results) == len(PAYOUTS)
+    ledger = _ledger(tmp_path)
+    assert ledger['since_block'] == 'aa' * 32
+    assert wallet.comments() == [PayoutEngine.COMMENT_PREFIX + key for key in ledger['order']]
+
+
+async def test_max_fee_limits_chunk_size(make_coind, tmp_path):
+    wallet = Wallet()
+    # 0.0000115 / 0.0001 per kB allows 115 bytes: (115 * 0.5 - 10) // 34 == 1 output.
+    await _engine(make_coind, wallet, tmp_path, max_fee=0.0000115).pay(PAYOUTS[:3], 'batch-1')
+    assert [len(tx['to']) for tx in wallet.sent] == [1, 1, 1]
+
+
+async def test_resubmission_is_idempotent(make_coind, tmp_path):
+    wallet = Wallet()
+    engine = _engine(make_coind, wallet, tmp_path)
+    first = await engine.pay(PAYOUTS, 'batch-1')
+    second = await engine.pay(PAYOUTS, 'batch-1')
+    assert second == first
+    assert len(wallet.sent) == 3
+
+
+async def test_resume_after_crash(make_coind, tmp_path):
+    wallet = Wallet()
+    wallet.fail[1] = ConnectionResetError('connection lost')
+    engine = _engine(make_coind, wallet, tmp_path)
+    with pytest.raises(ConnectionResetError):
+        await engine.pay(PAYOUTS, 'batch-1')
+    ledger = _ledger(tmp_path)
+    assert [ledger['chunks'][key]['status'] for key in ledger['order']] == [SENT, SUBMITTING, SENT]
+
+    # A new process: the chunk is found by its comment and not sent again.
+    results = await _engine(make_coind, wallet, tmp_path).pay(PAYOUTS, 'batch-1')
+    assert {result['status'] for result in results} == {SENT}
+    assert len(wallet.sent) == 3
+    assert len(set(wallet.comments())) == 3
+    ledger = _ledger(tmp_path)
+    assert ledger['chunks'][ledger['order'][1]]['txid'] == wallet.sent[1]['txid']
+
+
+async def test_unconfirmed_chunk_waits_for_release(make_coind, tmp_path):
+    wallet = Wallet()
+    engine = _engine(make_coind, wallet, tmp_path)
+    await engine.pay(PAYOUTS, 'batch-1')
+    # Simulate a crash after marking a chunk 'submitting' but before sendmany reached the node.
+    ledger = _ledger(tmp_path)
+    lost = ledger['order'][1]
+    ledger['chunks'][lost].update(status=SUBMITTING, txid=None)
+    with open(tmp_path / 'ledger.json', 'w') as f:
+        json.dump(ledger, f)
+    del wallet.sent[1]
+
+    results = await engine.pay(PAYOUTS, 'batch-1')
+    assert {r['status'] for r in results if r['chunk'] == lost} == {SUBMITTING}
+    assert {r['error'] for r in results if r['chunk'] == lost} == {
+        'Transaction not found in wallet; manual check required',
+    }
+    assert len(wallet.sent) == 2
+
+    with pytest.raises(ValueError, match=f'Batch batch-1 has unconfirmed chunks: {lost}'):
+        await engine.pay(PAYOUTS, 'batch-2')
+
+    engine.release([lost])
+    assert _ledger(tmp_path)['chunks'][lost]['status'] == PENDING
+    results = await engine.pay(PAYOUTS, 'batch-1')
+    assert {result['status'] for result in results} == {SENT}
+    assert wallet.comments()[-1] == PayoutEngine.COMMENT_PREFIX + lost
+
+
+async def test_reconcile_failure(make_coind, tmp_path):
+    wallet = Wallet()
+    wallet.fail[0] = ConnectionResetError('connection lost')
+    engine = _engine(make_coind, wallet, tmp_path)
+    with pytest.raises(ConnectionResetError):
+        await engine.pay(PAYOUTS, 'batch-1')
+
+    def unavailable(*params):
+        raise CoindError(-28, 'Loading wallet...')
+
+    engine.coind_implementation.provider.handlers['listsinceblock'] = unavailable
+    results = await engine.pay(PAYOUTS, 'batch-1')
+    first = _ledger(tmp_path)['order'][0]
+    assert {r['status'] for r in results if r['chunk'] == first} == {SUBMITTING}
+    assert {r['error'] for r in results if r['chunk'] == first} == {
+        "Reconciliation failed: (-28, 'Loading wallet...')",
+    }
+    assert len(wallet.sent) == 3
+
+
+async def test_node_error_is_retried(make_coind, tmp_path):
+    wallet = Wallet()
+    wallet.fail[0] = CoindError(-6, 'Insufficient funds')
+    engine = _engine(make_coind, wallet, tmp_path)
+    results = await engine.pay(PAYOUTS, 'batch-1')
+    assert [r['status'] for r in results].count(FAILED) == 3
+    assert len(wallet.sent) == 2
+    results = await engine.pay(PAYOUTS, 'batch-1')
+    assert {result['status'] for result in results} == {SENT}
+    assert len(wallet.sent) == 3
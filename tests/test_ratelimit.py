@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from aio_coind.ratelimit import HEAVY, LARGE_LIST_COUNT, RateLimiter, TokenBucket, classify
+
+
+@pytest.mark.parametrize('method, params, group', [
+    ('gettxoutsetinfo', [], HEAVY),
+    ('getblockcount', [], None),
+    ('listtransactions', ['*', LARGE_LIST_COUNT + 1, 0, False], HEAVY),
+    ('listtransactions', ['*', LARGE_LIST_COUNT, 0, False], None),
+    ('listtransactionsfrom', ['*', 5000], HEAVY),
+    ('listtransactions', ['*'], None),
+    ('importaddresses', ['rescan', 'nexa:a'], HEAVY),
+    ('importaddresses', ['no-rescan', 'nexa:a'], None),
+    ('importprivatekeys', ['rescan', 'key'], HEAVY),
+    ('importpubkey', ['02' * 33, '', True], HEAVY),
+    ('importpubkey', ['02' * 33, '', False], None),
+    ('importpubkey', ['02' * 33], HEAVY),
+    ('importprivkey', ['key', False], None),
+    ('importaddress', ['nexa:a', '', True, False], HEAVY),
+    ('importaddress', ['nexa:a', '', False, False], None),
+    ('importaddress', ['nexa:a'], HEAVY),
+])
+def test_classify(method, params, group):
+    assert classify(method, params) == group
+
+
+async def test_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=100, burst=5)
+    start = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - start < 0.01
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 0.045
+
+
+async def test_bucket_waiters_are_served_in_order():
+    bucket = TokenBucket(rate=200, burst=1)
+    await bucket.acquire()
+    order = []
+
+    async def waiter(i, tokens):
+        await bucket.acquire(tokens)
+        order.append(i)
+
+    await asyncio.gather(*(waiter(i, 1 if i % 2 else 0.5) for i in range(6)))
+    assert order == list(range(6))
+
+
+async def test_bucket_rejects_more_than_burst():
+    bucket = TokenBucket(rate=1000, burst=2)
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(bucket.acquire(3), 1)
+    await asyncio.wait_for(bucket.acquire(2), 1)
+
+
+async def test_rate_limiter_uses_method_and_group_buckets():
+    limiter = RateLimiter({HEAVY: (20, 1), 'getblock': TokenBucket(1000, 2)})
+    start = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire('gettxoutsetinfo', [])
+    assert time.monotonic() - start >= 0.09
+    assert limiter.buckets['getblock'].tokens == 2
+
+    start = time.monotonic()
+    for _ in range(20):
+        await limiter.acquire('getblockcount', [])
+    await limiter.acquire('getblock', ['00' * 32])
+    assert time.monotonic() - start < 0.05
+    assert limiter.buckets['getblock'].tokens < 2
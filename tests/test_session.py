@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from aio_coind.exceptions import CoindError
+from aio_coind.session import CoindSession
+
+
+class Daemon:
+    """Daemon recording the client port of every call; calls in slow are answered late."""
+
+    def __init__(self, slow=(), delay=0.2):
+        self.slow = slow
+        self.delay = delay
+        self.ports = {}
+        self.port = None
+        self._runner = None
+
+    async def _handle(self, request):
+        data = json.loads(await request.read())
+        items = data if isinstance(data, list) else [data]
+        client_port = request.transport.get_extra_info('peername')[1]
+        for item in items:
+            self.ports.setdefault(item['method'], set()).add(client_port)
+        if any((item['method'], *item['params'][:1]) in self.slow for item in items):
+            await asyncio.sleep(self.delay)
+        results = [{'result': item['method'], 'error': None, 'id': item['id']} for item in items]
+        return web.json_response(results if isinstance(data, list) else results[0])
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post('/', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._runner.cleanup()
+
+
+async def test_heavy_calls_use_their_own_pool():
+    async with Daemon(slow={('gettxoutsetinfo',), ('importaddresses', 'rescan')}) as daemon:
+        async with CoindSession('user', 'password', daemon.port, heavy_pool_size=1) as coind:
+            heavy = [
+                asyncio.ensure_future(coind.fetch('gettxoutsetinfo')),
+                asyncio.ensure_future(coind.wallet.import_addresses('rescan', ['nexa:a'])),
+            ]
+            await asyncio.sleep(0.02)
+            # Light calls are not held up by the busy heavy connection.
+            start = asyncio.get_running_loop().time()
+            await coind.blockchain.get_block_count()
+            await coind.wallet.import_addresses('no-rescan', ['nexa:b'])
+            assert asyncio.get_running_loop().time() - start < 0.1
+            await asyncio.gather(*heavy)
+            await coind.fetch_batch([('getbestblockhash', []), ('verifychain', [])])
+    # A batch with a heavy call goes through the heavy pool as a whole.
+    heavy_ports = daemon.ports['gettxoutsetinfo'] | daemon.ports['verifychain'] | daemon.ports['getbestblockhash']
+    assert len(heavy_ports) == 1
+    assert not heavy_ports & daemon.ports['getblockcount']
+    assert daemon.ports['importaddresses'] - daemon.ports['getblockcount'] == heavy_ports
+
+
+async def test_heavy_timeout():
+    async with Daemon(slow={('gettxoutsetinfo',)}, delay=0.3) as daemon:
+        async with CoindSession('user', 'password', daemon.port, timeout=0.1, heavy_pool_size=1) as coind:
+            assert await coind.fetch('gettxoutsetinfo') == 'gettxoutsetinfo'
+        async with CoindSession('user', 'password', daemon.port, timeout=0.1) as coind:
+            with pytest.raises(asyncio.TimeoutError):
+                await coind.fetch('gettxoutsetinfo')
+
+
+@pytest.mark.parametrize('heavy_methods', [{'getblock'}, lambda method, params: 'big' if params else None])
+async def test_custom_heavy_methods(heavy_methods):
+    async with Daemon() as daemon:
+        session = CoindSession('user', 'password', daemon.port, heavy_pool_size=2, heavy_methods=heavy_methods)
+        async with session as coind:
+            assert coind.route('getblock', ['00']) is not None
+            assert coind.route('getblockcount', []) is None
+            assert await coind.fetch('getblock', ['00']) == 'getblock'
+            assert await coind.fetch('getblockcount') == 'getblockcount'
+        assert session.heavy_session.closed and session.session.closed
+    assert not daemon.ports['getblock'] & daemon.ports['getblockcount']
+
+
+async def test_without_heavy_pool_all_calls_share_one_pool():
+    async with Daemon() as daemon:
+        session = CoindSession('user', 'password', daemon.port)
+        async with session as coind:
+            assert session.heavy_session is None
+            await coind.fetch('gettxoutsetinfo')
+            await coind.fetch('getblockcount')
+    assert daemon.ports['gettxoutsetinfo'] == daemon.ports['getblockcount']
+
+
+async def test_unauthorized_status_is_reported():
+    async def handle(request):
+        return web.Response(status=401)
+
+    app = web.Application()
+    app.router.add_post('/', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    try:
+        async with CoindSession('user', 'wrong', runner.addresses[0][1]) as coind:
+            with pytest.raises(CoindError) as e:
+                await coind.blockchain.get_block_count()
+        assert e.value.code == 401
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from aio_coind import CoindSession
+from aio_coind.bench.mockd import MockDaemon
+from aio_coind.exceptions import CoindError
+from aio_coind.transport import ReplayTransport, RecordingTransport, Transport, read_recording
+
+PAYLOADS = {
+    'getblockcount': b'42',
+    'getbestblockhash': b'"' + b'ab' * 32 + b'"',
+    'getblock': b'{"height":42,"tx":["01"]}',
+}
+
+
+def test_transport_is_abstract():
+    with pytest.raises(TypeError):
+        Transport()
+
+    class Incomplete(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+async def _calls(coind):
+    return [
+        await coind.blockchain.get_block_count(),
+        await coind.blockchain.get_best_block_hash(),
+        await coind.blockchain.get_block('ab' * 32),
+        await coind.fetch_batch([('getblockcount', []), ('getbestblockhash', [])]),
+        await coind.blockchain.get_block_count(),
+    ]
+
+
+async def test_record_and_replay(tmp_path):
+    path = str(tmp_path / 'calls.rec.gz')
+    async with MockDaemon(PAYLOADS) as daemon:
+        async with CoindSession('user', 'password', daemon.port, transport=RecordingTransport(path)) as coind:
+            recorded = await _calls(coind)
+            with pytest.raises(CoindError):
+                await coind.fetch('getnetworkinfo')
+
+    records = list(read_recording(path))
+    # JSON-RPC errors are responses too and are replayed as such.
+    assert len(records) == 6
+    assert all(record['elapsed'] >= 0 for record in records)
+
+    transport = ReplayTransport(path)
+    assert [method for _, method, _ in transport.calls()] == [
+        'getblockcount', 'getbestblockhash', 'getblock', 'getblockcount', 'getbestblockhash', 'getblockcount',
+        'getnetworkinfo',
+    ]
+    async with CoindSession('user', 'password', transport=transport) as coind:
+        assert await _calls(coind) == recorded
+        with pytest.raises(CoindError) as e:
+            await coind.fetch('getnetworkinfo')
+        assert e.value.code == -32601
+        with pytest.raises(CoindError, match='No recorded response'):
+            await coind.fetch('getpeerinfo')
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / 'calls.json'
+    path.write_text('{}\n')
+    with pytest.raises(OSError):
+        list(read_recording(str(path)))
+
+
+async def test_recording_survives_a_crash(tmp_path):
+    path = str(tmp_path / 'calls.rec.gz')
+    async with MockDaemon(PAYLOADS) as daemon:
+        transport = RecordingTransport(path)
+        async with CoindSession('user', 'password', daemon.port, transport=transport) as coind:
+            for _ in range(3):
+                await coind.blockchain.get_block_count()
+            # Readable while the transport is still open.
+            assert len(list(read_recording(path))) == 3
+            size = os.path.getsize(path)
+            await coind.blockchain.get_best_block_hash()
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    # The process died while writing the fourth record.
+    for cut in (size + 1, size + 9, size + 12, size + 20):
+        with open(path, 'wb') as f:
+            f.write(data[:cut])
+        assert [record['response'] for record in read_recording(path)] == [
+            '{"result":42,"error":null,"id":%d}' % i for i in range(1, 4)
+        ]
+
+    # Appending after a restart keeps the earlier records.
+    with open(path, 'wb') as f:
+        f.write(data)
+    async with MockDaemon(PAYLOADS) as daemon:
+        async with CoindSession('user', 'password', daemon.port, transport=RecordingTransport(path)) as coind:
+            await coind.blockchain.get_block_count()
+    assert len(list(read_recording(path))) == 5
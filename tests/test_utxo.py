@@ -0,0 +1,156 @@
+import pickle
+import threading
+
+import pytest
+
+from aio_coind.modules import utxo as utxo_module
+from aio_coind.modules.utxo import UtxoTracker
+
+SCRIPT = {'hex': '76a914' + '11' * 20 + '88ac'}
+OTHER = {'hex': '005114' + '22' * 20}
+
+
+def _txid(name):
+    return name * 64
+
+
+def _tx(name, inputs, outputs, script=SCRIPT):
+    return {
+        'txid': _txid(name),
+        'vin': [{'txid': _txid(prev), 'vout': n} for prev, n in inputs],
+        'vout': [{'n': n, 'value': value, 'scriptPubKey': script} for n, value in enumerate(outputs)],
+    }
+
+
+def _block(block_hash, prev_hash, height, txs):
+    return {'hash': block_hash, 'previousblockhash': prev_hash, 'height': height, 'tx': txs}
+
+
+def _tracker(**kwargs):
+    tracker = UtxoTracker(None, **kwargs)
+    tracker.connect_block(_block('b1', None, 1, [_tx('a', [], [50.0])]))
+    return tracker
+
+
+def _keys(tracker):
+    return {f'{outpoint[0]}:{outpoint[-1]}' for outpoint, _ in tracker.items()}
+
+
+def test_disconnect_restores_spent_outputs():
+    tracker = _tracker()
+    before = dict(tracker.utxos)
+    tracker.connect_block(_block('b2', 'b1', 2, [_tx('b', [('a', 0)], [20.0, 30.0])]))
+    assert _keys(tracker) == {'b:0', 'b:1'}
+
+    assert tracker.disconnect_block() == 'b2'
+    assert tracker.utxos == before
+    assert (tracker.tip_hash, tracker.tip_height) == ('b1', 1)
+
+
+def test_disconnect_chain_inside_block():
+    tracker = _tracker()
+    before = dict(tracker.utxos)
+    # b spends a:0, c spends b:0 and d spends c:0 in the same block.
+    tracker.connect_block(_block('b2', 'b1', 2, [
+        _tx('b', [('a', 0)], [40.0, 10.0]),
+        _tx('c', [('b', 0)], [39.0]),
+        _tx('d', [('c', 0)], [38.0]),
+    ]))
+    assert _keys(tracker) == {'b:1', 'd:0'}
+
+    tracker.disconnect_block()
+    assert tracker.utxos == before
+
+
+def test_reconnect_after_disconnect():
+    tracker = _tracker()
+    block = _block('b2', 'b1', 2, [_tx('b', [('a', 0)], [50.0]), _tx('c', [('b', 0)], [49.0])])
+    tracker.connect_block(block)
+    after = dict(tracker.utxos)
+    tracker.disconnect_block()
+    tracker.connect_block(block)
+    assert tracker.utxos == after
+
+
+def test_compact_entries():
+    tracker = _tracker()
+    outpoint = 'ee' * 32
+    tracker.connect_block(_block('b2', 'b1', 2, [
+        {'txid': _txid('f'), 'vin': [], 'vout': [{'n': 0, 'outpoint': outpoint, 'value': 1.5, 'scriptPubKey': OTHER}]},
+        _tx('c', [], [2.25]),
+    ]))
+    assert {len(key) for key in tracker.utxos} == {32, 36}
+    assert all(isinstance(entry, bytes) for entry in tracker.utxos.values())
+    assert tracker.get(outpoint) == (1.5, 2, OTHER['hex'])
+    assert tracker.get(_txid('c'), 0) == (2.25, 2, SCRIPT['hex'])
+    assert tracker.get(f"{_txid('a')}:0") == (50.0, 1, SCRIPT['hex'])
+    assert tracker.get(_txid('c'), 1) is None
+    assert dict(tracker.items())[outpoint] == (1.5, 2, OTHER['hex'])
+    assert tracker.balance(SCRIPT['hex']) == 52.25
+    assert tracker.stats() == {'height': 2, 'bestblock': 'b2', 'txouts': 3, 'total_amount': 53.75}
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'utxo.snapshot')
+    tracker = _tracker(snapshot_path=path, snapshot_interval=2)
+    tracker.connect_block(_block('b2', 'b1', 2, [_tx('b', [('a', 0)], [20.0, 30.0])]))
+    assert (tmp_path / 'utxo.snapshot').exists()
+
+    loaded = UtxoTracker(None, snapshot_path=path)
+    assert loaded.utxos == tracker.utxos
+    assert (loaded.tip_hash, loaded.tip_height) == ('b2', 2)
+    # Undo data survives, so a reorg after a restart still works.
+    assert loaded.disconnect_block() == 'b2'
+    assert _keys(loaded) == {'a:0'}
+    assert loaded.disconnect_block() == 'b1'
+    assert loaded.tip_hash is None
+
+
+def test_snapshot_is_not_pickle(tmp_path):
+    path = tmp_path / 'utxo.snapshot'
+    path.write_bytes(pickle.dumps({'version': 1, 'utxos': {}}))
+    with pytest.raises(ValueError, match='Not a UTXO snapshot'):
+        UtxoTracker(None, snapshot_path=str(path))
+
+
+def test_truncated_snapshot(tmp_path):
+    path = str(tmp_path / 'utxo.snapshot')
+    tracker = _tracker(snapshot_path=path)
+    tracker.save_snapshot()
+    with open(path, 'rb') as f:
+        data = f.read()
+    for cut in (10, 30, len(data) - 1):
+        with open(path, 'wb') as f:
+            f.write(data[:cut])
+        with pytest.raises(ValueError, match='Truncated'):
+            UtxoTracker(None, snapshot_path=path)
+
+
+async def test_sync_writes_snapshot_off_the_loop(make_coind, tmp_path, monkeypatch):
+    blocks = [_block('00' * 31 + f'{height:02x}', None, height, [_tx('a', [], [1.0])]) for height in range(5)]
+    for height, block in enumerate(blocks):
+        block['tx'][0]['txid'] = f'{height:064x}'
+        if height:
+            block['previousblockhash'] = blocks[height - 1]['hash']
+    by_hash = {block['hash']: block for block in blocks}
+    coind = make_coind({
+        'getblockheader': lambda block_hash, verbose: {'hash': block_hash, 'confirmations': 1},
+        'getblockcount': lambda: len(blocks) - 1,
+        'getblockhash': lambda height: blocks[height]['hash'],
+        'getblock': lambda block_hash, verbosity, tx_count: by_hash[block_hash],
+    })
+    threads = []
+    write = utxo_module._write_snapshot
+
+    def recording_write(*args):
+        threads.append(threading.current_thread())
+        write(*args)
+
+    monkeypatch.setattr(utxo_module, '_write_snapshot', recording_write)
+    path = str(tmp_path / 'utxo.snapshot')
+    tracker = UtxoTracker(coind, snapshot_path=path, snapshot_interval=2)
+    assert await tracker.sync() == 4
+    assert threads and threading.main_thread() not in threads
+    loaded = UtxoTracker(None, snapshot_path=path)
+    assert loaded.tip_height in (1, 3)
+    assert loaded.utxos == {key: tracker.utxos[key] for key in loaded.utxos}
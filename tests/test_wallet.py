@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+
+class History:
+    """Wallet transaction history served like listtransactions and listtransactionsfrom."""
+
+    def __init__(self, size, latency=0.0):
+        self.entries = [self.entry(i) for i in range(size)]
+        self.latency = latency
+        self.on_fetch = None
+
+    @staticmethod
+    def entry(i, category='receive'):
+        return {'txid': f'{i:064x}', 'vout': 0, 'category': category, 'address': 'nexa:a', 'amount': i}
+
+    def handlers(self):
+        return {'listtransactions': self.list_transactions, 'listtransactionsfrom': self.list_transactions_from}
+
+    async def _fetch(self):
+        await asyncio.sleep(self.latency)
+        if self.on_fetch is not None:
+            self.on_fetch()
+
+    async def list_transactions(self, account, count, skip, include_watch_only):
+        # Skips the newest entries and returns the page oldest first.
+        await self._fetch()
+        end = max(len(self.entries) - skip, 0)
+        return self.entries[max(end - count, 0):end]
+
+    async def list_transactions_from(self, account, count, start, include_watch_only):
+        await self._fetch()
+        return self.entries[start:start + count]
+
+
+def _amounts(entries):
+    return [entry['amount'] for entry in entries]
+
+
+async def _collect(iterator):
+    return [entry async for entry in iterator]
+
+
+@pytest.mark.parametrize('size', [0, 1, 9, 10, 11, 35])
+async def test_iter_transactions_newest_first(make_coind, size):
+    history = History(size)
+    coind = make_coind(history.handlers())
+    entries = await _collect(coind.wallet.iter_transactions(page_size=10, prefetch=2, overlap=3))
+    assert _amounts(entries) == list(range(size))[::-1]
+    calls = [params for method, params in coind.provider.calls]
+    assert calls[0] == ['*', 10, 0, False]
+    assert all(params[1:3] == [13, page * 10 - 3] for page, params in enumerate(calls[1:], 1))
+
+
+async def test_iter_transactions_from_in_node_order(make_coind):
+    history = History(25)
+    coind = make_coind(history.handlers())
+    entries = await _collect(coind.wallet.iter_transactions_from(page_size=10, overlap=2))
+    assert _amounts(entries) == list(range(25))
+
+
+async def test_new_transactions_are_not_repeated(make_coind):
+    history = History(50, latency=0.001)
+    history.on_fetch = lambda: history.entries.append(History.entry(len(history.entries)))
+    coind = make_coind(history.handlers())
+    entries = await _collect(coind.wallet.iter_transactions(page_size=10, prefetch=1, overlap=3))
+    amounts = _amounts(entries)
+    assert len(amounts) == len(set(amounts))
+    assert set(range(50)) <= set(amounts)
+
+
+@pytest.mark.parametrize('method', ['iter_transactions', 'iter_transactions_from'])
+async def test_removed_transactions_do_not_hide_others(make_coind, method):
+    # An abandoned transaction disappears from the history while it is paged through.
+    history = History(60, latency=0.001)
+    removed = set()
+
+    def remove():
+        entry = history.entries.pop(len(history.entries) // 2)
+        removed.add(entry['amount'])
+
+    history.on_fetch = remove
+    coind = make_coind(history.handlers())
+    entries = await _collect(getattr(coind.wallet, method)(page_size=10, prefetch=1, overlap=3))
+    amounts = _amounts(entries)
+    assert len(amounts) == len(set(amounts))
+    assert set(range(60)) - removed <= set(amounts)
+
+
+async def test_same_transaction_with_several_entries(make_coind):
+    history = History(0)
+    history.entries = [History.entry(i // 2, ('send', 'receive')[i % 2]) for i in range(30)]
+    coind = make_coind(history.handlers())
+    entries = await _collect(coind.wallet.iter_transactions(page_size=7, overlap=2))
+    assert len(entries) == 30
+
+
+async def test_closing_the_iterator_cancels_prefetched_pages(make_coind):
+    history = History(100, latency=0.01)
+    coind = make_coind(history.handlers())
+    iterator = coind.wallet.iter_transactions(page_size=10, prefetch=3)
+    assert (await iterator.__anext__())['amount'] == 99
+    await iterator.aclose()
+    await asyncio.sleep(0)
+    assert not [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+
+async def test_invalid_arguments(make_coind):
+    coind = make_coind(History(5).handlers())
+    with pytest.raises(ValueError):
+        await _collect(coind.wallet.iter_transactions(page_size=0))
+    with pytest.raises(ValueError):
+        await _collect(coind.wallet.iter_transactions(overlap=-1))
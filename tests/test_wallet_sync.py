@@ -0,0 +1,120 @@
+from aio_coind.modules.wallet_sync import CHANGED, NEW, REMOVED, WalletSync
+
+
+class Node:
+    """Chain of numbered blocks with wallet transactions, answering listsinceblock."""
+
+    def __init__(self, height=10):
+        self.chain = [f'block{i}' for i in range(height + 1)]
+        self.transactions = {}
+        self.removed = []
+        self.calls = []
+
+    def handlers(self):
+        return {'listsinceblock': self.list_since_block}
+
+    def mine(self, blocks=1):
+        for _ in range(blocks):
+            self.chain.append(f'block{len(self.chain)}')
+
+    def receive(self, txid, height=None, category='receive', confirmations=None):
+        self.transactions[txid] = {'height': height, 'category': category, 'confirmations': confirmations}
+
+    def _entry(self, txid, tx):
+        tip = len(self.chain) - 1
+        entry = {'txid': txid, 'vout': 0, 'address': 'nexa:a', 'category': tx['category'], 'amount': 1.0}
+        if tx['height'] is None:
+            entry['confirmations'] = 0 if tx['confirmations'] is None else tx['confirmations']
+        else:
+            entry['confirmations'] = tip - tx['height'] + 1
+            entry['blockhash'] = self.chain[tx['height']]
+        return entry
+
+    def list_since_block(self, blockhash, target_confirmations, include_watch_only):
+        self.calls.append(blockhash)
+        since = self.chain.index(blockhash) if blockhash in self.chain else -1
+        tip = len(self.chain) - 1
+        return {
+            'transactions': [
+                self._entry(txid, tx) for txid, tx in self.transactions.items()
+                if tx['height'] is None or tx['height'] > since
+            ],
+            'removed': self.removed,
+            'lastblock': self.chain[max(tip - target_confirmations + 1, 0)],
+        }
+
+
+def _events(events):
+    return [(event.kind, event.status, event.entry['txid']) for event in events]
+
+
+async def test_deposit_lifecycle(make_coind, tmp_path):
+    node = Node()
+    sync = WalletSync(make_coind(node.handlers()), str(tmp_path / 'sync.json'), target_confirmations=3)
+    assert await sync.sync() == []
+    assert sync.cursor == 'block8'
+
+    node.receive('tx1')
+    assert _events(await sync.sync()) == [(NEW, 'unconfirmed', 'tx1')]
+    assert await sync.sync() == []
+
+    node.mine()
+    node.transactions['tx1']['height'] = 11
+    assert _events(await sync.sync()) == [(CHANGED, 'confirming', 'tx1')]
+    node.mine()
+    assert await sync.sync() == []
+    # Several blocks at once still report the final status exactly once.
+    node.mine(3)
+    assert _events(await sync.sync()) == [(CHANGED, 'final', 'tx1')]
+    node.mine()
+    assert await sync.sync() == []
+    assert sync._known == {}
+
+
+async def test_uncommitted_events_are_repeated(make_coind, tmp_path):
+    path = str(tmp_path / 'sync.json')
+    node = Node()
+    node.receive('tx1', height=10)
+    sync = WalletSync(make_coind(node.handlers()), path)
+    assert _events(await sync.poll()) == [(NEW, 'confirming', 'tx1')]
+    assert _events(await sync.poll()) == [(NEW, 'confirming', 'tx1')]
+
+    # A restart before commit() repeats the events; after it they are not repeated.
+    sync = WalletSync(make_coind(node.handlers()), path)
+    assert len(await sync.poll()) == 1
+    sync.commit()
+    sync.commit()
+    sync = WalletSync(make_coind(node.handlers()), path)
+    assert sync.cursor == 'block5'
+    assert await sync.poll() == []
+    assert node.calls[-1] == 'block5'
+
+
+async def test_categories(make_coind, tmp_path):
+    node = Node()
+    node.receive('tx1')
+    node.receive('tx2', category='send')
+    sync = WalletSync(make_coind(node.handlers()), str(tmp_path / 'a.json'))
+    assert _events(await sync.sync()) == [(NEW, 'unconfirmed', 'tx1')]
+    sync = WalletSync(make_coind(node.handlers()), str(tmp_path / 'b.json'), categories=None)
+    assert [event.entry['category'] for event in await sync.sync()] == ['receive', 'send']
+
+
+async def test_conflicted_and_reorged_deposits(make_coind, tmp_path):
+    node = Node()
+    node.receive('tx1', height=10)
+    node.receive('tx2', height=10)
+    sync = WalletSync(make_coind(node.handlers()), str(tmp_path / 'sync.json'))
+    assert len(await sync.sync()) == 2
+
+    # Block 10 is replaced: tx1 is mined again in the new block, tx2 is conflicted.
+    node.chain[10] = 'block10b'
+    node.removed = [dict(node._entry(txid, node.transactions[txid]), blockhash='block10') for txid in ('tx1', 'tx2')]
+    node.transactions['tx2'] = {'height': None, 'category': 'receive', 'confirmations': -1}
+    events = _events(await sync.sync())
+    assert events == [(CHANGED, 'confirming', 'tx1'), (CHANGED, 'conflicted', 'tx2')]
+
+    del node.transactions['tx2']
+    events = _events(await sync.sync())
+    assert events == [(REMOVED, 'confirming', 'tx2')]
+    assert _events(await sync.sync()) == []
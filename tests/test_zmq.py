@@ -0,0 +1,154 @@
+import asyncio
+import time
+
+import pytest
+
+from aio_coind.exceptions import CoindError
+from aio_coind.modules.zmq import ZmqSubscriber
+
+zmq = pytest.importorskip('zmq')
+zmq_asyncio = pytest.importorskip('zmq.asyncio')
+
+
+class Publisher:
+    """Local zmq.PUB socket speaking the node's three-frame format."""
+
+    def __init__(self):
+        self.context = zmq_asyncio.Context()
+        self.socket = self.context.socket(zmq.PUB)
+        port = self.socket.bind_to_random_port('tcp://127.0.0.1')
+        self.address = f'tcp://127.0.0.1:{port}'
+        self.sequences = {}
+
+    async def send(self, topic, body, sequence=None):
+        if sequence is None:
+            sequence = self.sequences.get(topic, -1) + 1
+        self.sequences[topic] = sequence
+        await self.socket.send_multipart([topic.encode(), body, sequence.to_bytes(4, 'little')])
+
+    async def connect(self, stream, topic):
+        # PUB drops messages until the subscription arrives; publish until one gets through.
+        while True:
+            await self.send(topic, b'\x00' * 32)
+            try:
+                await asyncio.wait_for(stream.__anext__(), 0.05)
+                break
+            except asyncio.TimeoutError:
+                pass
+        while not stream._queue.empty():
+            stream._queue.get_nowait()
+
+    def close(self):
+        self.socket.close(linger=0)
+        self.context.term()
+
+
+async def test_dispatch_and_gaps(make_coind):
+    publisher = Publisher()
+    subscriber = ZmqSubscriber(
+        make_coind({}), ['hashblock', 'hashtx'],
+        endpoints={'hashblock': publisher.address, 'hashtx': publisher.address},
+    )
+    received = []
+    gaps = []
+    subscriber.on('hashtx', received.append)
+    subscriber.on_gap(lambda topic, missed: gaps.append((topic, missed)))
+    try:
+        async with subscriber:
+            assert not subscriber.polling
+            blocks = subscriber.stream(['hashblock'])
+            everything = subscriber.stream()
+            await publisher.connect(blocks, 'hashblock')
+            await publisher.connect(everything, 'hashtx')
+
+            await publisher.send('hashtx', b'\x01' * 32)
+            await publisher.send('hashblock', b'\x02' * 32)
+            notification = await asyncio.wait_for(blocks.__anext__(), 1)
+            assert (notification.topic, notification.body) == ('hashblock', b'\x02' * 32)
+            assert notification.sequence == publisher.sequences['hashblock']
+            assert [n.topic for n in (await everything.__anext__(), await everything.__anext__())] == [
+                'hashtx', 'hashblock',
+            ]
+
+            # Three hashblock messages never arrive.
+            await publisher.send('hashblock', b'\x03' * 32, publisher.sequences['hashblock'] + 4)
+            await asyncio.wait_for(blocks.__anext__(), 1)
+            await asyncio.sleep(0.01)
+            assert gaps == [('hashblock', 3)]
+            assert subscriber.gaps == {'hashblock': 3, 'hashtx': 0}
+            assert [n.body for n in received if any(n.body)] == [b'\x01' * 32]
+    finally:
+        publisher.close()
+
+
+async def test_sequence_wraps_around(make_coind):
+    subscriber = ZmqSubscriber(make_coind({}), ['hashblock'], use_zmq=False)
+    subscriber._check_sequence('hashblock', 0xFFFFFFFF)
+    subscriber._check_sequence('hashblock', 0)
+    assert subscriber.gaps['hashblock'] == 0
+    subscriber._check_sequence('hashblock', 2)
+    assert subscriber.gaps['hashblock'] == 1
+
+
+async def test_slow_callback_does_not_stall_receive(make_coind):
+    publisher = Publisher()
+    subscriber = ZmqSubscriber(make_coind({}), ['hashtx'], endpoints={'hashtx': publisher.address})
+    handled = []
+
+    async def slow(notification):
+        await asyncio.sleep(0.2)
+        handled.append(notification)
+
+    def failing(notification):
+        raise RuntimeError('handler bug')
+
+    subscriber.on('hashtx', failing)
+    subscriber.on('hashtx', slow)
+    try:
+        async with subscriber:
+            stream = subscriber.stream()
+            await publisher.connect(stream, 'hashtx')
+            started = time.monotonic()
+            for i in range(3):
+                await publisher.send('hashtx', bytes([i]) * 32)
+            for i in range(3):
+                assert (await asyncio.wait_for(stream.__anext__(), 1)).body == bytes([i]) * 32
+            assert time.monotonic() - started < 0.2
+            # The failing handler is logged and the slow one still runs.
+            while len(handled) < 4:
+                await asyncio.sleep(0.05)
+    finally:
+        publisher.close()
+
+
+async def test_polling_fallback(make_coind):
+    state = {'tip': 'aa' * 32, 'pool': ['01' * 32]}
+
+    def get_raw_transaction(txid, *params):
+        if txid == '03' * 32:
+            raise CoindError(-5, 'No such txpool or blockchain transaction')
+        return 'ff' + txid
+
+    coind = make_coind({
+        'getzmqnotifications': lambda: [{'type': 'pubhashblock', 'address': 'tcp://127.0.0.1:1'}],
+        'getbestblockhash': lambda: state['tip'],
+        'getblock': lambda block_hash, verbosity, tx_count: 'ee' + block_hash,
+        'getrawtxpool': lambda verbose: list(state['pool']),
+        'getrawtransaction': get_raw_transaction,
+    })
+    subscriber = ZmqSubscriber(coind, ['rawblock', 'hashtx', 'rawtx'], poll_interval=0.01)
+    async with subscriber:
+        # The node publishes none of these topics, so all of them are polled.
+        assert subscriber.polling
+        assert subscriber.polled_topics == {'rawblock', 'hashtx', 'rawtx'}
+        stream = subscriber.stream()
+        await asyncio.sleep(0.03)
+        state['tip'] = 'bb' * 32
+        state['pool'] = ['01' * 32, '02' * 32, '03' * 32]
+        received = [await asyncio.wait_for(stream.__anext__(), 1) for _ in range(3)]
+    assert [(n.topic, n.body.hex(), n.sequence) for n in received] == [
+        ('rawblock', 'ee' + 'bb' * 32, None),
+        ('hashtx', '02' * 32, None),
+        ('rawtx', 'ff' + '02' * 32, None),
+    ]
+    assert stream._queue.empty()
@@ -0,0 +1,270 @@
+import asyncio
+import gzip
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from time import perf_counter_ns
+
+from .exceptions import CoindError
+
+_HEADERS = {'Content-Type': 'application/json'}
+
+
+class Transport(ABC):
+    """
+    Abstract base class for transports moving JSON-RPC bodies to Coind and back.
+
+    HttpClient builds and decodes JSON-RPC messages and hands the encoded
+    request body to its transport, which returns the raw response body.
+
+    Attributes:
+        url (str): URL of the Coind server, set by bind().
+        hooks (Hooks): Request lifecycle hooks, set by bind().
+        needs_session (bool): Whether post() uses the AIOHTTP session.
+    """
+
+    url = None
+    hooks = None
+    needs_session = True
+
+    def bind(self, url, hooks=None):
+        """
+        Attach the transport to a client.
+
+        Args:
+            url (str): URL of the Coind server.
+            hooks (Hooks): Request lifecycle hooks (default is None).
+        """
+        self.url = url
+        self.hooks = hooks
+
+    @abstractmethod
+    async def post(self, body, session, trace=None):
+        """
+        Send a request body and return the response body.
+
+        Args:
+            body (bytes): JSON-RPC request body.
+            session (ClientSession): AIOHTTP client session.
+            trace (RequestTrace): Request trace when hooks are enabled (default is None).
+
+        Returns:
+            bytes: JSON-RPC response body.
+        """
+        pass
+
+    async def close(self):
+        """
+        Release resources held by the transport.
+        """
+
+
+class AiohttpTransport(Transport):
+    """
+    Default transport posting requests through an AIOHTTP client session.
+    """
+
+    async def post(self, body, session, trace=None):
+        if trace is None:
+            async with session.post(
+                self.url,
+                headers=_HEADERS,
+                data=body,
+            ) as resp:
+                raw = await resp.read()
+                if resp.status >= 400:
+                    self._check_status(resp, raw)
+                return raw
+        async with session.post(
+            self.url,
+            headers=_HEADERS,
+            data=body,
+            trace_request_ctx=trace,
+        ) as resp:
+            trace.first_byte_ns = perf_counter_ns()
+            if trace.sent_ns is not None:
+                self.hooks.emit('request_sent', trace)
+            self.hooks.emit('first_byte', trace)
+            raw = await resp.read()
+            trace.received_ns = perf_counter_ns()
+            if resp.status >= 400:
+                self._check_status(resp, raw)
+            return raw
+
+    @staticmethod
+    def _check_status(resp, raw):
+        # JSON-RPC errors come with a JSON body; anything else, e.g. 503 "Work queue depth
+        # exceeded" or 401 with an empty body, is reported with the HTTP status as code.
+        if resp.content_type != 'application/json':
+            raise CoindError(resp.status, raw.decode(errors='replace').strip() or resp.reason)
+
+
+class RecordingTransport(Transport):
+    """
+    Transport writing every request/response pair to a recording.
+
+    The recording is a gzip-compressed file with one JSON object per line:
+    wall-clock start time ('time'), duration in seconds ('elapsed'), and the
+    request and response bodies. Failed requests are not recorded. Each
+    record is written and flushed as its own gzip member, so a crash loses
+    at most the record being written.
+
+    Attributes:
+        path (str): Path to the recording.
+        inner (Transport): Transport doing the actual requests.
+    """
+
+    def __init__(self, path, inner=None):
+        """
+        Initialize the RecordingTransport instance.
+
+        Args:
+            path (str): Path to the recording; new records are appended.
+            inner (Transport): Transport doing the actual requests (default is AiohttpTransport()).
+        """
+        self.path = path
+        self.inner = AiohttpTransport() if inner is None else inner
+        self._file = None
+
+    @property
+    def needs_session(self):
+        return self.inner.needs_session
+
+    def bind(self, url, hooks=None):
+        super().bind(url, hooks)
+        self.inner.bind(url, hooks)
+
+    async def post(self, body, session, trace=None):
+        started = time.time()
+        start = perf_counter_ns()
+        raw = await self.inner.post(body, session, trace)
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(gzip.compress((json.dumps({
+            'time': started,
+            'elapsed': (perf_counter_ns() - start) / 1e9,
+            'request': body.decode() if isinstance(body, bytes) else body,
+            'response': raw.decode(),
+        }) + '\n').encode()))
+        self._file.flush()
+        return raw
+
+    async def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        await self.inner.close()
+
+
+def read_recording(path):
+    """
+    Iterate over the records of a recording.
+
+    A record cut short by a crash at the end of the recording is skipped.
+
+    Args:
+        path (str): Path to the recording.
+
+    Yields:
+        dict: Records with 'time', 'elapsed', 'request' and 'response' keys.
+    """
+    with open(path, 'rb') as raw:
+        magic = raw.read(2)
+    if not b'\x1f\x8b'.startswith(magic):
+        raise gzip.BadGzipFile(f'Not a gzipped file ({magic!r})')
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                if line.endswith('\n') and line.strip():
+                    yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile):
+            # A member cut short by a crash; every record before it is complete.
+            return
+
+
+def _call_key(request):
+    if isinstance(request, list):
+        return json.dumps([[item['method'], item['params']] for item in request])
+    return json.dumps([request['method'], request['params']])
+
+
+class ReplayTransport(Transport):
+    """
+    Transport answering requests from a recording, without a Coind server.
+
+    Requests are matched by method and parameters; JSON-RPC ids are
+    rewritten to those of the new request. Identical requests get their
+    recorded responses in the recorded order, starting over when exhausted.
+
+    Attributes:
+        path (str): Path to the recording.
+        simulate_latency (bool): Delay each response by its recorded duration.
+        latency_scale (float): Factor applied to recorded durations.
+    """
+
+    needs_session = False
+
+    def __init__(self, path, simulate_latency=False, latency_scale=1.0):
+        """
+        Initialize the ReplayTransport instance.
+
+        Args:
+            path (str): Path to the recording.
+            simulate_latency (bool): Delay each response by its recorded duration (default is False).
+            latency_scale (float): Factor applied to recorded durations (default is 1.0).
+        """
+        self.path = path
+        self.simulate_latency = simulate_latency
+        self.latency_scale = latency_scale
+        self._records = []
+        self._responses = {}
+        for record in read_recording(path):
+            request = json.loads(record['request'])
+            response = json.loads(record['response'])
+            if isinstance(request, list) and isinstance(response, list):
+                # Keep batch response ids as positions in the request.
+                positions = {item['id']: index for index, item in enumerate(request)}
+                response = [{**item, 'id': positions.get(item.get('id'))} for item in response]
+            self._records.append((record['time'], request))
+            self._responses.setdefault(_call_key(request), deque()).append((record['elapsed'], response))
+
+    def calls(self):
+        """
+        Return the recorded calls to drive a replay.
+
+        Returns:
+            list: (offset, method, params) tuples, offset in seconds from the first
+            record; batch requests are expanded with a shared offset.
+        """
+        if not self._records:
+            return []
+        records = sorted(self._records, key=lambda record: record[0])
+        first = records[0][0]
+        calls = []
+        for started, request in records:
+            for item in request if isinstance(request, list) else [request]:
+                calls.append((started - first, item['method'], item['params']))
+        return calls
+
+    async def post(self, body, session, trace=None):
+        request = json.loads(body)
+        responses = self._responses.get(_call_key(request))
+        if not responses:
+            method = 'batch' if isinstance(request, list) else request['method']
+            raise CoindError(-32601, f'No recorded response for {method}')
+        elapsed, response = responses[0]
+        responses.rotate(-1)
+        if self.simulate_latency and elapsed:
+            await asyncio.sleep(elapsed * self.latency_scale)
+        if isinstance(request, list) and isinstance(response, list):
+            response = [
+                item if item['id'] is None else {**item, 'id': request[item['id']]['id']}
+                for item in response
+            ]
+        elif isinstance(request, dict):
+            response = {**response, 'id': request['id']}
+        if trace is not None:
+            trace.first_byte_ns = trace.received_ns = perf_counter_ns()
+            self.hooks.emit('first_byte', trace)
+        return json.dumps(response).encode()